@@ -0,0 +1,191 @@
+from collections import defaultdict
+
+from django.shortcuts import reverse
+from markdown import markdown
+
+from articles.models import Article
+from comments.models import Comment
+from tags.models import Tag
+
+
+class UnknownField(Exception):
+    """
+    raised when a client asks for a field the resource does not have.
+    """
+
+
+class Resource:
+    """
+    describes how the objects of a model are exposed by the api.
+    rows are read with values(), so only the columns of the requested
+    fields are loaded, and turned into dicts by serialize().
+
+    Attributes:
+        fields (Dict[str, str]): name of each column field in the api to its values() lookup
+        computed_fields (Dict[str, List[str]]): name of each field built by serialize()
+                                                to the column fields it needs
+        default_fields (List[str]): fields returned when the client does not choose
+        cursor_field (str): datetime field the pages are ordered by, newest first
+    """
+    fields = {}
+    computed_fields = {}
+    default_fields = []
+    cursor_field = 'timestamp'
+
+    def get_queryset(self):
+        raise NotImplementedError('Resource requires get_queryset()')
+
+    def get_fields(self, requested):
+        """
+        Args:
+            requested (str|None): comma separated field names of the fields query parameter
+
+        Returns:
+            List[str]: fields to return
+
+        Raises:
+            UnknownField: when a requested field does not exist
+        """
+        if not requested:
+            return list(self.default_fields)
+        fields = [field.strip() for field in requested.split(',') if field.strip()]
+        unknown = [field for field in fields
+                   if field not in self.fields and field not in self.computed_fields]
+        if unknown:
+            raise UnknownField(', '.join(unknown))
+        return fields
+
+    def get_lookups(self, fields):
+        """
+        Args:
+            fields (List[str]): fields to return
+
+        Returns:
+            List[str]: lookups to pass to values(). pk and the cursor field are always read
+        """
+        columns = {'pk', self.cursor_field}
+        for field in fields:
+            if field in self.computed_fields:
+                columns.update(self.fields[name] for name in self.computed_fields[field])
+            else:
+                columns.add(self.fields[field])
+        return sorted(columns)
+
+    def get_rows(self, fields):
+        return self.get_queryset().values(*self.get_lookups(fields))
+
+    def compute(self, rows, fields):
+        """
+        add the computed fields to a batch of rows.
+
+        Args:
+            rows (List[dict]): rows of values()
+            fields (List[str]): fields to return
+        """
+
+    def serialize(self, rows, fields):
+        """
+        Args:
+            rows (List[dict]): rows of values()
+            fields (List[str]): fields to return
+
+        Returns:
+            List[dict]: objects with the api names of the fields
+        """
+        self.compute(rows, fields)
+        return [{field: row[field] if field in self.computed_fields else row[self.fields[field]]
+                 for field in fields}
+                for row in rows]
+
+
+class ArticleResource(Resource):
+    """
+    published articles. content_html is the html stored when the article was saved,
+    the markdown is only rendered again by the article itself.
+    """
+    fields = {
+        'id': 'pk',
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+        'keywords': 'keywords',
+        'author': 'author__username',
+        'publish_at': 'publish_at',
+        'updated': 'updated',
+        'content': 'content',
+        'content_html': 'content_html',
+        'text_count': 'text_count',
+        'reading_time': 'reading_time',
+    }
+    computed_fields = {
+        'url': ['slug'],
+        'tags': [],
+    }
+    default_fields = [
+        'id', 'slug', 'url', 'title', 'description', 'publish_at', 'updated', 'tags',
+    ]
+    cursor_field = 'publish_at'
+
+    def get_queryset(self):
+        return Article.objects.published()
+
+    def compute(self, rows, fields):
+        if 'url' in fields:
+            for row in rows:
+                row['url'] = reverse('articles:article_detail', kwargs={'slug': row['slug']})
+        if 'tags' in fields:
+            # one query for the tags of the whole batch
+            tags = defaultdict(list)
+            links = Article.tags.through.objects.filter(
+                article_id__in=[row['pk'] for row in rows], tag__is_active=True,
+            ).order_by('tag__name').values_list('article_id', 'tag__name')
+            for article_id, name in links:
+                tags[article_id].append(name)
+            for row in rows:
+                row['tags'] = tags[row['pk']]
+
+
+class TagResource(Resource):
+    """
+    active tags.
+    """
+    fields = {
+        'id': 'pk',
+        'name': 'name',
+        'timestamp': 'timestamp',
+    }
+    default_fields = ['id', 'name']
+
+    def get_queryset(self):
+        return Tag.objects.all()
+
+
+class CommentResource(Resource):
+    """
+    active comments of a published article.
+
+    Attributes:
+        article_slug (str): slug of the article
+    """
+    fields = {
+        'id': 'pk',
+        'name': 'name',
+        'comment': 'comment',
+        'timestamp': 'timestamp',
+    }
+    computed_fields = {
+        'comment_html': ['comment'],
+    }
+    default_fields = ['id', 'name', 'comment_html', 'timestamp']
+
+    def __init__(self, article_slug):
+        self.article_slug = article_slug
+
+    def get_queryset(self):
+        return Comment.objects.all().filter(
+            article__in=Article.objects.published().filter(slug=self.article_slug))
+
+    def compute(self, rows, fields):
+        if 'comment_html' in fields:
+            for row in rows:
+                row['comment_html'] = markdown(row['comment'])
@@ -0,0 +1,92 @@
+import json
+from http import HTTPStatus as status
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.shortcuts import reverse
+
+from articles.models import Article
+from comments.models import Comment
+from tags.models import Tag
+
+
+class ApiTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='testuser@test.com',
+            password='testuser1234',)
+        self.tag = Tag.objects.create(name='example tag')
+        self.articles = [
+            Article.objects.create(
+                author=self.user,
+                title=f'example{index}',
+                slug=f'example{index}',
+                description='example description',
+                content=f'#example{index}',
+                keywords='example',
+                publish_at=f'2020-01-0{index + 1} 00:00Z',)
+            for index in range(3)
+        ]
+        self.articles[0].tags.set([self.tag])
+        Article.objects.create(
+            author=self.user,
+            title='draft',
+            slug='draft',
+            description='example description',
+            content='#draft',
+            keywords='example',)
+        Comment.objects.create(article=self.articles[0], name='reader', comment='**nice**')
+
+    def test_article_list_pages_by_cursor(self):
+        url = reverse('api:article_list') + '?limit=2'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.OK)
+        data = response.json()
+        self.assertEqual([article['slug'] for article in data['results']],
+                         ['example2', 'example1'])
+        self.assertIsNotNone(data['next'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([article['slug'] for article in data['results']], ['example0'])
+        self.assertEqual(data['results'][0]['tags'], ['example tag'])
+        self.assertIsNone(data['next'])
+
+    def test_article_list_reads_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api:article_list') + '?fields=title')
+        self.assertEqual(response.json()['results'][0], {'title': 'example2'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"content"', queries.captured_queries[0]['sql'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('api:article_list') + '?fields=title,password')
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+        self.assertIn('password', response.json()['error'])
+
+    def test_article_detail_has_stored_html(self):
+        response = self.client.get(
+            reverse('api:article_detail', kwargs={'slug': 'example0'}))
+        self.assertIn('<h1', response.json()['content_html'])
+        response = self.client.get(reverse('api:article_detail', kwargs={'slug': 'draft'}))
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+
+    @override_settings(API_STREAM_CHUNK_SIZE=2)
+    def test_stream_exports_every_article(self):
+        response = self.client.get(reverse('api:article_list') + '?stream=1&fields=slug,tags')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertCountEqual([row['slug'] for row in rows],
+                              ['example0', 'example1', 'example2'])
+
+    def test_comments_and_tags(self):
+        response = self.client.get(
+            reverse('api:comment_list', kwargs={'slug': 'example0'}))
+        comment = response.json()['results'][0]
+        self.assertEqual(comment['name'], 'reader')
+        self.assertIn('<strong>nice</strong>', comment['comment_html'])
+        response = self.client.get(reverse('api:tag_list'))
+        self.assertEqual(response.json()['results'][0]['name'], 'example tag')
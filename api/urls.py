@@ -0,0 +1,13 @@
+from django.urls import path
+
+from .views import ArticleDetailApiView, ArticleListApiView, CommentListApiView, TagListApiView
+
+app_name = 'api'
+
+urlpatterns = [
+    path('articles/', ArticleListApiView.as_view(), name='article_list'),
+    path('articles/<slug:slug>/', ArticleDetailApiView.as_view(), name='article_detail'),
+    path('articles/<slug:slug>/comments/', CommentListApiView.as_view(),
+         name='comment_list'),
+    path('tags/', TagListApiView.as_view(), name='tag_list'),
+]
@@ -0,0 +1,122 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.generic import View
+
+from core.additional.paginator import CursorPaginator
+from .resources import ArticleResource, CommentResource, TagResource, UnknownField
+
+
+def error_response(message, status=400):
+    return JsonResponse({'status': status, 'error': message}, status=status)
+
+
+class ApiListView(View):
+    """
+    read-only json list of a Resource.
+
+    query parameters:
+        fields: comma separated fields to return, the defaults of the resource if omitted
+        limit: number of objects in a page, up to API_MAX_PAGE_SIZE
+        cursor: the next cursor of the previous page
+        stream: when set, every object is streamed as json lines without pagination
+
+    Returns:
+        pages are {'results': [...], 'next': url of the next page or null}
+    """
+
+    def get_resource(self):
+        raise NotImplementedError('ApiListView requires get_resource()')
+
+    def get(self, request, **kwargs):
+        resource = self.get_resource()
+        try:
+            fields = resource.get_fields(request.GET.get('fields'))
+        except UnknownField as error:
+            return error_response(f'Unknown fields: {error}')
+        if request.GET.get('stream'):
+            return self.stream(resource, fields)
+        try:
+            limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+        except ValueError:
+            return error_response('Bad limit.')
+        limit = max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+        paginator = CursorPaginator(resource.get_rows(fields), limit, resource.cursor_field)
+        try:
+            page = paginator.get_page(request.GET.get('cursor'))
+        except InvalidPage:
+            return error_response('Bad cursor.')
+        next_url = None
+        if page.has_next():
+            query = request.GET.copy()
+            query['cursor'] = page.next_cursor
+            next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+        return JsonResponse({
+            'results': resource.serialize(page.object_list, fields),
+            'next': next_url,
+        })
+
+    def stream(self, resource, fields):
+        """
+        stream every object as one json document per line.
+        rows are read with a database cursor in chunks of API_STREAM_CHUNK_SIZE
+        and serialized chunk by chunk, so memory use does not depend
+        on the number of objects.
+
+        Returns:
+            StreamingHttpResponse: application/x-ndjson response
+        """
+        chunk_size = settings.API_STREAM_CHUNK_SIZE
+        rows = resource.get_rows(fields).order_by('pk').iterator(chunk_size=chunk_size)
+
+        def lines():
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    return
+                for item in resource.serialize(chunk, fields):
+                    yield json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
+
+class ArticleListApiView(ApiListView):
+
+    def get_resource(self):
+        return ArticleResource()
+
+
+class TagListApiView(ApiListView):
+
+    def get_resource(self):
+        return TagResource()
+
+
+class CommentListApiView(ApiListView):
+
+    def get_resource(self):
+        return CommentResource(self.kwargs['slug'])
+
+
+class ArticleDetailApiView(View):
+    """
+    read-only json of a published article.
+    the fields query parameter works like ApiListView, content_html is returned by default.
+    """
+
+    def get(self, request, slug):
+        resource = ArticleResource()
+        try:
+            fields = resource.get_fields(request.GET.get('fields'))
+        except UnknownField as error:
+            return error_response(f'Unknown fields: {error}')
+        if not request.GET.get('fields'):
+            fields.append('content_html')
+        row = resource.get_rows(fields).filter(slug=slug).first()
+        if row is None:
+            raise Http404
+        return JsonResponse(resource.serialize([row], fields)[0])
@@ -5,6 +5,7 @@ from martor.widgets import AdminMartorWidget
 from django.utils import timezone
 
 from .models import Article
+from core.additional.paginator import ApproximateCountPaginator
 
 
 class ArticleAdmin(admin.ModelAdmin):
@@ -18,6 +19,8 @@ class ArticleAdmin(admin.ModelAdmin):
         search_fields (List): list of fields in model that the user can search through in admin site
         actions (List): list of custom functions to add custom actions to admin site
         inlines (List): list of custom Inline classes to add relational fields in admin site
+        paginator (Paginator): paginator that estimates the count of large changelists
+        show_full_result_count (bool): skip the extra COUNT(*) of the whole table
     """
 
     list_display = [
@@ -31,23 +34,34 @@ class ArticleAdmin(admin.ModelAdmin):
         'title',
     ]
     list_filter = [
-        'title',
         'is_active',
     ]
     search_fields = [
         'slug',
         'title',
         'description',
-        'content',
     ]
     actions = ['active', 'inactive']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        search through ArticleQuerySet.matching instead of
+        icontains lookups over search_fields.
+        search_fields is kept so the admin renders the search box
+        and the autocomplete view of other admins is enabled.
+        """
+        if not search_term:
+            return queryset, False
+        return queryset.matching(search_term), False
 
     def active(self, request, queryset):
         """
         function to set the target model's "is_active" to True.
         used in admin site.
         """
-        queryset.update(is_active=True)
+        queryset.set_active(True)
 
     active.short_description = '閲覧可能'
 
@@ -56,7 +70,7 @@ class ArticleAdmin(admin.ModelAdmin):
         function to set the target model's "is_active" to False.
         used in admin site.
         """
-        queryset.update(is_active=False)
+        queryset.set_active(False)
 
     inactive.short_description = '閲覧不可能'
 
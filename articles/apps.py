@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class ArticlesConfig(AppConfig):
     name = 'articles'
+
+    def ready(self):
+        """
+        import signals so the receivers are connected.
+        """
+        from . import signals  # noqa: F401
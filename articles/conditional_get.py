@@ -0,0 +1,127 @@
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Article, ArticleRecommendation
+from comments.models import Comment
+from core.additional.conditional_get import make_etag
+from tags.models import Tag
+
+
+def aggregate_related(queryset, link, aggregate):
+    """
+    Args:
+        queryset (QuerySet): rows related to articles
+        link (str): field of the rows that refers to the article
+        aggregate (Aggregate): aggregate of the rows of one article
+
+    Returns:
+        Subquery: the aggregate of the rows of the outer article
+    """
+    return Subquery(
+        queryset.filter(**{link: OuterRef('pk')}).order_by().values(link)
+        .annotate(value=aggregate).values('value'))
+
+
+def get_last_modified(*values):
+    """
+    Returns:
+        datetime|None: the latest of the values that are not in the future
+    """
+    now = timezone.now()
+    values = [value for value in values if value is not None and value <= now]
+    return max(values, default=None)
+
+
+def get_article_validators(queryset, slug, authenticated):
+    """
+    read the validators of an article page in one query,
+    without loading the content, the comments, the tags or the related articles.
+    the etag changes with the content, the comments, the tags, the
+    related articles and the suggested articles shown on the page.
+
+    Args:
+        queryset (QuerySet): articles the user can see
+        slug (str): slug of the article
+        authenticated (bool): whether the page is rendered for a logged in user
+
+    Returns:
+        Tuple[str, datetime]|None: etag and last modified datetime,
+            None when there is no such article
+    """
+    now = timezone.now()
+    comments = Comment.objects.all()
+    tags = Article.tags.through.objects.filter(tag__is_active=True)
+    related = Article.related_articles.through.objects.filter(
+        to_article__is_active=True, to_article__publish_at__lte=now)
+    suggested = ArticleRecommendation.objects.published()
+    row = queryset.filter(slug=slug).order_by().annotate(
+        comment_count=aggregate_related(comments, 'article', Count('id')),
+        comment_updated=aggregate_related(comments, 'article', Max('updated')),
+        tag_count=aggregate_related(tags, 'article', Count('id')),
+        tag_link=aggregate_related(tags, 'article', Max('id')),
+        tag_updated=aggregate_related(tags, 'article', Max('tag__updated')),
+        related_count=aggregate_related(related, 'from_article', Count('id')),
+        related_link=aggregate_related(related, 'from_article', Max('id')),
+        related_updated=aggregate_related(related, 'from_article', Max('to_article__updated')),
+        suggested_count=aggregate_related(suggested, 'article', Count('id')),
+        suggested_link=aggregate_related(suggested, 'article', Max('id')),
+        suggested_updated=aggregate_related(suggested, 'article', Max('recommended__updated')),
+    ).values(
+        'pk', 'content_hash', 'updated', 'publish_at',
+        'comment_count', 'comment_updated', 'tag_count', 'tag_link', 'tag_updated',
+        'related_count', 'related_link', 'related_updated',
+        'suggested_count', 'suggested_link', 'suggested_updated',
+    ).first()
+    if row is None:
+        return None
+    last_modified = get_last_modified(
+        row['updated'], row['publish_at'], row['comment_updated'],
+        row['tag_updated'], row['related_updated'], row['suggested_updated'])
+    if last_modified is None:
+        return None
+    return make_etag('article', authenticated, *row.values()), last_modified
+
+
+def get_article_list_validator_queryset(queryset):
+    """
+    a single row with the newest updated of all articles, the newest publish_at
+    of the articles the user can see and the newest updated of the tags.
+    every value is read from the top of an index, so the cost does not grow with the tables.
+    deactivating an article or a tag sets updated, publishing moves the newest publish_at.
+
+    Args:
+        queryset (QuerySet): articles the user can see
+
+    Returns:
+        QuerySet: values of the validators, at most one row
+    """
+    published = queryset.filter(publish_at__lte=timezone.now()).order_by('-publish_at', '-id')
+    tags = Tag._base_manager.order_by('-updated')
+    return Article._base_manager.order_by('-updated').annotate(
+        published=Subquery(published.values('publish_at')[:1]),
+        tag_updated=Subquery(tags.values('updated')[:1]),
+    ).values('updated', 'published', 'tag_updated')[:1]
+
+
+def get_article_list_validators(queryset, authenticated):
+    """
+    read the validators of the article list in one query,
+    without counting or aggregating the articles, see get_article_list_validator_queryset.
+    they are read before the page cache and every 304, so they must stay cheap.
+
+    Args:
+        queryset (QuerySet): articles the user can see
+        authenticated (bool): whether the page is rendered for a logged in user
+
+    Returns:
+        Tuple[str, datetime]|None: etag and last modified datetime,
+            None when there are no articles
+    """
+    row = get_article_list_validator_queryset(queryset).first()
+    if row is None:
+        return None
+    last_modified = get_last_modified(row['updated'], row['published'], row['tag_updated'])
+    if last_modified is None:
+        return None
+    etag = make_etag('article-list', authenticated, *row.values())
+    return etag, last_modified
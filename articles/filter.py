@@ -6,6 +6,22 @@ from .models import Article
 from tags.models import Tag
 
 
+def get_tag_choices(request):
+    """
+    visitors only see tags of published articles, read from the stored
+    statistics of the tags. logged in users also filter their drafts.
+
+    Args:
+        request (HttpRequest|None): current request
+
+    Returns:
+        queryset: tags of the filter
+    """
+    if request is not None and request.user.is_authenticated:
+        return Tag.objects.all()
+    return Tag.objects.published()
+
+
 class ArticleFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(
         method='search_filter',
@@ -13,7 +29,7 @@ class ArticleFilter(django_filters.FilterSet):
     tags = django_filters.ModelMultipleChoiceFilter(
         field_name='tags__name__iexact',
         to_field_name='name',
-        queryset=Tag.objects.all(),
+        queryset=get_tag_choices,
         conjoined=True,
         widget=forms.CheckboxSelectMultiple)
 
@@ -25,4 +41,9 @@ class ArticleFilter(django_filters.FilterSet):
         ]
 
     def search_filter(self, queryset, model_name, value):
-        return queryset.search(value)
+        """
+        the queryset is already scoped by the view
+        (published objects, or all active objects for logged in users),
+        so only the text match is applied here.
+        """
+        return queryset.matching(value)
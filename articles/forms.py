@@ -1,7 +1,17 @@
+import os
+
+from cloudinary_storage.validators import validate_video
 from django import forms
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.utils import timezone
 
 from .models import Article
+from .tasks import attach_video_upload, create_cover_image
 from tags.models import Tag
+from uploads.blobs import get_content_name
+from uploads.images import ImageTooLarge, optimize_image
+from uploads.models import Blob, ChunkedUpload, ResponsiveImage
+from uploads.storage import get_spool_storage
 
 
 class ArticleForm(forms.ModelForm):
@@ -11,6 +21,8 @@ class ArticleForm(forms.ModelForm):
         queryset=Article.objects.all(), widget=forms.CheckboxSelectMultiple, required=False)
     publish_at = forms.DateTimeField(
         widget=forms.DateTimeInput(attrs={'autocomplete': 'off'}), required=False)
+    video_upload = forms.ModelChoiceField(
+        queryset=ChunkedUpload.objects.none(), widget=forms.HiddenInput, required=False)
 
     class Meta:
         model = Article
@@ -26,3 +38,138 @@ class ArticleForm(forms.ModelForm):
             'keywords',
             'publish_at',
         )
+
+    def __init__(self, *args, user=None, **kwargs):
+        """
+        Args:
+            user (User|None): user editing the article. only the complete
+                chunked uploads of this user can be attached as the video
+        """
+        super().__init__(*args, **kwargs)
+        if user is not None:
+            self.fields['video_upload'].queryset = ChunkedUpload.objects.complete().filter(user=user)
+        # Blob.kind to sha256 and size of the files stored by this form
+        self.new_blobs = {}
+
+    def find_blob(self, kind, file):
+        """
+        look up a blob with the same content as an uploaded file.
+        when there is none, the file is renamed after its content
+        and recorded as a new blob on save.
+
+        Args:
+            kind (str): Blob.COVER or Blob.VIDEO
+            file (UploadedFile): uploaded file
+
+        Returns:
+            Blob|None: blob to assign to the field instead of uploading a copy
+        """
+        file.name = get_content_name(file, file.name)
+        sha256 = os.path.splitext(file.name)[0]
+        blob = Blob.objects.filter(kind=kind, sha256=sha256).exclude(name='').first()
+        if blob is None:
+            self.new_blobs[kind] = (sha256, file.size)
+            return None
+        blob.last_used_at = timezone.now()
+        blob.save(update_fields=['last_used_at'])
+        return blob
+
+    def get_stored_file(self, kind, blob, file):
+        """
+        Args:
+            kind (str): Blob.COVER or Blob.VIDEO
+            blob (Blob): blob found for the uploaded file
+            file (UploadedFile): uploaded file
+
+        Returns:
+            FieldFile: the stored file of the blob. the model validators
+                read the uploaded file instead of downloading the stored one
+        """
+        field = Article._meta.get_field(kind)
+        stored = field.attr_class(self.instance, field, blob.name)
+        stored.file = file
+        return stored
+
+    def clean_cover(self):
+        """
+        resize and recompress a newly uploaded cover before it is sent to cloudinary.
+        the sizes before and after are stored on the article.
+        a cover that was uploaded before is reused.
+
+        Returns:
+            str|File: name of a stored cover, the optimized cover,
+                or the cover as it is when it can not be optimized
+        """
+        cover = self.cleaned_data.get('cover')
+        if not isinstance(cover, UploadedFile):
+            return cover
+        # derivatives of the previous cover no longer apply
+        self.instance.cover_image = None
+        try:
+            optimized = optimize_image(cover, cover.name)
+        except ImageTooLarge:
+            raise forms.ValidationError(
+                'The image has too many pixels.', code='image_too_large')
+        if optimized is not None:
+            self.instance.cover_original_size = optimized.original_size
+            self.instance.cover_size = optimized.size
+            cover = SimpleUploadedFile(
+                optimized.name, optimized.content, optimized.content_type)
+        blob = self.find_blob(Blob.COVER, cover)
+        if blob is None:
+            return cover
+        self.instance.cover_image = ResponsiveImage.objects.filter(
+            source=blob.url).first()
+        return self.get_stored_file(Blob.COVER, blob, cover)
+
+    def clean_video(self):
+        """
+        a video that was uploaded before is reused.
+
+        Returns:
+            str|File: name of a stored video, or the uploaded video
+        """
+        video = self.cleaned_data.get('video')
+        if not isinstance(video, UploadedFile):
+            return video
+        blob = self.find_blob(Blob.VIDEO, video)
+        return video if blob is None else self.get_stored_file(Blob.VIDEO, blob, video)
+
+    def clean_video_upload(self):
+        """
+        a video sent in chunks beforehand, see uploads.views.ChunkedUploadStartView.
+        it is attached to the article by a task after save.
+
+        Returns:
+            ChunkedUpload|None: complete upload of the video
+        """
+        upload = self.cleaned_data.get('video_upload')
+        if upload is None:
+            return None
+        with get_spool_storage().open(upload.spool_name, 'rb') as file:
+            validate_video(file)
+        return upload
+
+    def save(self, commit=True):
+        """
+        record the blobs of newly stored files, queue the cover derivatives
+        when a new cover was stored and the attachment of a chunked video.
+        """
+        article = super().save(commit)
+        if not commit:
+            return article
+        for kind, (sha256, size) in self.new_blobs.items():
+            file = getattr(article, kind)
+            Blob.objects.update_or_create(kind=kind, sha256=sha256, defaults={
+                'name': file.name,
+                'url': file.url,
+                'size': size,
+                'last_used_at': timezone.now(),
+            })
+        if Blob.COVER in self.new_blobs:
+            create_cover_image.enqueue(article_id=str(article.pk))
+        upload = self.cleaned_data.get('video_upload')
+        if upload is not None:
+            attach_video_upload.enqueue(
+                article_id=str(article.pk), upload_id=str(upload.pk))
+        return article
@@ -0,0 +1,413 @@
+import datetime
+import json
+import uuid
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Article, ArticleNgram
+from .ngram import get_article_grams, get_article_text
+from .page_cache import ARTICLE_LIST, TAG_LIST, article_key
+from comments.models import Comment
+from core.additional.page_cache import invalidate
+from feeds.tasks import rebuild_feeds
+from tags.models import Tag
+from tags.tasks import refresh_tag_stats
+
+TAG = 'tag'
+ARTICLE = 'article'
+COMMENT = 'comment'
+
+CORE_FIELDS = ['is_active', 'timestamp', 'updated']
+TAG_FIELDS = ['name', *CORE_FIELDS]
+ARTICLE_FIELDS = [
+    'title', 'description', 'content', 'keywords', 'publish_at', 'cover', 'video',
+    *CORE_FIELDS, *Article.RENDERED_FIELDS,
+]
+COMMENT_FIELDS = ['name', 'comment', *CORE_FIELDS]
+DATETIME_FIELDS = ['publish_at', 'timestamp', 'updated']
+
+
+class ContentImportError(Exception):
+    """
+    raised when a line of an import can not be imported.
+    """
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ContentEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder drops the microseconds of datetimes,
+    they are kept so an import restores the exact values.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump(record):
+    return json.dumps(record, cls=ContentEncoder, ensure_ascii=False)
+
+
+def export_content(out, chunk_size=500):
+    """
+    write every tag, article and comment, active or not, as json lines.
+    tags come first and comments last, so an import can resolve every
+    link in one pass. articles refer to their author, tags and related
+    articles by username, name and slug. rows are read with iterator()
+    and the links of each chunk with one query, so memory does not grow
+    with the number of rows.
+
+    Args:
+        out (TextIO): stream to write to
+        chunk_size (int): rows read per database round trip
+
+    Returns:
+        Dict[str, int]: number of exported rows of each type
+    """
+    counts = defaultdict(int)
+    tags = Tag.objects.get_queryset().order_by('name').values(*TAG_FIELDS)
+    for tag in tags.iterator(chunk_size=chunk_size):
+        out.write(dump({'type': TAG, **tag}) + '\n')
+        counts[TAG] += 1
+    articles = Article.objects.get_queryset().order_by('slug').values(
+        'pk', 'slug', 'author__username', *ARTICLE_FIELDS)
+    for chunk in chunked(articles.iterator(chunk_size=chunk_size), chunk_size):
+        ids = [article['pk'] for article in chunk]
+        tag_names = defaultdict(list)
+        for article_id, name in Article.tags.through.objects.filter(
+                article_id__in=ids).order_by('tag__name').values_list('article_id', 'tag__name'):
+            tag_names[article_id].append(name)
+        related_slugs = defaultdict(list)
+        for article_id, slug in Article.related_articles.through.objects.filter(
+                from_article_id__in=ids).order_by('to_article__slug').values_list(
+                'from_article_id', 'to_article__slug'):
+            related_slugs[article_id].append(slug)
+        for article in chunk:
+            article_id = article.pop('pk')
+            author = article.pop('author__username')
+            out.write(dump({
+                'type': ARTICLE,
+                **article,
+                'author': author,
+                'tags': tag_names[article_id],
+                'related_articles': related_slugs[article_id],
+            }) + '\n')
+        counts[ARTICLE] += len(chunk)
+    comments = Comment.objects.get_queryset().order_by('article__slug', 'timestamp').values(
+        'id', 'article__slug', *COMMENT_FIELDS)
+    for comment in comments.iterator(chunk_size=chunk_size):
+        comment['article'] = comment.pop('article__slug')
+        out.write(dump({'type': COMMENT, **comment}) + '\n')
+        counts[COMMENT] += 1
+    return dict(counts)
+
+
+class ContentImporter:
+    """
+    import the json lines of export_content in batches.
+    the import is idempotent: tags are matched by name, articles by slug
+    and comments by id, existing rows are updated with bulk_update and new
+    rows are created with bulk_create. the file is read three times: a read-only
+    pass checks every author, tag and article the records refer to, so a file
+    with unknown references fails before anything is written, the second pass
+    writes the rows and the last one links the articles to their tags and
+    related articles, since related articles can appear later in the file.
+    only one batch and the keys of the file are held in memory.
+
+    Attributes:
+        batch_size (int): rows written per query
+        author (User|None): author of articles whose author does not exist
+        log (Callable): called with progress messages
+    """
+
+    def __init__(self, batch_size=500, author=None, log=None):
+        self.batch_size = batch_size
+        self.author = author
+        self.log = log or (lambda message: None)
+
+    def run(self, path):
+        """
+        Args:
+            path (str): path of the json lines file
+
+        Returns:
+            Dict[str, int]: number of imported rows of each type
+
+        Raises:
+            ContentImportError: when a line can not be imported
+        """
+        self.validate(path)
+        self.log('checked references')
+        counts = defaultdict(int)
+        try:
+            for kind, batch in self.read_batches(path):
+                getattr(self, f'import_{kind}s')(batch)
+                counts[kind] += len(batch)
+                self.log(f'imported {counts[kind]} {kind}s')
+            for kind, batch in self.read_batches(path, kinds=[ARTICLE]):
+                self.link_articles(batch)
+            self.log('linked tags and related articles')
+        finally:
+            # batches commit on their own, the rows written before a failure
+            # still need their tag statistics, feeds and cached pages
+            self.refresh_derived_data()
+        return dict(counts)
+
+    def validate(self, path):
+        """
+        read the file without writing and check that every reference
+        is in the file or in the database.
+
+        Args:
+            path (str): path of the json lines file
+
+        Raises:
+            ContentImportError: when a line can not be read or a reference is unknown
+        """
+        names, slugs, usernames = set(), set(), set()
+        tags, related, commented = set(), set(), set()
+        for kind, batch in self.read_batches(path):
+            for record in batch:
+                if kind == TAG:
+                    names.add(record['name'])
+                elif kind == ARTICLE:
+                    slugs.add(record['slug'])
+                    usernames.add(record['author'])
+                    tags.update(record.get('tags', []))
+                    related.update(record.get('related_articles', []))
+                else:
+                    commented.add(record['article'])
+        if self.author is None:
+            user_model = get_user_model()
+            self.check_known('unknown authors', usernames, user_model, user_model.USERNAME_FIELD)
+        self.check_known('unknown tags', tags - names, Tag, 'name')
+        self.check_known('unknown related articles', related - slugs, Article, 'slug')
+        self.check_known('comments of unknown articles', commented - slugs, Article, 'slug')
+
+    def check_known(self, message, values, model, field):
+        """
+        Args:
+            message (str): start of the error message
+            values (Set[str]): values that must exist
+            model (Model): model the values refer to
+            field (str): field the values are matched by
+
+        Raises:
+            ContentImportError: when some values do not exist
+        """
+        known = set()
+        for chunk in chunked(sorted(values), self.batch_size):
+            known.update(model._base_manager.filter(
+                **{f'{field}__in': chunk}).values_list(field, flat=True))
+        missing = values - known
+        if missing:
+            raise ContentImportError(f'{message}: {", ".join(sorted(missing))}')
+
+    def read_batches(self, path, kinds=(TAG, ARTICLE, COMMENT)):
+        """
+        Yields:
+            Tuple[str, List[dict]]: type and records of up to batch_size lines of that type
+        """
+        kind, batch = None, []
+        with open(path, encoding='utf-8') as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    raise ContentImportError(f'line {number}: {error}')
+                if record.get('type') not in (TAG, ARTICLE, COMMENT):
+                    raise ContentImportError(f'line {number}: unknown type {record.get("type")!r}')
+                if record['type'] not in kinds:
+                    continue
+                if batch and (record['type'] != kind or len(batch) >= self.batch_size):
+                    yield kind, batch
+                    batch = []
+                kind = record['type']
+                for field in DATETIME_FIELDS:
+                    if record.get(field):
+                        record[field] = parse_datetime(record[field])
+                batch.append(record)
+        if batch:
+            yield kind, batch
+
+    def upsert(self, model, key, records, fields, build):
+        """
+        update the rows that exist and create the others.
+
+        Args:
+            model (Model): model of the rows
+            key (str): field the rows are matched by
+            records (List[dict]): records of a batch
+            fields (List[str]): fields written on existing rows
+            build (Callable): returns an unsaved object from a record
+
+        Returns:
+            List[Model]: objects of the records, in order
+        """
+        existing = model._base_manager.in_bulk(
+            [record[key] for record in records], field_name=key)
+        objects = [build(record, existing.get(record[key])) for record in records]
+        created = [obj for record, obj in zip(records, objects) if record[key] not in existing]
+        updated = [obj for record, obj in zip(records, objects) if record[key] in existing]
+        with transaction.atomic():
+            if updated:
+                model._base_manager.bulk_update(updated, fields)
+            if created:
+                # bulk_create sets the auto_now fields, the exported dates are written back
+                dates = [(obj.timestamp, obj.updated) for obj in created]
+                model._base_manager.bulk_create(created)
+                for obj, (timestamp, updated) in zip(created, dates):
+                    obj.timestamp, obj.updated = timestamp, updated
+                model._base_manager.bulk_update(created, ['timestamp', 'updated'])
+        return objects
+
+    def import_tags(self, records):
+        def build(record, tag):
+            tag = tag or Tag()
+            for field in TAG_FIELDS:
+                setattr(tag, field, record[field])
+            return tag
+
+        self.upsert(Tag, 'name', records, TAG_FIELDS, build)
+
+    def get_authors(self, records):
+        usernames = {record['author'] for record in records}
+        authors = get_user_model()._base_manager.in_bulk(
+            usernames, field_name=get_user_model().USERNAME_FIELD)
+        missing = usernames - set(authors)
+        if missing and self.author is None:
+            raise ContentImportError(f'unknown authors: {", ".join(sorted(missing))}')
+        return {username: authors.get(username, self.author) for username in usernames}
+
+    def import_articles(self, records):
+        """
+        the stored html is kept when it was rendered by the current renderer,
+        otherwise the content is rendered again like Article.save does.
+        the search text and the n-gram index of the batch are written again.
+        """
+        authors = self.get_authors(records)
+
+        def build(record, article):
+            article = article or Article(slug=record['slug'])
+            article.author = authors[record['author']]
+            for field in ARTICLE_FIELDS:
+                if field in record:
+                    setattr(article, field, record[field])
+            if article.is_rendered_stale:
+                article.render_content()
+            article.search_text = get_article_text(article)
+            return article
+
+        articles = self.upsert(
+            Article, 'slug', records, ['author', 'search_text', *ARTICLE_FIELDS], build)
+        ids = [article.pk for article in articles]
+        with transaction.atomic():
+            ArticleNgram.objects.filter(article_id__in=ids).delete()
+            ArticleNgram.objects.bulk_create([
+                ArticleNgram(article_id=article.pk, gram=gram)
+                for article in articles if article.is_active
+                for gram in get_article_grams(article)
+            ], batch_size=self.batch_size * 10)
+        invalidate(*[article_key(article_id) for article_id in ids])
+
+    def import_comments(self, records):
+        for record in records:
+            record['id'] = uuid.UUID(record['id'])
+        slugs = {record['article'] for record in records}
+        articles = dict(Article._base_manager.filter(
+            slug__in=slugs).values_list('slug', 'pk'))
+        missing = slugs - set(articles)
+        if missing:
+            raise ContentImportError(f'comments of unknown articles: {", ".join(sorted(missing))}')
+
+        def build(record, comment):
+            comment = comment or Comment(id=record['id'])
+            comment.article_id = articles[record['article']]
+            for field in COMMENT_FIELDS:
+                setattr(comment, field, record[field])
+            return comment
+
+        self.upsert(Comment, 'id', records, ['article', *COMMENT_FIELDS], build)
+
+    def link_articles(self, records):
+        """
+        make the tags and related articles of a batch of articles match the records.
+        related_articles is symmetrical, so both directions of each link are written.
+        """
+        slugs = {record['slug'] for record in records}
+        slugs.update(slug for record in records for slug in record.get('related_articles', []))
+        names = {name for record in records for name in record.get('tags', [])}
+        article_ids = dict(Article._base_manager.filter(
+            slug__in=slugs).values_list('slug', 'pk'))
+        tag_ids = dict(Tag._base_manager.filter(name__in=names).values_list('name', 'pk'))
+        unknown = names - set(tag_ids)
+        if unknown:
+            raise ContentImportError(f'unknown tags: {", ".join(sorted(unknown))}')
+        unknown = slugs - set(article_ids)
+        if unknown:
+            raise ContentImportError(f'unknown related articles: {", ".join(sorted(unknown))}')
+        ids = [article_ids[record['slug']] for record in records]
+        tags = {(article_ids[record['slug']], tag_ids[name])
+                for record in records for name in record.get('tags', [])}
+        related = {(article_ids[record['slug']], article_ids[slug])
+                   for record in records for slug in record.get('related_articles', [])}
+        with transaction.atomic():
+            self.sync_links(Article.tags.through, 'article_id', 'tag_id', ids, tags)
+            self.sync_links(Article.related_articles.through, 'from_article_id',
+                            'to_article_id', ids, related, symmetrical=True)
+
+    def sync_links(self, through, source, target, ids, links, symmetrical=False):
+        """
+        Args:
+            through (Model): through model of the many-to-many field
+            source (str): field of the article the links start from
+            target (str): field of the linked row
+            ids (List[UUID]): articles of the batch
+            links (Set[Tuple[UUID, UUID]]): links the articles must have
+            symmetrical (bool): whether the reverse of each link is stored too
+        """
+        existing = set(through.objects.filter(
+            **{f'{source}__in': ids}).values_list(source, target))
+        removed = existing - links
+        if removed:
+            lookup = Q()
+            for start, end in removed:
+                lookup |= Q(**{source: start, target: end})
+                if symmetrical:
+                    lookup |= Q(**{source: end, target: start})
+            through.objects.filter(lookup).delete()
+        added = links - existing
+        if symmetrical:
+            added |= {(end, start) for start, end in added}
+        through.objects.bulk_create(
+            [through(**{source: start, target: end}) for start, end in added],
+            batch_size=self.batch_size, ignore_conflicts=True)
+
+    def refresh_derived_data(self):
+        """
+        bulk writes do not send the signals that maintain the tag statistics,
+        the feeds and the page cache.
+        """
+        tag_ids = Tag.objects.get_queryset().values_list('pk', flat=True)
+        for chunk in chunked(tag_ids.iterator(chunk_size=self.batch_size), self.batch_size):
+            refresh_tag_stats(chunk)
+        rebuild_feeds.enqueue()
+        invalidate(ARTICLE_LIST, TAG_LIST)
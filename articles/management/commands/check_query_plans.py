@@ -0,0 +1,85 @@
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from articles.conditional_get import get_article_list_validator_queryset
+from articles.models import Article, ArticleRecommendation
+from articles.search import supports_full_text_search
+from articles.views import ArticleListView
+from comments.models import Comment
+from core.additional.paginator import CursorPaginator
+from core.additional.query_plans import explain
+
+
+def get_list_page(queryset, cursor=None):
+    paginator = CursorPaginator(queryset, ArticleListView.paginate_by, 'publish_at')
+    return paginator.get_page_queryset(cursor)
+
+
+def get_cursor():
+    article = Article(pk=uuid.uuid4(), publish_at=timezone.now())
+    return CursorPaginator(Article.objects.all(), 1, 'publish_at').encode_cursor(article)
+
+
+def get_hot_queries():
+    """
+    the queries every page view runs, with the index each one should use.
+    None accepts any index, for indexes whose name depends on the database.
+
+    Returns:
+        List[Tuple[str, QuerySet, str|None]]: label, queryset and expected index
+    """
+    article_ids = [uuid.uuid4()]
+    queries = [
+        ('article list', get_list_page(Article.objects.published()),
+         'article_active_publish_idx'),
+        ('article list, next page', get_list_page(Article.objects.published(), get_cursor()),
+         'article_active_publish_idx'),
+        ('article list for users', get_list_page(Article.objects.all()),
+         'article_active_publish_idx'),
+        ('article list validators', get_article_list_validator_queryset(Article.objects.published()),
+         'article_updated_idx'),
+        ('next scheduled article', Article.objects.scheduled().values_list('publish_at')[:1],
+         'article_active_publish_idx'),
+        ('article detail', Article.objects.all().filter(slug='example'), None),
+        ('suggestions of articles',
+         ArticleRecommendation.objects.published().filter(article__in=article_ids), None),
+        ('comments of articles', Comment.objects.all().filter(article__in=article_ids),
+         'comment_active_article_idx'),
+    ]
+    if supports_full_text_search(Comment.objects.db):
+        # the trigram indexes only exist on postgresql
+        queries.append(('japanese comment search', Comment.objects.all().matching('コメント検索'),
+                        'comments_comment_comment_trgm'))
+    return queries
+
+
+class Command(BaseCommand):
+    """
+    run EXPLAIN on the hot queries and check that each one uses its index.
+    fails when a model or query change regressed a plan.
+    run it against a database with the production schema, pass -v 2 to print the plans.
+
+    Example:
+        python manage.py check_query_plans
+    """
+    help = 'Check that the hot queries use their indexes.'
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset, expected in get_hot_queries():
+            plan, indexes = explain(queryset)
+            ok = bool(indexes) if expected is None else expected in indexes
+            used = ', '.join(sorted(indexes)) or 'no index'
+            if ok:
+                self.stdout.write(f'{label}: {used}')
+            else:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(
+                    f'{label}: {used}, expected {expected or "an index"}'))
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
+        if failures:
+            raise CommandError(f'{len(failures)} query plan(s) regressed: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('every query uses its index.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from articles.jsonl import export_content
+
+
+class Command(BaseCommand):
+    """
+    export every tag, article and comment as json lines for import_content.
+    rows are streamed, so the export runs in constant memory on any table size.
+
+    Example:
+        python manage.py export_content --output content.jsonl
+    """
+    help = 'Export tags, articles and comments as json lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', help='file to write to, defaults to stdout.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='rows read per database round trip.')
+
+    def handle(self, *args, **options):
+        if options['output'] is None:
+            counts = export_content(self.stdout, chunk_size=options['chunk_size'])
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                counts = export_content(out, chunk_size=options['chunk_size'])
+        summary = ', '.join(f'{count} {name}s' for name, count in counts.items())
+        self.stderr.write(f'exported {summary or "nothing"}.')
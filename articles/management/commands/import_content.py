@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from articles.jsonl import ContentImporter, ContentImportError
+
+
+class Command(BaseCommand):
+    """
+    import the json lines of export_content in batches.
+    running it again with the same file changes nothing, tags are matched
+    by name, articles by slug and comments by id.
+
+    Example:
+        python manage.py import_content content.jsonl --author admin
+    """
+    help = 'Import tags, articles and comments from json lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='file written by export_content.')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='rows written per query.')
+        parser.add_argument(
+            '--author',
+            help='username of the author of articles whose author does not exist.')
+
+    def handle(self, *args, **options):
+        author = None
+        if options['author']:
+            author = get_user_model().objects.filter(
+                **{get_user_model().USERNAME_FIELD: options['author']}).first()
+            if author is None:
+                raise CommandError(f'unknown author {options["author"]}')
+        importer = ContentImporter(
+            batch_size=options['batch_size'], author=author, log=self.stdout.write)
+        try:
+            counts = importer.run(options['path'])
+        except ContentImportError as error:
+            raise CommandError(str(error))
+        summary = ', '.join(f'{count} {name}s' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'imported {summary or "nothing"}.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article, ArticleNgram
+from articles.ngram import index_article
+
+
+class Command(BaseCommand):
+    """
+    rebuild the n-gram index and the search text used for japanese search.
+    needed after articles are written without Article.save,
+    for example with bulk_create.
+    """
+    help = 'Rebuild the n-gram search index of articles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='delete every posting before indexing.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=200,
+            help='number of articles fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            ArticleNgram.objects.all().delete()
+        queryset = Article.objects.get_queryset()
+        indexed = 0
+        for article in queryset.iterator(chunk_size=options['chunk_size']):
+            index_article(article)
+            indexed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'indexed {indexed} article(s).'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article
+from articles.rendering import get_renderer_version
+
+
+class Command(BaseCommand):
+    """
+    render the markdown content of articles and store the html
+    together with the content statistics.
+    by default only articles rendered with another renderer
+    configuration, or never rendered, are processed.
+    this also backfills the statistics of existing articles.
+    """
+    help = 'Render article content to html and store it with its statistics.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='render every article even if the stored html is up to date.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=200,
+            help='number of articles fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        queryset = Article.objects.get_queryset()
+        if not options['force']:
+            queryset = queryset.exclude(
+                renderer_version=get_renderer_version())
+        rendered = 0
+        for article in queryset.iterator(chunk_size=options['chunk_size']):
+            if options['force'] or article.is_rendered_stale:
+                article.refresh_rendered_content()
+                rendered += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'rendered {rendered} article(s).'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from articles.recommendations import update_recommendations
+
+
+class Command(BaseCommand):
+    """
+    compute the suggestions shown on the article page.
+    only the articles whose content, keywords or tags changed since the
+    last run are tokenized, and only the suggestions they can affect are
+    computed again. run it periodically, and with --full once in a while
+    so every article is scored with the current idf weights.
+    """
+    help = 'compute the related article suggestions of the published articles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='tokenize and compute every article again')
+
+    def handle(self, *args, full=False, **options):
+        result = update_recommendations(full=full)
+        self.stdout.write(
+            f'{result.articles} articles, {len(result.tokenized)} tokenized, '
+            f'{len(result.removed)} removed, {len(result.recomputed)} recomputed, '
+            f'{len(result.updated)} updated')
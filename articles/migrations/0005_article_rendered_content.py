@@ -0,0 +1,28 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_auto_20200907_2048'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='renderer_version',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
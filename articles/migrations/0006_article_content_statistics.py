@@ -0,0 +1,28 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0005_article_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='img_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='text_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:41
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# the trigger keeps search_vector up to date on every insert and update,
+# including bulk_create and queryset.update which skip Article.save.
+CREATE_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION articles_article_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER articles_article_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, content
+    ON articles_article
+    FOR EACH ROW EXECUTE PROCEDURE articles_article_search_vector_update();
+
+CREATE INDEX articles_article_search_vector_gin
+    ON articles_article USING gin (search_vector);
+
+UPDATE articles_article SET title = title;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS articles_article_search_vector_gin;
+DROP TRIGGER IF EXISTS articles_article_search_vector_trigger ON articles_article;
+DROP FUNCTION IF EXISTS articles_article_search_vector_update();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_VECTOR_SQL)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_article_content_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_article_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleNgram',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=8)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ngrams', to='articles.article')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='articlengram',
+            constraint=models.UniqueConstraint(fields=('gram', 'article'), name='unique_article_ngram'),
+        ),
+    ]
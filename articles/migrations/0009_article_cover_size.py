@@ -0,0 +1,23 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_articlengram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='cover_original_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='cover_size',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
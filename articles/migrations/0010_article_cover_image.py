@@ -0,0 +1,20 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0003_responsive_image'),
+        ('articles', '0009_article_cover_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='cover_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='uploads.responsiveimage'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_article_cover_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-publish_at', '-id'], name='article_publish_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_article_publish_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_publish_at_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(is_active=True), fields=['-publish_at', '-id'], name='article_active_publish_idx'),
+        ),
+    ]
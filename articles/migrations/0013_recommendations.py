@@ -0,0 +1,42 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_active_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleTerms',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='terms', serialize=False, to='articles.article')),
+                ('signature', models.CharField(max_length=64)),
+                ('terms', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'article terms',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleRecommendation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='articles.article')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='articles.article')),
+            ],
+            options={
+                'ordering': ['article', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='articlerecommendation',
+            constraint=models.UniqueConstraint(fields=('article', 'rank'), name='unique_article_recommendation_rank'),
+        ),
+    ]
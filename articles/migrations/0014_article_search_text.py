@@ -0,0 +1,35 @@
+# Generated by Django 3.1.14 on 2026-10-18 02:26
+
+from django.db import migrations, models
+
+from articles.ngram import get_article_text
+
+
+def fill_search_text(apps, schema_editor):
+    Article = apps.get_model('articles', 'Article')
+    articles = Article.objects.only(
+        'title', 'description', 'content_html', 'keywords').iterator(chunk_size=200)
+    batch = []
+    for article in articles:
+        article.search_text = get_article_text(article)
+        batch.append(article)
+        if len(batch) == 200:
+            Article.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Article.objects.bulk_update(batch, ['search_text'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+    ]
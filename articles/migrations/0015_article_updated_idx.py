@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0014_article_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-updated'], name='article_updated_idx'),
+        ),
+    ]
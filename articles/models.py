@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import Q
 from django.urls import reverse
@@ -7,15 +8,19 @@ from django.utils import timezone
 
 from cloudinary_storage.storage import VideoMediaCloudinaryStorage, MediaCloudinaryStorage
 from cloudinary_storage.validators import validate_video
-from martor.utils import markdownify
+from django_cleanup import cleanup
 from martor.models import MartorField
-from bs4 import BeautifulSoup
 
-from core.additional.models import CoreModel
+from core.additional.models import CoreModel, CoreQuerySet
 from tags.models import Tag
+from uploads.blobs import get_content_name
+from uploads.models import Upload
+from .rendering import add_responsive_images, analyze_html, get_content_hash, get_renderer_version, render_markdown
+from .ngram import get_article_text, get_candidate_ids, get_terms, has_cjk, is_indexable_query
+from .search import contains_search, full_text_search, supports_full_text_search
 
 
-class ArticleQuerySet(models.QuerySet):
+class ArticleQuerySet(CoreQuerySet):
     """
     custom QuerySet for model Article
     """
@@ -45,14 +50,10 @@ class ArticleQuerySet(models.QuerySet):
         queryset = self.filter(lookup)
         return queryset
 
-    def search(self, query: str):
+    def scheduled(self):
         """
-        filter objects that is,
-        1. is_active is True
-        2. publish_at is  over the current datetime
-        3. query is contained in title
-        4. query is contained in content
-        5. query is contained in description
+        return active objects that will be published in the future,
+        ordered by publish_at
 
         Returns:
             queryset: return all objects that meats the lookup
@@ -60,12 +61,61 @@ class ArticleQuerySet(models.QuerySet):
         now = timezone.now()
         lookup: Q = (
             Q(is_active=True) &
-            Q(publish_at__lte=now) &
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(content__icontains=query)
+            Q(publish_at__gt=now)
         )
-        queryset = self.filter(lookup)
+        return self.filter(lookup).order_by('publish_at')
+
+    def search(self, query: str):
+        """
+        filter objects that is,
+        1. is_active is True
+        2. publish_at is  over the current datetime
+        3. query matches title, description or content
+
+        Returns:
+            queryset: return all objects that meats the lookup
+        """
+        return self.published().matching(query)
+
+    def matching(self, query: str):
+        """
+        filter objects that match the query without
+        restricting them to published objects.
+        on postgresql the search_vector column is used for queries
+        without japanese and objects are ordered by relevance
+        (title > description > content).
+        japanese queries, and every query on other databases,
+        use the n-gram index. candidates from the index are checked
+        again against search_text to drop grams that matched out of order.
+        queries shorter than a gram fall back to icontains lookups.
+
+        Args:
+            query (str): user input query
+
+        Returns:
+            queryset: return all objects that match the query
+        """
+        if supports_full_text_search(self.db) and not has_cjk(query):
+            return full_text_search(self, query)
+        if is_indexable_query(query):
+            return self.ngram_search(query)
+        return contains_search(self, query)
+
+    def ngram_search(self, query: str):
+        """
+        filter objects with the n-gram index.
+        the normalized terms are checked against search_text, the normalized text
+        the index is built from, so full-width and half-width forms find the same objects.
+
+        Args:
+            query (str): user input query
+
+        Returns:
+            queryset: return all objects that match the query
+        """
+        queryset = self.filter(pk__in=get_candidate_ids(query))
+        for term in get_terms(query):
+            queryset = queryset.filter(search_text__contains=term)
         return queryset
 
     def all_related(self):
@@ -112,6 +162,15 @@ class ArticleManager(models.Manager):
         queryset = self.get_queryset().published()
         return queryset
 
+    def scheduled(self):
+        """
+        call .scheduled() from ArticleQuerySet
+
+        Returns:
+            queryset: return queryset returned from ArticleQuerySet.scheduled()
+        """
+        return self.get_queryset().scheduled()
+
     def search(self, query=None):
         """
         call .search() from ArticleQuerySet
@@ -139,26 +198,29 @@ class ArticleManager(models.Manager):
 
 def upload_image_to(instance, filename):
     """
-    custom path for saving images
+    custom path for saving images.
+    images are named after their content, see uploads.blobs.
 
     Returns:
         str: image path
     """
-    asset_path = f'article/{str(instance.title)}/images/{filename}'
+    asset_path = f'article/images/{get_content_name(instance.cover, filename)}'
     return asset_path
 
 
 def upload_video_to(instance, filename):
     """
-    custom path for saving videos
+    custom path for saving videos.
+    videos are named after their content, see uploads.blobs.
 
     Returns:
         str: video path
     """
-    asset_path = f'article/{str(instance.title)}/video/{filename}'
+    asset_path = f'article/video/{get_content_name(instance.video, filename)}'
     return asset_path
 
 
+@cleanup.ignore
 class Article(CoreModel):
     """
     A model for representing each article for the blog.
@@ -168,6 +230,9 @@ class Article(CoreModel):
         tags (ManyToManyField): many-to-many relation to set tags to object
         video (FileField): field for video files. saved to cloudinary
         cover (ImageField): field for image files. saved to cloudinary
+        cover_original_size (PositiveBigIntegerField): size in bytes of the cover as uploaded
+        cover_size (PositiveBigIntegerField): size in bytes of the cover after optimization
+        cover_image (ForeignKey): intrinsic size and derivatives of the cover. set by a task
         title (CharField): field for article title. max length to 255. this field needs to be unique
         slug (SlugField): field for article slug. used for routing
         description (TextField): field for article description.
@@ -175,11 +240,23 @@ class Article(CoreModel):
         related_article (ManyToManyField): many-to-many relation to set self as related articles
         keywords (CharField): field for article keyword. this is used for SEO.
         publish_at (DateTimeField) field for article publish datetime.
+        content_html (TextField): html rendered from content. refreshed on save.
+        content_hash (CharField): sha256 of the content that content_html was rendered from
+        renderer_version (CharField): version of the markdown renderer used for content_html
+        text_count (PositiveIntegerField): number of characters in content_html without tags
+        img_count (PositiveIntegerField): number of img tags in content_html
+        reading_time (PositiveIntegerField): estimated reading time in minutes
+        search_vector (SearchVectorField): weighted tsvector of title, description and content.
+                                           maintained by a database trigger on postgresql.
+        search_text (TextField): normalized text of title, description, rendered text and keywords.
+                                 refreshed on save, checks the candidates of the n-gram index
         objects (ArticleManager): set custom Manager to model
 
     Note:
         because ImageField and DateTimeField saves string in 
         the database, null=True is not necessary.
+        cover and video files can be shared by several articles,
+        so django_cleanup ignores this model and `sweep_blobs` deletes unused files.
     """
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
     tags = models.ManyToManyField(Tag, blank=True)
@@ -187,6 +264,13 @@ class Article(CoreModel):
                              storage=VideoMediaCloudinaryStorage(), validators=[validate_video])
     cover = models.ImageField(
         upload_to=upload_image_to, blank=True, null=True, storage=MediaCloudinaryStorage())
+    cover_original_size = models.PositiveBigIntegerField(
+        null=True, blank=True, editable=False)
+    cover_size = models.PositiveBigIntegerField(
+        null=True, blank=True, editable=False)
+    cover_image = models.ForeignKey(
+        'uploads.ResponsiveImage', on_delete=models.SET_NULL,
+        null=True, blank=True, editable=False, related_name='+')
     title = models.CharField(max_length=255, unique=True)
     slug = models.SlugField(unique=True)
     description = models.TextField()
@@ -196,15 +280,44 @@ class Article(CoreModel):
     keywords = models.CharField('記事のキーワード', max_length=255, default='プログラミング')
     publish_at = models.DateTimeField(
         auto_now=False, auto_now_add=False, blank=True, null=True)
+    content_html = models.TextField(blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    renderer_version = models.CharField(
+        max_length=64, blank=True, editable=False)
+    text_count = models.PositiveIntegerField(default=0, editable=False)
+    img_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(blank=True, editable=False)
 
     objects = ArticleManager()
 
+    RENDERED_FIELDS = (
+        'content_html',
+        'content_hash',
+        'renderer_version',
+        'text_count',
+        'img_count',
+        'reading_time',
+    )
+
     class Meta:
         """
         Attributes:
             ordering (List): use to determine the ordering of model objects when listed
+            indexes (List): every list reads active objects by publish_at,
+                            so (-publish_at, -id) is indexed for active objects only.
+                            it serves published(), all(), scheduled() and the
+                            keyset pagination of the article list.
+                            check_query_plans verifies the plans that rely on it.
+                            updated is indexed for the validators of the article list
         """
         ordering = ['-publish_at', '-timestamp', '-updated', ]
+        indexes = [
+            models.Index(fields=['-publish_at', '-id'], name='article_active_publish_idx',
+                         condition=Q(is_active=True)),
+            models.Index(fields=['-updated'], name='article_updated_idx'),
+        ]
 
     def __str__(self):
         """
@@ -216,6 +329,74 @@ class Article(CoreModel):
         """
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        render the markdown content before saving when the stored
+        html is stale, so views can serve content_html as is.
+        the search text is refreshed with it.
+        provisional urls of transferred uploads are replaced with their stored url first,
+        the pending ones are linked to the article so their transfer rewrites it.
+        """
+        update_fields = kwargs.get('update_fields')
+        pending_uploads = set()
+        if update_fields is None or 'content' in update_fields:
+            self.content, pending_uploads = Upload.objects.resolve_links(self.content)
+        if self.is_rendered_stale:
+            self.render_content()
+            if update_fields is not None:
+                update_fields = {*update_fields, *self.RENDERED_FIELDS}
+        self.search_text = get_article_text(self)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+        if pending_uploads:
+            Upload.objects.link_articles(self, pending_uploads)
+
+    @property
+    def is_rendered_stale(self):
+        """
+        whether content_html has to be rendered again.
+        it is stale when the content or the renderer configuration
+        changed after it was rendered.
+
+        Returns:
+            bool: True if content_html is out of date
+        """
+        return (
+            self.content_hash != get_content_hash(self.content) or
+            self.renderer_version != get_renderer_version()
+        )
+
+    def render_content(self):
+        """
+        render content to html, analyze the html once
+        and set the rendered fields.
+        this does not save the object.
+        """
+        self.content_html = add_responsive_images(render_markdown(self.content))
+        self.content_hash = get_content_hash(self.content)
+        self.renderer_version = get_renderer_version()
+        for field, value in analyze_html(self.content_html).items():
+            setattr(self, field, value)
+
+    def refresh_rendered_content(self):
+        """
+        render content and store only the rendered fields and the search text.
+        uses update() so the updated timestamp is left untouched.
+        """
+        self.render_content()
+        self.search_text = get_article_text(self)
+        Article.objects.filter(pk=self.pk).update(
+            search_text=self.search_text,
+            **{field: getattr(self, field) for field in self.RENDERED_FIELDS})
+
+    def ensure_rendered(self):
+        """
+        render the content again in case the stored fields are stale.
+        """
+        if self.is_rendered_stale:
+            self.refresh_rendered_content()
+
     def get_absolute_url(self):
         """
         determine to absolute url of the model.
@@ -226,14 +407,14 @@ class Article(CoreModel):
     def get_markdown(self):
         """
         return a cleaned html.
-        in case there is a markdown we use markdown package to convert them to html.
+        the html is rendered on save and stored in content_html.
+        in case the stored html is stale it is rendered again and stored.
 
         Returns:
             str: string of safe html
         """
-        content = self.content
-        markdown_content = markdownify(content)
-        return mark_safe(markdown_content)
+        self.ensure_rendered()
+        return mark_safe(self.content_html)
 
     def get_description(self):
         """
@@ -250,40 +431,200 @@ class Article(CoreModel):
     def get_text_count(self):
         """
         count strings in html.
-        using BeautifulSoup4 to sanitize html tags.
+        the count is computed on save and stored in text_count.
 
         Returns:
-            int: length of the string after sanitized by BeautifulSoup4
+            int: length of the string after the html tags are stripped
         """
-        content = self.content
-        markdown_content = markdownify(content)
-        souped = BeautifulSoup(markdown_content, features="html.parser").findAll(
-            text=True
-        )
-        stripted_text = "".join(souped).replace(" ", "")
-        return len(stripted_text)
+        self.ensure_rendered()
+        return self.text_count
 
     def get_img_count(self):
         """
         count img tags in html.
-        using BeautifulSoup4 search through html.
+        the count is computed on save and stored in img_count.
 
         Returns:
-            int: length of the images after filtering through using BeautifulSoup4
+            int: number of images in the html
         """
-        content = self.content
-        markdown_content = markdownify(content)
-        img_tags = BeautifulSoup(markdown_content, features="html.parser").find_all(
-            "img"
-        )
-        return len(img_tags)
+        self.ensure_rendered()
+        return self.img_count
+
+    def get_reading_time(self):
+        """
+        estimated reading time of the article.
+        the estimate is computed on save and stored in reading_time.
+
+        Returns:
+            int: reading time in minutes
+        """
+        self.ensure_rendered()
+        return self.reading_time
 
     @property
     def is_series_summary(self):
-        return 'Series' in [tag.name for tag in self.tags.all()]
+        """
+        whether the article is tagged with 'Series'.
+        uses active_tags when it was prefetched by the view.
+
+        Returns:
+            bool: True if the article is a series summary
+        """
+        tags = getattr(self, 'active_tags', None)
+        if tags is None:
+            tags = self.tags.all()
+        return 'Series' in [tag.name for tag in tags]
+
+    @property
+    def suggested_articles(self):
+        """
+        computed suggestions that are not already linked by hand.
+        uses recommendation_list and related_article_list prefetched by the view.
+
+        Returns:
+            List[Article]: suggested articles, most similar first
+        """
+        related = {article.pk for article in getattr(self, 'related_article_list', [])}
+        return [recommendation.recommended
+                for recommendation in getattr(self, 'recommendation_list', [])
+                if recommendation.recommended_id not in related]
 
     @property
     def is_published(self):
         if self.publish_at is None:
             return False
         return timezone.now() > self.publish_at
+
+
+class ArticleNgram(models.Model):
+    """
+    A posting of the n-gram inverted index used for japanese search.
+    one row exists for each gram of each active article.
+
+    Attributes:
+        gram (CharField): normalized gram
+        article (ForeignKey): article that contains the gram
+    """
+    gram = models.CharField(max_length=8)
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='ngrams')
+
+    class Meta:
+        """
+        Attributes:
+            constraints (List): the unique constraint also serves as the
+                                (gram, article) index used to read posting lists
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=['gram', 'article'], name='unique_article_ngram'),
+        ]
+
+    def __str__(self):
+        return self.gram
+
+
+class ArticleTerms(models.Model):
+    """
+    the weighted terms of a published article, kept by `update_recommendations`
+    so only the articles whose signature changed are tokenized again.
+
+    Attributes:
+        article (OneToOneField): published article
+        signature (CharField): sha256 of everything the terms are built from
+        terms (JSONField): weighted count of each term
+    """
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, primary_key=True, related_name='terms')
+    signature = models.CharField(max_length=64)
+    terms = models.JSONField(default=dict)
+
+    class Meta:
+        verbose_name_plural = 'article terms'
+
+    def __str__(self):
+        return str(self.article_id)
+
+
+class ArticleRecommendationQuerySet(models.QuerySet):
+    """
+    custom QuerySet for model ArticleRecommendation
+    """
+
+    def published(self):
+        """
+        suggestions of articles that are still published,
+        with the suggested article joined.
+
+        Returns:
+            queryset: suggestions ordered by rank
+        """
+        now = timezone.now()
+        lookup: Q = (
+            Q(recommended__is_active=True) &
+            Q(recommended__publish_at__lte=now)
+        )
+        return self.filter(lookup).select_related('recommended').order_by('rank')
+
+
+class ArticleRecommendationManager(models.Manager):
+    """
+    custom manager for model ArticleRecommendation using ArticleRecommendationQuerySet
+    """
+
+    def get_queryset(self):
+        """
+        set custom QuerySet to use in manager
+
+        Returns:
+            ArticleRecommendationQuerySet: return ArticleRecommendationQuerySet
+                                           using model ArticleRecommendation
+        """
+        return ArticleRecommendationQuerySet(self.model, using=self._db)
+
+    def published(self):
+        """
+        call .published() from ArticleRecommendationQuerySet
+
+        Returns:
+            queryset: return queryset returned from ArticleRecommendationQuerySet.published()
+        """
+        return self.get_queryset().published()
+
+
+class ArticleRecommendation(models.Model):
+    """
+    an article suggested on the page of another article,
+    ranked by the cosine similarity of their tf-idf vectors.
+
+    Attributes:
+        article (ForeignKey): article the suggestion is shown on
+        recommended (ForeignKey): suggested article
+        rank (PositiveSmallIntegerField): position in the suggestions, from 0
+        score (FloatField): cosine similarity of the two articles
+        objects (ArticleRecommendationManager): set custom Manager to model
+    """
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    objects = ArticleRecommendationManager()
+
+    class Meta:
+        """
+        Attributes:
+            ordering (List): use to determine the ordering of model objects when listed
+            constraints (List): the unique constraint also serves as the
+                                (article, rank) index the article page reads
+        """
+        ordering = ['article', 'rank']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'rank'], name='unique_article_recommendation_rank'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id} -> {self.recommended_id}'
@@ -0,0 +1,176 @@
+import re
+import unicodedata
+
+from django.db.models import Count
+
+from .rendering import CJK_PATTERN, get_plain_text
+
+# length of the grams stored in the index.
+# bigrams are the usual choice for japanese, every query of
+# two characters or more can be answered from the index.
+GRAM_SIZE = 2
+
+SEPARATOR_PATTERN = re.compile(r'[\s　-。・，．]+')
+
+
+def normalize(text):
+    """
+    normalize text for the index.
+    NFKC folds full-width latin and half-width katakana,
+    lowercase makes the index case insensitive.
+
+    Args:
+        text (str): raw text
+
+    Returns:
+        str: normalized text
+    """
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def get_terms(text):
+    """
+    split normalized text on whitespace and japanese punctuation.
+    grams never cross a separator.
+
+    Args:
+        text (str): raw text
+
+    Returns:
+        List[str]: terms of the text
+    """
+    return [term for term in SEPARATOR_PATTERN.split(normalize(text)) if term]
+
+
+def get_grams(text):
+    """
+    build the set of grams of a text.
+
+    Args:
+        text (str): raw text
+
+    Returns:
+        Set[str]: grams of the text
+    """
+    grams = set()
+    for term in get_terms(text):
+        if len(term) < GRAM_SIZE:
+            continue
+        grams.update(term[i:i + GRAM_SIZE]
+                     for i in range(len(term) - GRAM_SIZE + 1))
+    return grams
+
+
+def get_article_text(article):
+    """
+    normalized text of an article, the text the index is built from.
+    title, description, rendered text and keywords are indexed.
+    it is stored in Article.search_text to check the candidates of the index.
+
+    Args:
+        article (Article): article to index
+
+    Returns:
+        str: normalized text of the article
+    """
+    texts = [
+        article.title,
+        article.description,
+        get_plain_text(article.content_html),
+        article.keywords,
+    ]
+    return normalize(' '.join(text or '' for text in texts))
+
+
+def get_article_grams(article):
+    """
+    build the set of grams indexed for an article.
+
+    Args:
+        article (Article): article to index
+
+    Returns:
+        Set[str]: grams of the article
+    """
+    return get_grams(get_article_text(article))
+
+
+def index_article(article):
+    """
+    update the postings and the search text of an article.
+    only the grams that were added or removed since the
+    last update are written. inactive articles are removed from the index.
+    the search text is written only when it is stale, Article.save sets it.
+
+    Args:
+        article (Article): article to index
+    """
+    from .models import Article, ArticleNgram
+
+    postings = ArticleNgram.objects.filter(article_id=article.pk)
+    if not article.is_active:
+        postings.delete()
+        return
+    text = get_article_text(article)
+    if article.search_text != text:
+        article.search_text = text
+        Article._base_manager.filter(pk=article.pk).update(search_text=text)
+    grams = get_grams(text)
+    indexed = set(postings.values_list('gram', flat=True))
+    removed = indexed - grams
+    if removed:
+        postings.filter(gram__in=removed).delete()
+    ArticleNgram.objects.bulk_create(
+        [ArticleNgram(article_id=article.pk, gram=gram)
+         for gram in grams - indexed],
+        batch_size=500)
+
+
+def is_indexable_query(query):
+    """
+    whether every term of the query is long enough to be answered from the index.
+
+    Args:
+        query (str): user input query
+
+    Returns:
+        bool: True if the index can be used
+    """
+    terms = get_terms(query)
+    return bool(terms) and all(len(term) >= GRAM_SIZE for term in terms)
+
+
+def has_cjk(query):
+    """
+    Args:
+        query (str): user input query
+
+    Returns:
+        bool: True if the query contains japanese characters
+    """
+    return bool(CJK_PATTERN.search(normalize(query)))
+
+
+def get_candidate_ids(query):
+    """
+    intersect the posting lists of every gram in the query.
+    an article is a candidate only when it has all the grams.
+    the intersection runs on the (gram, article) index, so its cost
+    depends on the length of the posting lists instead of the number of articles.
+
+    Args:
+        query (str): user input query
+
+    Returns:
+        queryset: values queryset of candidate article ids
+    """
+    from .models import ArticleNgram
+
+    grams = get_grams(query)
+    return ArticleNgram.objects.filter(gram__in=grams).values(
+        'article_id'
+    ).annotate(
+        gram_count=Count('gram')
+    ).filter(
+        gram_count=len(grams)
+    ).values('article_id')
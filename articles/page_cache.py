@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.utils import timezone
+
+# dependency keys of the cached article pages
+ARTICLE_LIST = 'article-list'
+TAG_LIST = 'tag-list'
+
+
+def article_key(pk):
+    return f'article:{pk}'
+
+
+def tag_key(pk):
+    return f'tag:{pk}'
+
+
+def comments_key(article_pk):
+    return f'comments:{article_pk}'
+
+
+def get_page_timeout():
+    """
+    pages have to expire when the next scheduled article is published,
+    because publishing does not save the article and no signal is sent.
+
+    Returns:
+        int: seconds until the next publish_at, capped at PAGE_CACHE_TIMEOUT
+    """
+    from .models import Article
+
+    next_publish_at = Article.objects.scheduled().values_list(
+        'publish_at', flat=True).first()
+    if next_publish_at is None:
+        return settings.PAGE_CACHE_TIMEOUT
+    seconds = int((next_publish_at - timezone.now()).total_seconds()) + 1
+    return max(0, min(seconds, settings.PAGE_CACHE_TIMEOUT))
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+
+import numpy as np
+from scipy import sparse
+
+from .models import Article, ArticleRecommendation, ArticleTerms
+from .ngram import GRAM_SIZE, get_terms
+from .page_cache import article_key
+from .rendering import CJK_PATTERN, get_plain_text
+from core.additional.page_cache import invalidate
+
+# bump when tokenize or get_article_terms changes so every article is tokenized again
+TERMS_VERSION = '1'
+
+
+@dataclass
+class RecommendationResult:
+    """
+    result of update_recommendations.
+
+    Attributes:
+        articles (int): number of published articles
+        tokenized (List): articles whose terms were built again
+        removed (List): articles that are not published anymore
+        recomputed (List): articles whose suggestions were computed again
+        updated (List): articles whose stored suggestions changed
+    """
+    articles: int = 0
+    tokenized: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    recomputed: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+
+
+def tokenize(text):
+    """
+    split text into terms. space separated words are terms as they are,
+    japanese runs are split into grams like the search index.
+
+    Args:
+        text (str): raw text
+
+    Returns:
+        List[str]: terms of the text
+    """
+    tokens = []
+    for term in get_terms(text):
+        if CJK_PATTERN.search(term):
+            tokens.extend(term[i:i + GRAM_SIZE]
+                          for i in range(max(len(term) - GRAM_SIZE + 1, 1)))
+        elif len(term) > 1:
+            tokens.append(term)
+    return tokens
+
+
+def get_signature(article, tag_names):
+    """
+    Args:
+        article (dict): values of the article
+        tag_names (List[str]): names of its active tags
+
+    Returns:
+        str: sha256 of everything the terms of the article are built from
+    """
+    source = json.dumps([
+        TERMS_VERSION, settings.RECOMMENDATION_WEIGHTS, article['content_hash'],
+        article['title'], article['description'], article['keywords'], sorted(tag_names),
+    ], ensure_ascii=False)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def get_article_terms(article, tag_names, content_html):
+    """
+    count the terms of an article. the rendered text counts once,
+    the other parts are counted RECOMMENDATION_WEIGHTS times.
+    tags are terms of their own so they only match the same tag.
+
+    Args:
+        article (dict): values of the article
+        tag_names (List[str]): names of its active tags
+        content_html (str): rendered content
+
+    Returns:
+        Dict[str, int]: weighted count of each term
+    """
+    weights = settings.RECOMMENDATION_WEIGHTS
+    terms = Counter(tokenize(get_plain_text(content_html)))
+    for part in ('title', 'description', 'keywords'):
+        for term in tokenize(article[part]):
+            terms[term] += weights[part]
+    for name in tag_names:
+        terms[f'#{name.lower()}'] += weights['tags']
+    return dict(terms)
+
+
+def build_matrix(terms_list):
+    """
+    build the l2 normalized tf-idf matrix of the articles.
+    term frequencies are sublinear (1 + log tf) and idf is smoothed,
+    so the dot product of two rows is their cosine similarity.
+
+    Args:
+        terms_list (List[Dict[str, int]]): weighted terms of each article
+
+    Returns:
+        csr_matrix: one row per article
+    """
+    vocabulary = {}
+    rows, columns, values = [], [], []
+    for row, terms in enumerate(terms_list):
+        for term, count in terms.items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            values.append(1 + math.log(count))
+    shape = (len(terms_list), len(vocabulary))
+    matrix = sparse.csr_matrix(
+        (np.array(values, dtype=np.float64), (rows, columns)), shape=shape)
+    document_frequency = np.bincount(matrix.indices, minlength=shape[1])
+    idf = np.log((1 + shape[0]) / (1 + document_frequency)) + 1
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def get_top_neighbors(matrix, rows, count, min_score):
+    """
+    find the most similar articles of some rows, batch by batch,
+    so only RECOMMENDATION_BATCH_SIZE dense rows of similarities exist at once.
+
+    Args:
+        matrix (csr_matrix): matrix of build_matrix
+        rows (List[int]): rows to find neighbors for
+        count (int): number of neighbors of each row
+        min_score (float): neighbors below this similarity are dropped
+
+    Returns:
+        Dict[int, List[Tuple[int, float]]]: neighbor rows and scores, most similar first
+    """
+    neighbors = {}
+    batch_size = settings.RECOMMENDATION_BATCH_SIZE
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        scores = (matrix[batch] @ matrix.T).toarray()
+        scores[np.arange(len(batch)), batch] = 0
+        size = min(count, scores.shape[1])
+        top = np.argpartition(-scores, size - 1, axis=1)[:, :size] if size else []
+        for index, row in enumerate(batch):
+            ranked = sorted(((int(column), float(scores[index, column]))
+                             for column in top[index]), key=lambda item: (-item[1], item[0]))
+            neighbors[row] = [(column, score) for column, score in ranked
+                              if score >= min_score]
+    return neighbors
+
+
+def get_affected_rows(matrix, changed_rows, stored, ids, gone, count):
+    """
+    find the unchanged articles whose suggestions may change
+    after some articles changed: the ones that suggest a changed or removed
+    article, and the ones a changed article now beats the last suggestion of.
+
+    Args:
+        matrix (csr_matrix): matrix of build_matrix
+        changed_rows (List[int]): rows of the changed articles
+        stored (Dict[UUID, List[Tuple[UUID, float]]]): stored suggestions of each article
+        ids (List[UUID]): article of each row
+        gone (Set[UUID]): changed and removed articles
+        count (int): number of suggestions of each article
+
+    Returns:
+        Set[int]: rows to compute again
+    """
+    affected = set()
+    best = np.zeros(matrix.shape[0])
+    batch_size = settings.RECOMMENDATION_BATCH_SIZE
+    for start in range(0, len(changed_rows), batch_size):
+        batch = changed_rows[start:start + batch_size]
+        best = np.maximum(best, (matrix[batch] @ matrix.T).toarray().max(axis=0))
+    for row, article_id in enumerate(ids):
+        suggestions = stored.get(article_id, [])
+        if any(recommended in gone for recommended, _ in suggestions):
+            affected.add(row)
+            continue
+        threshold = settings.RECOMMENDATION_MIN_SCORE
+        if len(suggestions) >= count:
+            threshold = suggestions[-1][1]
+        if best[row] > threshold:
+            affected.add(row)
+    return affected
+
+
+def update_recommendations(full=False):
+    """
+    tokenize the published articles that changed, then compute and store the
+    suggestions of the articles they can affect.
+    idf weights move a little with every article, so unaffected articles keep
+    suggestions computed with older weights until a full run.
+
+    Args:
+        full (bool): tokenize and compute every article again
+
+    Returns:
+        RecommendationResult: what was updated
+    """
+    result = RecommendationResult()
+    articles = {article['pk']: article for article in Article.objects.published().order_by(
+        'pk').values('pk', 'title', 'description', 'keywords', 'content_hash')}
+    result.articles = len(articles)
+    tag_names = defaultdict(list)
+    links = Article.tags.through.objects.filter(
+        article__in=Article.objects.published(), tag__is_active=True,
+    ).values_list('article_id', 'tag__name')
+    for article_id, name in links:
+        tag_names[article_id].append(name)
+    stored_terms = {terms.article_id: terms for terms in ArticleTerms.objects.all()}
+    result.removed = [article_id for article_id in stored_terms if article_id not in articles]
+
+    changed = {}
+    for article in articles.values():
+        signature = get_signature(article, tag_names[article['pk']])
+        terms = stored_terms.get(article['pk'])
+        if full or terms is None or terms.signature != signature:
+            changed[article['pk']] = signature
+    content = Article.objects.filter(pk__in=changed).values_list('pk', 'content_html')
+    changed_terms = []
+    for article_id, content_html in content.iterator():
+        changed_terms.append(ArticleTerms(
+            article_id=article_id, signature=changed[article_id],
+            terms=get_article_terms(articles[article_id], tag_names[article_id], content_html)))
+    result.tokenized = list(changed)
+
+    with transaction.atomic():
+        ArticleTerms.objects.filter(article_id__in=result.removed).delete()
+        ArticleRecommendation.objects.filter(article_id__in=result.removed).delete()
+        ArticleTerms.objects.filter(article_id__in=changed).delete()
+        ArticleTerms.objects.bulk_create(changed_terms, batch_size=500)
+    if not articles or (not changed and not result.removed):
+        invalidate(*[article_key(article_id) for article_id in result.removed])
+        return result
+    for terms in changed_terms:
+        stored_terms[terms.article_id] = terms
+
+    ids = list(articles)
+    rows = {article_id: row for row, article_id in enumerate(ids)}
+    matrix = build_matrix([stored_terms[article_id].terms for article_id in ids])
+    count = settings.RECOMMENDATION_COUNT
+    stored = defaultdict(list)
+    for recommendation in ArticleRecommendation.objects.order_by('article', 'rank'):
+        stored[recommendation.article_id].append(
+            (recommendation.recommended_id, recommendation.score))
+    if full:
+        recompute = list(range(len(ids)))
+    else:
+        changed_rows = [rows[article_id] for article_id in changed]
+        gone = set(changed) | set(result.removed)
+        recompute = sorted(set(changed_rows) | get_affected_rows(
+            matrix, changed_rows, stored, ids, gone, count))
+    neighbors = get_top_neighbors(matrix, recompute, count, settings.RECOMMENDATION_MIN_SCORE)
+    result.recomputed = [ids[row] for row in recompute]
+
+    with transaction.atomic():
+        for row, suggestions in neighbors.items():
+            article_id = ids[row]
+            suggestions = [(ids[column], score) for column, score in suggestions]
+            if [(recommended, round(score, 6)) for recommended, score in suggestions] == [
+                    (recommended, round(score, 6)) for recommended, score in stored[article_id]]:
+                continue
+            ArticleRecommendation.objects.filter(article_id=article_id).delete()
+            ArticleRecommendation.objects.bulk_create([
+                ArticleRecommendation(article_id=article_id, recommended_id=recommended,
+                                      rank=rank, score=score)
+                for rank, (recommended, score) in enumerate(suggestions)
+            ])
+            result.updated.append(article_id)
+    invalidate(*[article_key(article_id) for article_id in result.updated + result.removed])
+    return result
@@ -0,0 +1,175 @@
+import hashlib
+import math
+import re
+from functools import lru_cache
+from importlib import metadata
+
+from django.conf import settings
+
+import markdown
+from bs4 import BeautifulSoup
+from martor.utils import markdownify
+
+# bump when analyze_html or add_responsive_images changes
+# so stored html and statistics are computed again
+ANALYSIS_VERSION = '2'
+
+# characters per minute for japanese text and words per minute for
+# space separated text. japanese readers read about 400-600 characters a minute.
+CJK_CHARS_PER_MINUTE = 500
+WORDS_PER_MINUTE = 200
+
+CJK_PATTERN = re.compile(
+    r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]')
+WORD_PATTERN = re.compile(r'[^\s\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf'
+                          r'\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]+')
+
+
+def get_content_hash(content):
+    """
+    hash the raw markdown of an article.
+    used to tell whether the stored html still matches the content.
+
+    Args:
+        content (str): markdown content
+
+    Returns:
+        str: sha256 hex digest of the content
+    """
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+def _get_package_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ''
+
+
+@lru_cache(maxsize=None)
+def get_renderer_version():
+    """
+    build a version string for the markdown renderer.
+    the version changes whenever the extension chain in
+    core/configs/martor.py or the markdown/martor packages change,
+    so rows rendered with an older configuration can be detected.
+    both only change on a deploy, so it is computed once per process
+    instead of reading the package metadata on every save.
+
+    Returns:
+        str: sha256 hex digest of the renderer configuration
+    """
+    extensions = getattr(settings, 'MARTOR_MARKDOWN_EXTENSIONS', [])
+    extension_configs = getattr(
+        settings, 'MARTOR_MARKDOWN_EXTENSION_CONFIGS', {})
+    signature = '|'.join([
+        markdown.__version__,
+        _get_package_version('martor'),
+        ','.join(extensions),
+        repr(sorted(extension_configs.items())),
+        ANALYSIS_VERSION,
+    ])
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+
+def render_markdown(content):
+    """
+    convert markdown to html using martor's markdownify
+    with the MARTOR_MARKDOWN_EXTENSIONS chain.
+
+    Args:
+        content (str): markdown content
+
+    Returns:
+        str: rendered html
+    """
+    return markdownify(content or '')
+
+
+def add_responsive_images(html):
+    """
+    make the img tags of rendered html responsive.
+    every image is loaded lazily, and images with a ResponsiveImage
+    get their intrinsic width/height, srcset and sizes.
+
+    Args:
+        html (str): rendered html
+
+    Returns:
+        str: html with updated img tags
+    """
+    from uploads.models import ResponsiveImage
+
+    if '<img' not in html:
+        return html
+    souped = BeautifulSoup(html, features='html.parser')
+    images = souped.find_all('img')
+    sources = {image.get('src') for image in images if image.get('src')}
+    responsive_images = {
+        responsive_image.source: responsive_image
+        for responsive_image in ResponsiveImage.objects.filter(source__in=sources)}
+    for image in images:
+        image['loading'] = 'lazy'
+        image['decoding'] = 'async'
+        responsive_image = responsive_images.get(image.get('src'))
+        if responsive_image is None:
+            continue
+        image['width'] = responsive_image.width
+        image['height'] = responsive_image.height
+        if responsive_image.derivatives:
+            image['srcset'] = responsive_image.get_srcset()
+            image['sizes'] = responsive_image.get_sizes()
+    return str(souped)
+
+
+def get_reading_time(text):
+    """
+    estimate the reading time of a text in minutes.
+    japanese characters are counted one by one and
+    other text is counted by words.
+
+    Args:
+        text (str): plain text
+
+    Returns:
+        int: reading time in minutes. 0 if there is no text
+    """
+    cjk_count = len(CJK_PATTERN.findall(text))
+    word_count = len(WORD_PATTERN.findall(text))
+    minutes = cjk_count / CJK_CHARS_PER_MINUTE + word_count / WORDS_PER_MINUTE
+    return math.ceil(minutes)
+
+
+def get_plain_text(html):
+    """
+    strip the tags of rendered html.
+    text nodes are joined as they are, so inline markup does not split words.
+    blocks are already separated by the newlines of the rendered html.
+
+    Args:
+        html (str): rendered html
+
+    Returns:
+        str: text of the html
+    """
+    souped = BeautifulSoup(html, features='html.parser')
+    return ''.join(souped.find_all(text=True))
+
+
+def analyze_html(html):
+    """
+    compute the statistics of rendered html with a single parse.
+
+    Args:
+        html (str): rendered html
+
+    Returns:
+        dict: text_count, img_count and reading_time of the html
+    """
+    souped = BeautifulSoup(html, features='html.parser')
+    text = ''.join(souped.find_all(text=True))
+    return {
+        'text_count': len(text.replace(' ', '')),
+        'img_count': len(souped.find_all('img')),
+        'reading_time': get_reading_time(text),
+    }
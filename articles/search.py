@@ -0,0 +1,61 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
+
+# text search configuration used for the search_vector column.
+# 'simple' only lowercases tokens, stock configurations cannot stem japanese anyway.
+# the column is maintained by the trigger created in migration 0007,
+# which weights title (A) over description (B) over content (C).
+SEARCH_CONFIG = 'simple'
+
+
+def supports_full_text_search(using):
+    """
+    whether the database has the search_vector column maintained.
+    the column and its trigger only exist on postgresql.
+
+    Args:
+        using (str): database alias
+
+    Returns:
+        bool: True if the database is postgresql
+    """
+    return connections[using].vendor == 'postgresql'
+
+
+def full_text_search(queryset, query):
+    """
+    filter a queryset with the search_vector column and order by relevance.
+
+    Args:
+        queryset (ArticleQuerySet): queryset to filter
+        query (str): user input query
+
+    Returns:
+        queryset: matching objects ordered by rank
+    """
+    search_query = SearchQuery(
+        query, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(search_vector=search_query).annotate(
+        rank=SearchRank(F('search_vector'), search_query)
+    ).order_by('-rank', '-publish_at')
+
+
+def contains_search(queryset, query):
+    """
+    filter a queryset with icontains lookups.
+    used for databases without full text search.
+
+    Args:
+        queryset (ArticleQuerySet): queryset to filter
+        query (str): user input query
+
+    Returns:
+        queryset: matching objects
+    """
+    lookup: Q = (
+        Q(title__icontains=query) |
+        Q(description__icontains=query) |
+        Q(content__icontains=query)
+    )
+    return queryset.filter(lookup)
@@ -0,0 +1,142 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Article
+from .ngram import index_article
+from .page_cache import ARTICLE_LIST, TAG_LIST, article_key, comments_key, tag_key
+from core.additional.page_cache import invalidate
+from core.additional.signals import activity_changed
+from tags.tasks import refresh_tag_stats
+
+
+@receiver(post_save, sender=Article)
+def update_ngram_index(sender, instance, **kwargs):
+    """
+    keep the n-gram index in sync on every save, including soft deletes.
+    """
+    index_article(instance)
+
+
+@receiver(activity_changed, sender=Article)
+def update_ngram_index_in_bulk(sender, pks, **kwargs):
+    """
+    keep the n-gram index in sync after the admin
+    activates or deactivates articles in bulk.
+    """
+    for article in sender.objects.get_queryset().filter(pk__in=pks):
+        index_article(article)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article_pages(sender, instance, **kwargs):
+    """
+    an article appears on its own page, on the list
+    and on the pages of the articles it is related to.
+    """
+    invalidate(article_key(instance.pk), ARTICLE_LIST)
+
+
+@receiver(activity_changed, sender=Article)
+def invalidate_article_pages_in_bulk(sender, pks, **kwargs):
+    invalidate(ARTICLE_LIST, *[article_key(pk) for pk in pks])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_tagged_article_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    tags are shown on the article page.
+    reverse is True when the change was made from the tag side.
+    """
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        invalidate(*[article_key(pk) for pk in pk_set or []])
+    else:
+        invalidate(article_key(instance.pk))
+
+
+@receiver(m2m_changed, sender=Article.related_articles.through)
+def invalidate_related_article_pages(sender, instance, action, pk_set, **kwargs):
+    """
+    related_articles is symmetrical, both sides of the link show each other.
+    on clear the linked articles are only known before the rows are deleted.
+    """
+    if action == 'pre_clear':
+        pk_set = instance.related_articles.values_list('pk', flat=True)
+    elif action not in ('post_add', 'post_remove'):
+        return
+    invalidate(article_key(instance.pk), *[article_key(pk) for pk in pk_set])
+
+
+@receiver(post_save, sender='tags.Tag')
+@receiver(post_delete, sender='tags.Tag')
+def invalidate_tag_pages(sender, instance, **kwargs):
+    """
+    tags are shown as filters on the list and on each tagged article page.
+    """
+    invalidate(tag_key(instance.pk), TAG_LIST)
+
+
+@receiver(activity_changed, sender='tags.Tag')
+def invalidate_tag_pages_in_bulk(sender, pks, **kwargs):
+    invalidate(TAG_LIST, *[tag_key(pk) for pk in pks])
+
+
+@receiver(post_save, sender='comments.Comment')
+@receiver(post_delete, sender='comments.Comment')
+def invalidate_comment_pages(sender, instance, **kwargs):
+    invalidate(comments_key(instance.article_id))
+
+
+@receiver(activity_changed, sender='comments.Comment')
+def invalidate_comment_pages_in_bulk(sender, pks, **kwargs):
+    article_ids = set(sender._base_manager.filter(
+        pk__in=pks).values_list('article_id', flat=True))
+    invalidate(*[comments_key(article_id) for article_id in article_ids])
+
+
+@receiver(post_save, sender=Article)
+def refresh_tag_stats_on_save(sender, instance, created, **kwargs):
+    """
+    is_active and publish_at decide which tags count the article.
+    a new article has no tags yet, they are counted when they are added.
+    """
+    if not created:
+        refresh_tag_stats(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(activity_changed, sender=Article)
+def refresh_tag_stats_in_bulk(sender, pks, **kwargs):
+    refresh_tag_stats(sender.tags.through.objects.filter(
+        article_id__in=pks).values_list('tag_id', flat=True))
+
+
+@receiver(pre_delete, sender=Article)
+def remember_tags_before_delete(sender, instance, **kwargs):
+    """
+    the links to the tags are deleted with the article.
+    """
+    instance.deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Article)
+def refresh_tag_stats_on_delete(sender, instance, **kwargs):
+    refresh_tag_stats(getattr(instance, 'deleted_tag_ids', []))
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def refresh_tag_stats_on_tag_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    reverse is True when the change was made from the tag side.
+    on clear the tags are only known before the rows are deleted.
+    """
+    if reverse:
+        if action.startswith('post_'):
+            refresh_tag_stats([instance.pk])
+    elif action == 'pre_clear':
+        instance.cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_tag_stats(getattr(instance, 'cleared_tag_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_tag_stats(pk_set)
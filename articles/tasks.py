@@ -0,0 +1,67 @@
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from tasks.registry import task
+from uploads.tasks import create_responsive_image
+from uploads.models import Blob, ChunkedUpload
+from uploads.storage import get_spool_storage
+from .models import Article
+
+
+@task
+def create_cover_image(article_id):
+    """
+    generate the derivatives of the cover of an article
+    so the detail page can serve it with srcset.
+
+    Args:
+        article_id (str): primary key of the article
+    """
+    article = Article._base_manager.filter(pk=article_id).first()
+    if article is None or not article.cover:
+        return
+    with article.cover.open('rb') as file:
+        content = file.read()
+    folder = os.path.join(settings.MEDIA_URL, 'article/images/')
+    article.cover_image = create_responsive_image(
+        article.cover.url, content, os.path.basename(article.cover.name), folder)
+    article.save(update_fields=['cover_image'])
+
+
+@task
+def attach_video_upload(article_id, upload_id):
+    """
+    store a video sent in chunks as the video of an article
+    and delete the spooled file.
+    a video that was stored before is reused.
+
+    Args:
+        article_id (str): primary key of the article
+        upload_id (str): primary key of the complete ChunkedUpload
+    """
+    article = Article._base_manager.filter(pk=article_id).first()
+    upload = ChunkedUpload.objects.complete().filter(pk=upload_id).first()
+    if article is None or upload is None:
+        return
+    blob = Blob.objects.filter(
+        kind=Blob.VIDEO, sha256=upload.sha256).exclude(name='').first()
+    if blob is None:
+        with get_spool_storage().open(upload.spool_name, 'rb') as file:
+            article.video = File(file, name=upload.name)
+            article.save(update_fields=['video'])
+        Blob.objects.update_or_create(
+            kind=Blob.VIDEO, sha256=upload.sha256, defaults={
+                'name': article.video.name,
+                'url': article.video.url,
+                'size': upload.size,
+                'last_used_at': timezone.now(),
+            })
+    else:
+        blob.last_used_at = timezone.now()
+        blob.save(update_fields=['last_used_at'])
+        article.video = blob.name
+        article.save(update_fields=['video'])
+    upload.discard()
@@ -1,11 +1,34 @@
+import io
+import json
+import os
+import tempfile
 from http import HTTPStatus as status
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.shortcuts import reverse
+from django.utils import timezone
+from django.views.generic import DetailView
+from PIL import Image
 
-from .models import Article
+from .forms import ArticleForm
+from .page_cache import comments_key
+from .models import Article, ArticleNgram
+from .recommendations import update_recommendations
+from .views import ArticleDetailView, ArticleListView
+from comments.models import Comment
+from core.additional.page_cache import invalidate
+from core.additional.query_budget import QueryBudgetExceeded
 from tags.models import Tag
+from uploads.blobs import get_content_name
+from uploads.models import Blob
 
 
 """
@@ -65,10 +88,185 @@ class ArticleModelTestCase(TestCase):
         queryset = Article.objects.search('asdgdg')
         self.assertEqual(queryset.count(), 0)
 
+    def test_search_excludes_unpublished_and_inactive_objects(self):
+        Article.objects.create(
+            author=self.user,
+            title='hidden',
+            slug='hidden',
+            description='searchable description',
+            content='searchable content',
+            keywords='hidden',
+            publish_at='2020-01-01 00:00',
+            is_active=False,)
+        Article.objects.create(
+            author=self.user,
+            title='draft',
+            slug='draft',
+            description='searchable description',
+            content='searchable content',
+            keywords='draft',)
+        self.assertEqual(Article.objects.search('searchable').count(), 0)
+        self.assertEqual(Article.objects.all().matching('searchable').count(), 1)
+
+    def test_model_can_search_japanese(self):
+        article = Article.objects.create(
+            author=self.user,
+            title='日本語の記事',
+            slug='japanese',
+            description='説明文',
+            content='東京都でプログラミングを学ぶ',
+            keywords='勉強会',
+            publish_at='2020-01-01 00:00',)
+        self.assertEqual(list(Article.objects.search('プログラミング')), [article])
+        self.assertEqual(list(Article.objects.search('勉強会 東京')), [article])
+        self.assertEqual(Article.objects.search('京東').count(), 0)
+        article.is_active = False
+        article.save()
+        self.assertFalse(ArticleNgram.objects.filter(article=article).exists())
+        self.assertEqual(Article.objects.all().matching('プログラミング').count(), 0)
+
+    def test_model_can_search_compatibility_forms(self):
+        article = Article.objects.create(
+            author=self.user,
+            title='Djangoのテスト',
+            slug='compatibility',
+            description='説明文',
+            content='content',
+            keywords='keywords',
+            publish_at='2020-01-01 00:00',)
+        self.assertEqual(list(Article.objects.search('ＤＪＡＮＧＯ')), [article])
+        self.assertEqual(list(Article.objects.search('ﾃｽﾄ')), [article])
+        full_width = Article.objects.create(
+            author=self.user,
+            title='ＤＪＡＮＧＯのテスト',
+            slug='full-width',
+            description='説明文',
+            content='content',
+            keywords='keywords',
+            publish_at='2020-01-01 00:00',)
+        half_width = Article.objects.create(
+            author=self.user,
+            title='ﾃｽﾄ記事',
+            slug='half-width',
+            description='説明文',
+            content='**ｶﾀｶﾅ**の本文',
+            keywords='keywords',
+            publish_at='2020-01-01 00:00',)
+        self.assertEqual(set(Article.objects.search('ＤＪＡＮＧＯ')), {article, full_width})
+        self.assertEqual(set(Article.objects.search('django')), {article, full_width})
+        self.assertEqual(list(Article.objects.search('ﾃｽﾄ記事')), [half_width])
+        self.assertEqual(list(Article.objects.search('テスト記事')), [half_width])
+        self.assertEqual(list(Article.objects.search('カタカナの本文')), [half_width])
+
+    def test_ngram_index_is_updated_incrementally(self):
+        grams = set(ArticleNgram.objects.filter(
+            article=self.article).values_list('gram', flat=True))
+        self.assertIn('ex', grams)
+        self.article.title = 'renamed'
+        self.article.save()
+        grams = set(ArticleNgram.objects.filter(
+            article=self.article).values_list('gram', flat=True))
+        self.assertIn('na', grams)
+        Article.objects.filter(pk=self.article.pk).set_active(False)
+        self.assertFalse(ArticleNgram.objects.filter(article=self.article).exists())
+
+    def test_model_stores_rendered_content(self):
+        self.assertIn('<h1', self.article.content_html)
+        self.assertFalse(self.article.is_rendered_stale)
+        self.article.content = '## edited'
+        self.article.save()
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertIn('<h2', article.content_html)
+        self.assertIn('edited', article.get_markdown())
+
+    def test_model_stores_content_statistics(self):
+        self.article.content = '# タイトル\n\n本文です。![img](https://example.com/a.png)'
+        self.article.save()
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertEqual(article.get_text_count(), len('タイトル\n本文です。'))
+        self.assertEqual(article.get_img_count(), 1)
+        self.assertEqual(article.get_reading_time(), 1)
+
+    def test_stale_renderer_version_is_rendered_again(self):
+        Article.objects.filter(pk=self.article.pk).update(
+            content_html='', renderer_version='old')
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertTrue(article.is_rendered_stale)
+        self.assertIn('<h1', article.get_markdown())
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertFalse(article.is_rendered_stale)
+
+    def test_renderer_version_does_not_read_package_metadata_on_save(self):
+        self.article.save()
+        with mock.patch('articles.rendering.metadata.version') as version:
+            self.article.save()
+        version.assert_not_called()
+
+    @override_settings(IMAGE_MAX_DIMENSION=800, IMAGE_FORMAT='WEBP')
+    def test_form_optimizes_new_cover(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1600, 1200), 'white').save(buffer, format='PNG')
+        cover = SimpleUploadedFile('cover.png', buffer.getvalue(), 'image/png')
+        form = ArticleForm(data={
+            'title': 'cover example',
+            'slug': 'cover-example',
+            'description': 'example description',
+            'content': '#example',
+            'keywords': 'example',
+        }, files={'cover': cover})
+        self.assertTrue(form.is_valid(), form.errors)
+        optimized = form.cleaned_data['cover']
+        self.assertEqual(optimized.name, get_content_name(optimized, 'cover.webp'))
+        self.assertEqual(Image.open(optimized).size, (800, 600))
+        self.assertEqual(form.instance.cover_original_size, len(buffer.getvalue()))
+        self.assertEqual(form.instance.cover_size, optimized.size)
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_form_refuses_cover_with_too_many_pixels(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (20, 20), 'white').save(buffer, format='PNG')
+        cover = SimpleUploadedFile('cover.png', buffer.getvalue(), 'image/png')
+        form = ArticleForm(data={
+            'title': 'cover example',
+            'slug': 'cover-example',
+            'description': 'example description',
+            'content': '#example',
+            'keywords': 'example',
+        }, files={'cover': cover})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['cover'], ['The image has too many pixels.'])
+
+    def test_form_reuses_stored_cover(self):
+        buffer = io.BytesIO()
+        frames = [Image.new('RGB', (8, 8), color) for color in ('white', 'black')]
+        frames[0].save(buffer, format='GIF', save_all=True, append_images=frames[1:])
+        content = buffer.getvalue()
+        name = get_content_name(io.BytesIO(content), 'cover.gif')
+        blob = Blob.objects.create(
+            kind=Blob.COVER, sha256=name[:-len('.gif')],
+            name=f'article/images/{name}', url=f'/media/article/images/{name}',
+            last_used_at='2020-01-01 00:00Z')
+        cover = SimpleUploadedFile('again.gif', content, 'image/gif')
+        # animated images are stored as they are
+        form = ArticleForm(data={
+            'title': 'cover example',
+            'slug': 'cover-example',
+            'description': 'example description',
+            'content': '#example',
+            'keywords': 'example',
+        }, files={'cover': cover})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['cover'], blob.name)
+        self.assertFalse(form.new_blobs)
+        blob.refresh_from_db()
+        self.assertGreater(blob.last_used_at.year, 2020)
+
 
+@override_settings(QUERY_BUDGET_ENFORCE=True)
 class ArticleViewTestCase(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_user(
             username='testuser',
             email='testuser@test.com',
@@ -113,7 +311,58 @@ class ArticleViewTestCase(TestCase):
         self.assertContains(response, 'example tag')
         self.assertTemplateUsed(response, 'articles/article_home.html')
         self.assertTemplateUsed(response, 'articles/article_cell.html')
-        self.assertTemplateUsed(response, 'widgets/pagination.html')
+        self.assertTemplateUsed(response, 'articles/article_list_more.html')
+
+    @mock.patch.object(ArticleListView, 'paginate_by', 1)
+    def test_article_list_cursor_walks_every_article(self):
+        self.client.login(username='testuser', password='testuser1234')
+        slugs = []
+        url = reverse('articles:article_list')
+        query = ''
+        while True:
+            response = self.client.get(f'{url}?{query}')
+            self.assertEqual(response.status_code, status.OK)
+            slugs.extend(article.slug for article in response.context['article_list'])
+            query = response.context['next_query']
+            if query:
+                # only the first page counts articles
+                response = self.client.get(f'{url}?{query}')
+                self.assertNotIn('article_count', response.context)
+            if not query:
+                break
+            url = reverse('articles:article_list_fragment')
+        # the article without publish_at comes first
+        self.assertEqual(slugs[0], 'example3')
+        self.assertCountEqual(slugs, ['example', 'example2', 'example3'])
+
+    def test_article_list_fragment_renders_cells_without_count(self):
+        self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('articles:article_list_fragment'))
+        self.assertEqual(response.status_code, status.OK)
+        self.assertTemplateUsed(response, 'articles/article_cell.html')
+        self.assertTemplateNotUsed(response, '_base.html')
+        self.assertNotIn('article_count', response.context)
+        # neither the page nor its validators aggregate the articles
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'COUNT(' in query['sql'] or 'MAX(' in query['sql']])
+
+    def test_article_with_fragments_slug_is_not_shadowed(self):
+        self.article.slug = 'fragments'
+        self.article.save()
+        response = self.client.get(
+            reverse('articles:article_detail', kwargs={'slug': 'fragments'}))
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response.context['article'], self.article)
+
+    def test_hot_queries_use_their_indexes(self):
+        output = io.StringIO()
+        call_command('check_query_plans', stdout=output)
+        self.assertIn('comments of articles: comment_active_article_idx', output.getvalue())
+
+    def test_article_list_invalid_cursor(self):
+        response = self.client.get(reverse('articles:article_list') + '?cursor=broken')
+        self.assertEqual(response.status_code, status.NOT_FOUND)
 
     def test_article_list_view_for_logged_out_user(self):
         self.client.logout()
@@ -126,6 +375,18 @@ class ArticleViewTestCase(TestCase):
         self.assertTemplateUsed(response, 'articles/article_home.html')
         self.assertTemplateUsed(response, 'articles/article_cell.html')
 
+    def test_article_list_view_counts_once(self):
+        self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('articles:article_list') + '?search=example')
+        count_queries = [query for query in queries.captured_queries
+                         if query['sql'].startswith('SELECT COUNT(*)')]
+        self.assertEqual(len(count_queries), 1)
+        self.assertEqual(response.context.get('article_count'), 2)
+        # search results are ordered by relevance and keep page numbers
+        self.assertTemplateUsed(response, 'widgets/pagination.html')
+
     def test_article_search(self):
         Article.objects.create(
             author=self.user,
@@ -183,6 +444,128 @@ class ArticleViewTestCase(TestCase):
         no_response = self.client.get('/molecule/1234/')
         self.assertEqual(no_response.status_code, 404)
 
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_article_detail_view_query_count(self):
+        Comment.objects.create(
+            article=self.second_article, name='unknown', comment='comment')
+        self.client.logout()
+        # the validators, the article, tags, related articles, suggestions, comments
+        # and the page timeout
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse(
+                'articles:article_detail', kwargs={'slug': self.second_article.slug}))
+        self.assertContains(response, 'example tag')
+        self.assertContains(response, self.article.title)
+        self.assertContains(response, 'comment')
+
+    def test_article_detail_revalidation_is_not_modified(self):
+        url = reverse('articles:article_detail', kwargs={'slug': self.second_article.slug})
+        self.client.login(username='testuser', password='testuser1234')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('private', response['Cache-Control'])
+        # one query for the session, one for the user and one for the validators
+        with self.assertNumQueries(3):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        # a new comment changes the etag
+        Comment.objects.create(
+            article=self.second_article, name='unknown', comment='comment')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_cached_page_is_revalidated_without_queries(self):
+        self.client.logout()
+        url = reverse('articles:article_list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.NOT_MODIFIED)
+        # publishing an article changes the etag of the list
+        Article.objects.filter(pk=self.third_article.pk).update(publish_at=timezone.now())
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.OK)
+
+    def test_article_detail_view_fails_over_query_budget(self):
+        with mock.patch.object(ArticleDetailView, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse(
+                    'articles:article_detail', kwargs={'slug': self.article.slug}))
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_article_pages_are_cached_for_anonymous_users(self):
+        self.client.logout()
+        detail_url = reverse('articles:article_detail', kwargs={'slug': self.second_article.slug})
+        self.client.get(detail_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertNotContains(response, '__page_cache_csrf_token__')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_article_page_cache_is_invalidated_by_dependencies(self):
+        self.client.logout()
+        list_url = reverse('articles:article_list')
+        detail_url = reverse('articles:article_detail', kwargs={'slug': self.second_article.slug})
+        self.client.get(list_url)
+        self.client.get(detail_url)
+        Comment.objects.create(
+            article=self.second_article, name='unknown', comment='new comment')
+        response = self.client.get(detail_url)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'new comment')
+        self.assertEqual(self.client.get(list_url)['X-Page-Cache'], 'hit')
+        # renaming a related article changes the detail page and the list
+        self.article.title = 'renamed example'
+        self.article.save()
+        self.assertContains(self.client.get(detail_url), 'renamed example')
+        self.assertContains(self.client.get(list_url), 'renamed example')
+        # tags are invalidated through the admin bulk action as well
+        Tag.objects.filter(pk=self.tag.pk).set_active(False)
+        self.assertNotContains(self.client.get(detail_url), 'example tag')
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_page_rendered_during_invalidation_is_not_served(self):
+        self.client.logout()
+        detail_url = reverse('articles:article_detail', kwargs={'slug': self.second_article.slug})
+        self.client.get(detail_url)
+        self.assertEqual(self.client.get(detail_url)['X-Page-Cache'], 'hit')
+        original_dispatch = DetailView.dispatch
+
+        def dispatch(view, request, *args, **kwargs):
+            # the comment is saved while the page is rendered from the older rows
+            response = original_dispatch(view, request, *args, **kwargs)
+            Comment.objects.create(
+                article=self.second_article, name='unknown', comment='late comment')
+            return response
+
+        invalidate(comments_key(self.second_article.pk))
+        with mock.patch.object(DetailView, 'dispatch', dispatch):
+            self.assertNotContains(self.client.get(detail_url), 'late comment')
+        response = self.client.get(detail_url)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+        self.assertContains(response, 'late comment')
+
+    def test_article_page_cache_expires_at_next_publish(self):
+        from .page_cache import get_page_timeout
+        Article.objects.create(
+            author=self.user,
+            title='scheduled',
+            slug='scheduled',
+            description='example description',
+            content='#scheduled',
+            keywords='scheduled',
+            publish_at=timezone.now() + timezone.timedelta(seconds=30),)
+        self.assertLessEqual(get_page_timeout(), 31)
+
     def test_display_article_create_view(self):
         self.client.login(username='testuser', password='testuser1234')
         response = self.client.get(reverse('articles:article_new'))
@@ -299,3 +682,157 @@ class ArticleViewTestCase(TestCase):
         self.assertNotContains(response, 'example2')
         # check if tag is rendered to template
         self.assertContains(response, 'example tag')
+
+
+class ArticleRecommendationTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='testuser@test.com',
+            password='testuser1234',)
+        contents = [
+            ('django-orm', 'django queryset prefetch select related'),
+            ('django-views', 'django class based views queryset mixin'),
+            ('cooking', 'curry rice onion carrot potato'),
+        ]
+        self.articles = {
+            slug: Article.objects.create(
+                author=self.user,
+                title=slug,
+                slug=slug,
+                description=f'{slug} description',
+                content=content,
+                keywords='example',
+                publish_at='2020-01-01 00:00Z',)
+            for slug, content in contents
+        }
+
+    def get_suggestions(self, slug):
+        return list(self.articles[slug].recommendations.values_list(
+            'recommended__slug', flat=True))
+
+    def test_similar_articles_are_suggested(self):
+        call_command('update_recommendations', stdout=io.StringIO())
+        self.assertEqual(self.get_suggestions('django-orm')[0], 'django-views')
+        self.assertEqual(self.get_suggestions('django-views')[0], 'django-orm')
+        response = self.client.get(self.articles['django-orm'].get_absolute_url())
+        self.assertContains(response, 'おすすめ記事')
+        self.assertEqual(response.context['article'].suggested_articles[0],
+                         self.articles['django-views'])
+
+    def test_only_changed_articles_are_tokenized(self):
+        result = update_recommendations()
+        self.assertEqual(len(result.tokenized), 3)
+        self.assertEqual(update_recommendations().tokenized, [])
+        article = self.articles['cooking']
+        article.content = 'django queryset prefetch select related mixin'
+        article.save()
+        result = update_recommendations()
+        self.assertEqual(result.tokenized, [article.pk])
+        self.assertIn(self.articles['django-orm'].pk, result.recomputed)
+        self.assertIn('cooking', self.get_suggestions('django-orm'))
+
+    def test_unpublished_article_is_removed(self):
+        update_recommendations()
+        article = self.articles['django-views']
+        article.is_active = False
+        article.save()
+        result = update_recommendations()
+        self.assertEqual(result.removed, [article.pk])
+        self.assertNotIn('django-views', self.get_suggestions('django-orm'))
+        self.assertFalse(article.recommendations.exists())
+
+
+class ContentTransferTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='testuser@test.com',
+            password='testuser1234',)
+        self.tag = Tag.objects.create(name='example tag')
+        self.articles = [
+            Article.objects.create(
+                author=self.user,
+                title=f'example{index}',
+                slug=f'example{index}',
+                description='example description',
+                content=f'#example{index}',
+                keywords='example',
+                publish_at='2020-01-01 00:00Z',)
+            for index in range(3)
+        ]
+        self.articles[0].tags.set([self.tag])
+        self.articles[0].related_articles.set([self.articles[1]])
+        Comment.objects.create(article=self.articles[0], name='unknown', comment='comment')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self):
+        path = os.path.join(self.directory.name, 'content.jsonl')
+        call_command('export_content', output=path, stderr=io.StringIO())
+        return path
+
+    def import_content(self, path, **options):
+        call_command('import_content', path, batch_size=2, stdout=io.StringIO(), **options)
+
+    def get_state(self):
+        return (
+            sorted(Article.objects.get_queryset().values_list(
+                'slug', 'title', 'publish_at', 'updated', 'content_html')),
+            sorted(Article.tags.through.objects.values_list('article__slug', 'tag__name')),
+            sorted(Article.related_articles.through.objects.values_list(
+                'from_article__slug', 'to_article__slug')),
+            sorted(Comment.objects.get_queryset().values_list('id', 'article__slug', 'comment')),
+        )
+
+    def test_import_restores_export(self):
+        path = self.export()
+        state = self.get_state()
+        Article.objects.get_queryset().delete()
+        Tag.objects.get_queryset().delete()
+        self.import_content(path)
+        self.assertEqual(self.get_state(), state)
+        self.assertTrue(ArticleNgram.objects.filter(article__slug='example0').exists())
+        self.assertEqual(Tag.objects.get().published_count, 1)
+
+    def test_import_is_idempotent(self):
+        path = self.export()
+        self.articles[0].tags.clear()
+        self.articles[0].related_articles.clear()
+        Article.objects.filter(pk=self.articles[2].pk).update(title='changed')
+        self.import_content(path)
+        state = self.get_state()
+        self.import_content(path)
+        self.assertEqual(self.get_state(), state)
+        self.assertEqual(Article.objects.get(pk=self.articles[2].pk).title, 'example2')
+        self.assertEqual(list(self.articles[1].related_articles.all()), [self.articles[0]])
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_import_requires_known_authors(self):
+        path = self.export()
+        Article.objects.get_queryset().delete()
+        self.user.username = 'renamed'
+        self.user.save()
+        with self.assertRaises(CommandError):
+            self.import_content(path)
+        self.import_content(path, author='renamed')
+        self.assertEqual(Article.objects.get_queryset().count(), 3)
+
+    def test_import_checks_references_before_writing(self):
+        path = self.export()
+        Article.objects.get_queryset().delete()
+        Tag.objects.get_queryset().delete()
+        with open(path) as file:
+            records = [json.loads(line) for line in file]
+        # the broken reference is in the last batch of articles
+        for record in records:
+            if record.get('slug') == 'example2':
+                record['related_articles'] = ['missing-article']
+        with open(path, 'w') as file:
+            file.writelines(json.dumps(record) + '\n' for record in records)
+        with self.assertRaisesMessage(CommandError, 'unknown related articles: missing-article'):
+            self.import_content(path)
+        self.assertFalse(Tag.objects.get_queryset().exists())
+        self.assertFalse(Article.objects.get_queryset().exists())
@@ -1,11 +1,13 @@
 from django.urls import path
 
-from .views import ArticleListView, ArticleDetailView, ArticleCreateView, ArticleUpdateView, ArticleDeleteView
+from .views import ArticleListView, ArticleListFragmentView, ArticleDetailView, ArticleCreateView, ArticleUpdateView, ArticleDeleteView
 
 app_name = 'articles'
 
 urlpatterns = [
     path('new/', ArticleCreateView.as_view(), name='article_new'),
+    # under -/ so it can not shadow an article with the slug fragments
+    path('-/fragments/', ArticleListFragmentView.as_view(), name='article_list_fragment'),
     path('<slug:slug>/edit/', ArticleUpdateView.as_view(), name='article_edit'),
     path('<slug:slug>/delete/', ArticleDeleteView.as_view(), name='article_delete'),
     path('<slug:slug>/', ArticleDetailView.as_view(), name='article_detail'),
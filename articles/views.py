@@ -1,19 +1,33 @@
 from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Prefetch
+from django.http import Http404
 from django.urls import reverse_lazy
 from django.shortcuts import HttpResponseRedirect
 from django.views.generic import ListView, DetailView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 
-from .models import Article
+from .models import Article, ArticleRecommendation
 from .filter import ArticleFilter
+from .conditional_get import get_article_list_validators, get_article_validators
 from .forms import ArticleForm
+from .page_cache import ARTICLE_LIST, TAG_LIST, article_key, comments_key, get_page_timeout, tag_key
 from .permissions import AccessPermissionToUsers, PublishPermission
 from comments.forms import CommentCreateForm
+from comments.models import Comment
+from core.additional.conditional_get import ConditionalGetMixin
+from core.additional.page_cache import PageCacheMixin
+from core.additional.paginator import (
+    ApproximateCountPaginator, CursorPage, CursorPaginator, count_objects)
+from core.additional.query_budget import QueryBudgetMixin
+from tags.models import Tag
 
 
-class ArticleListView(ListView):
+class ArticleListView(PageCacheMixin, ConditionalGetMixin, ListView):
     """
     List all objects in model to template.
+    pages for anonymous users are served from the page cache.
+    pages whose validators still match are answered with 304.
 
     Attributes:
         template_name (str): a path to template that is responsible to render objects
@@ -22,11 +36,19 @@ class ArticleListView(ListView):
         paginate_by (int): int to set pagination. for example if you set 10
                            object_list will be separated by 10 and the resulting
                            number will be the pagination length.
+        paginator_class (ApproximateCountPaginator): paginator of search results,
+                                                     it can estimate the count on large tables
+        form_class (ArticleFilter): FilterSet used to filter objects
+        cursor_kwarg (str): query parameter of the keyset pagination cursor
+        count_articles (bool): whether to add the number of articles to the context
     """
     template_name = 'articles/article_home.html'
     context_object_name = 'article_list'
     paginate_by = 20
+    paginator_class = ApproximateCountPaginator
     form_class = ArticleFilter
+    cursor_kwarg = 'cursor'
+    count_articles = True
 
     def get_queryset(self):
         """
@@ -41,7 +63,8 @@ class ArticleListView(ListView):
 
         1. get all published objects
         2. if user is authenticated, get all objects that is is_active=True
-        3. use ArticleFilter to filter through the objects
+        3. use ArticleFilter to filter through the objects.
+           the FilterSet is kept on the view so it is built once per request.
 
         Returns:
             queryset: return filtered queryset
@@ -56,33 +79,175 @@ class ArticleListView(ListView):
         if self.request.user.is_authenticated:
             queryset = Article.objects.all()
             # queryset = (queryset | user_queryset).distinct()
-        queryset = ArticleFilter(
-            self.request.GET, queryset=queryset)
-        return queryset.qs
+        self.filterset = self.form_class(
+            self.request.GET or None, queryset=queryset, request=self.request)
+        return self.filterset.qs
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        articles are browsed with keyset pagination on (publish_at, id),
+        so every page is one indexed range query.
+        search results are ordered by relevance and keep page numbers.
+
+        Returns:
+            Tuple: paginator, page, object_list and is_paginated like ListView
+
+        Raises:
+            Http404: when the cursor is invalid
+        """
+        if self.request.GET.get('search'):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, 'publish_at')
+        try:
+            page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_next_query(self, page):
+        """
+        Args:
+            page (CursorPage|Page): current page
+
+        Returns:
+            str: query string of the next page with the current filters,
+                empty on the last page
+        """
+        if not page.has_next():
+            return ''
+        query = self.request.GET.copy()
+        if isinstance(page, CursorPage):
+            query[self.cursor_kwarg] = page.next_cursor
+        else:
+            query[self.page_kwarg] = page.next_page_number()
+        return query.urlencode()
 
     def get_context_data(self, **kwargs):
         """
         Override get_context_data to add data to pass to template.
+        article_count reuses the count the paginator already ran for search results.
+        browsing only counts on the first page, later cursor pages
+        skip the count so deep pages stay one indexed range query.
         """
         context = super().get_context_data(**kwargs)
-        context['filter'] = self.form_class(self.request.GET or None)
-        context['article_count'] = self.get_queryset().count()
+        paginator = context['paginator']
+        context['filter'] = self.filterset
+        context['next_query'] = self.get_next_query(context['page_obj'])
+        if not self.count_articles:
+            return context
+        if isinstance(paginator, CursorPaginator):
+            if self.request.GET.get(self.cursor_kwarg):
+                return context
+            count, is_approximate = count_objects(paginator.queryset)
+        else:
+            count, is_approximate = paginator.count, paginator.is_approximate
+        context['article_count'] = count
+        context['article_count_is_approximate'] = is_approximate
         return context
 
+    def get_page_dependencies(self):
+        """
+        the list shows articles and the tag filter.
+        """
+        return [ARTICLE_LIST, TAG_LIST]
+
+    def get_page_timeout(self):
+        return get_page_timeout()
+
+    def get_validators(self):
+        authenticated = self.request.user.is_authenticated
+        queryset = Article.objects.all() if authenticated else Article.objects.published()
+        return get_article_list_validators(queryset, authenticated)
+
 
-class ArticleDetailView(PublishPermission, DetailView):
+class ArticleListFragmentView(ArticleListView):
+    """
+    the article cells of one page of the list, without the rest of the page.
+    used to load the next page while scrolling, it does not count articles.
+    """
+    template_name = 'articles/article_list_fragment.html'
+    count_articles = False
+
+
+class ArticleDetailView(QueryBudgetMixin, PageCacheMixin, ConditionalGetMixin,
+                        PublishPermission, DetailView):
     """
     Passes a single object to template.
+    tags, related articles, suggested articles and comments are prefetched
+    so the page is rendered with a fixed number of queries.
+    pages for anonymous users are served from the page cache.
+    pages whose validators still match are answered with 304.
 
     Attributes:
         model (Article): target model to fetch data from
         template_name (str): a path to template that is responsible to render objects
         context_object_name (str): to override context object name used in template
                                    for DetailView's it defaults to 'object'
+        query_budget (int): 1 query for the validators, 5 for the article, tags,
+                            related articles, suggestions and comments, plus 1 for the page cache timeout
+                            of anonymous users or 2 for the session and user of logged in users
     """
     model = Article
     template_name = 'articles/article_detail.html'
     context_object_name = 'article'
+    query_budget = 8
+
+    def get_queryset(self):
+        """
+        prefetch everything the template reads into lists on the object.
+        the lists are used instead of the related managers because
+        the custom all() of the managers would run a new query.
+        the responsive image of the cover is joined to the article.
+
+        Returns:
+            queryset: active objects with prefetched relations
+        """
+        return super().get_queryset().select_related('cover_image').prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.all(),
+                     to_attr='active_tags'),
+            Prefetch('related_articles', queryset=Article.objects.all_related(),
+                     to_attr='related_article_list'),
+            Prefetch('recommendations', queryset=ArticleRecommendation.objects.published(),
+                     to_attr='recommendation_list'),
+            Prefetch('comments', queryset=Comment.objects.all(),
+                     to_attr='active_comments'),
+        )
+
+    def get_object(self, queryset=None):
+        """
+        PublishPermission and DetailView.get both call get_object,
+        so the object is cached to fetch it only once per request.
+        """
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def get_page_dependencies(self):
+        """
+        the page shows the article, its tags, its related articles and its comments.
+        """
+        article = self.object
+        return [
+            article_key(article.pk),
+            comments_key(article.pk),
+            *[article_key(related.pk) for related in article.related_article_list],
+            *[article_key(suggested.pk) for suggested in article.suggested_articles],
+            *[tag_key(tag.pk) for tag in article.active_tags],
+        ]
+
+    def get_page_timeout(self):
+        return get_page_timeout()
+
+    def get_validators(self):
+        """
+        unpublished articles have no validators for anonymous users,
+        so PublishPermission still answers them.
+        """
+        authenticated = self.request.user.is_authenticated
+        queryset = Article.objects.all() if authenticated else Article.objects.published()
+        return get_article_validators(queryset, self.kwargs['slug'], authenticated)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -115,6 +280,15 @@ class ArticleCreateView(AccessPermissionToUsers, CreateView):
         form.instance.author = self.request.user
         return super().form_valid(form)
 
+    def get_form_kwargs(self):
+        """
+        Default function for FormMixin that builds the arguments of the form.
+        Override to pass the current login user to the form.
+        """
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
 
 class ArticleUpdateView(AccessPermissionToUsers, UpdateView):
     """
@@ -139,6 +313,15 @@ class ArticleUpdateView(AccessPermissionToUsers, UpdateView):
         form.instance.author = self.request.user
         return super().form_valid(form)
 
+    def get_form_kwargs(self):
+        """
+        Default function for FormMixin that builds the arguments of the form.
+        Override to pass the current login user to the form.
+        """
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
     def get_success_url(self):
         """
         Default function for UpdateView that is called when
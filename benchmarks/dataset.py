@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+
+from .generator import DatasetConfig, DatasetGenerator
+from articles.models import Article
+from tags.models import Tag
+
+
+def seed_dataset(seed=0):
+    """
+    seed a small but realistic dataset for the benchmark suite
+    with the same generator as the generate_dataset command.
+    every article is active and published so each route sees the same rows.
+
+    Args:
+        seed (int): seed for the random generator
+
+    Returns:
+        dict: the created user, tags and articles
+    """
+    user = get_user_model().objects.create_superuser(
+        username='benchmark',
+        email='benchmark@test.com',
+        password='benchmark1234',)
+    config = DatasetConfig(
+        articles=40,
+        tags=15,
+        tags_per_article=3,
+        related_per_article=3,
+        comments_per_article=5,
+        paragraphs=8,
+        inactive_ratio=0,
+        unpublished_ratio=0,
+        seed=seed,)
+    DatasetGenerator(config, user).generate()
+    Tag.objects.create(name='Series')
+    return {
+        'user': user,
+        'tags': list(Tag.objects.order_by('name')),
+        'articles': list(Article.objects.order_by('-publish_at')),
+    }
@@ -0,0 +1,276 @@
+import math
+import random
+import uuid
+from dataclasses import dataclass
+
+from django.utils import timezone
+
+from articles.models import Article, ArticleNgram
+from articles.ngram import get_article_grams, get_article_text
+from comments.models import Comment
+from tags.models import Tag
+from tags.tasks import refresh_tag_stats
+
+WORDS = [
+    'Django', 'Python', 'PostgreSQL', 'Docker', 'JavaScript', 'queryset',
+    'migration', 'template', 'middleware', 'cache', 'index', 'signal',
+    'プログラミング', 'データベース',
+]
+SENTENCES = [
+    'この記事では{word}の使い方を説明します。',
+    '{word}を使うとコードが読みやすくなります。',
+    'まずは{word}の設定を確認しましょう。',
+    '本番環境では{word}のパフォーマンスに注意が必要です。',
+    'Lorem markdownum {word} prendique totidemque oculis.',
+    'Isto urbes corpore ferre, haberet enim {word} moventem.',
+]
+CODE_BLOCK = """```python
+def {name}(items):
+    result = []
+    for item in items:
+        if item.{attribute}:
+            result.append(item)
+    return result
+```"""
+IMAGE = '![{alt}](https://example.com/dataset/{name}.png)'
+
+
+@dataclass
+class DatasetConfig:
+    """
+    size and shape of a generated dataset.
+
+    Attributes:
+        articles (int): number of articles
+        tags (int): number of tags
+        tags_per_article (int): maximum number of tags per article
+        related_per_article (int): maximum number of related articles per article
+        comments_per_article (float): mean of the exponential distribution of comments per article
+        paragraphs (float): median of the log-normal distribution of paragraphs per article
+        code_block_ratio (float): probability of a code fence after each paragraph
+        image_ratio (float): probability of an image after each paragraph
+        inactive_ratio (float): ratio of soft deleted articles and comments
+        unpublished_ratio (float): ratio of articles without publish_at or published in the future
+        batch_size (int): number of rows per bulk_create
+        render (bool): render the markdown of each article
+        index (bool): write the n-gram index of each article
+        seed (int): seed for the random generator
+    """
+    articles: int = 1000
+    tags: int = 100
+    tags_per_article: int = 4
+    related_per_article: int = 5
+    comments_per_article: float = 10.0
+    paragraphs: float = 12.0
+    code_block_ratio: float = 0.2
+    image_ratio: float = 0.15
+    inactive_ratio: float = 0.02
+    unpublished_ratio: float = 0.05
+    batch_size: int = 500
+    render: bool = True
+    index: bool = True
+    seed: int = 0
+
+
+class DatasetGenerator:
+    """
+    generate articles, tags, related articles and comments with bulk_create.
+    the same config and seed always produce the same rows, uuid keys included.
+    rows are written in batches and only the article keys are kept in memory,
+    so memory stays bounded by batch_size.
+
+    Attributes:
+        config (DatasetConfig): size and shape of the dataset
+        author (CustomUser): author of every article
+        log (Callable[[str], None]): function called with progress messages
+    """
+
+    def __init__(self, config, author, log=None):
+        self.config = config
+        self.author = author
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(config.seed)
+        self.now = timezone.now()
+
+    def make_uuid(self):
+        """
+        Returns:
+            UUID: uuid4 drawn from the seeded generator
+        """
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def generate(self):
+        """
+        generate the whole dataset.
+
+        Returns:
+            dict: number of rows created for each model
+        """
+        tag_ids = self.generate_tags()
+        article_ids = self.generate_articles(tag_ids)
+        # bulk_create does not send the signals that count the articles of each tag
+        refresh_tag_stats(tag_ids)
+        related = self.generate_related_articles(article_ids)
+        comments = self.generate_comments(article_ids)
+        return {
+            'tags': len(tag_ids),
+            'articles': len(article_ids),
+            'related_articles': related,
+            'comments': comments,
+        }
+
+    def generate_tags(self):
+        tags = [Tag(id=self.make_uuid(), name=f'{self.rng.choice(WORDS)}-{index}')
+                for index in range(self.config.tags)]
+        Tag.objects.bulk_create(tags, batch_size=self.config.batch_size)
+        self.log(f'created {len(tags)} tags')
+        return [tag.id for tag in tags]
+
+    def make_content(self, index):
+        """
+        build a markdown body.
+        the number of paragraphs follows a log-normal distribution,
+        code fences and images are inserted between paragraphs.
+
+        Args:
+            index (int): index of the article
+
+        Returns:
+            str: markdown content
+        """
+        paragraphs = max(1, min(200, int(self.rng.lognormvariate(
+            math.log(self.config.paragraphs), 0.6))))
+        blocks = [f'# article {index}']
+        for paragraph in range(paragraphs):
+            if paragraph % 4 == 0:
+                blocks.append(f'## section {paragraph // 4 + 1}')
+            blocks.append(''.join(
+                self.rng.choice(SENTENCES).format(word=self.rng.choice(WORDS))
+                for _ in range(self.rng.randint(2, 6))))
+            if self.rng.random() < self.config.code_block_ratio:
+                blocks.append(CODE_BLOCK.format(
+                    name=f'function_{index}_{paragraph}',
+                    attribute=self.rng.choice(WORDS).lower()))
+            if self.rng.random() < self.config.image_ratio:
+                blocks.append(IMAGE.format(
+                    alt=self.rng.choice(WORDS), name=f'{index}-{paragraph}'))
+        return '\n\n'.join(blocks)
+
+    def make_publish_at(self, index):
+        if self.rng.random() >= self.config.unpublished_ratio:
+            return self.now - timezone.timedelta(hours=index)
+        if self.rng.random() < 0.5:
+            return None
+        return self.now + timezone.timedelta(days=self.rng.randint(1, 30))
+
+    def make_article(self, index):
+        word = self.rng.choice(WORDS)
+        article = Article(
+            id=self.make_uuid(),
+            author=self.author,
+            title=f'{word} article {index}',
+            slug=f'dataset-{index}',
+            description=f'{word}についての記事 {index}',
+            content=self.make_content(index),
+            keywords=word,
+            publish_at=self.make_publish_at(index),
+            is_active=self.rng.random() >= self.config.inactive_ratio,)
+        if self.config.render:
+            article.render_content()
+        article.search_text = get_article_text(article)
+        return article
+
+    def generate_articles(self, tag_ids):
+        """
+        create articles and their tags batch by batch.
+
+        Args:
+            tag_ids (List[UUID]): keys of the generated tags
+
+        Returns:
+            List[UUID]: keys of the generated articles
+        """
+        article_ids = []
+        through = Article.tags.through
+        for start in range(0, self.config.articles, self.config.batch_size):
+            stop = min(start + self.config.batch_size, self.config.articles)
+            articles = [self.make_article(index) for index in range(start, stop)]
+            Article.objects.bulk_create(articles)
+            tag_links = [
+                through(article_id=article.id, tag_id=tag_id)
+                for article in articles
+                for tag_id in self.rng.sample(
+                    tag_ids, min(len(tag_ids), self.rng.randint(0, self.config.tags_per_article)))
+            ]
+            through.objects.bulk_create(tag_links)
+            if self.config.index:
+                ArticleNgram.objects.bulk_create([
+                    ArticleNgram(article_id=article.id, gram=gram)
+                    for article in articles if article.is_active
+                    for gram in get_article_grams(article)
+                ], batch_size=self.config.batch_size * 10)
+            article_ids.extend(article.id for article in articles)
+            self.log(f'created {stop} articles')
+        return article_ids
+
+    def generate_related_articles(self, article_ids):
+        """
+        link each article to articles written before it.
+        related_articles is symmetrical, so both directions are written.
+
+        Args:
+            article_ids (List[UUID]): keys of the generated articles
+
+        Returns:
+            int: number of related article pairs
+        """
+        through = Article.related_articles.through
+        links = []
+        pairs = 0
+        for index, article_id in enumerate(article_ids[1:], start=1):
+            count = min(index, self.rng.randint(0, self.config.related_per_article))
+            # sample positions, slicing the ids would copy the prefix for every article
+            for position in self.rng.sample(range(index), count):
+                related_id = article_ids[position]
+                links.append(through(from_article_id=article_id, to_article_id=related_id))
+                links.append(through(from_article_id=related_id, to_article_id=article_id))
+                pairs += 1
+            if len(links) >= self.config.batch_size:
+                through.objects.bulk_create(links)
+                links = []
+        through.objects.bulk_create(links)
+        self.log(f'created {pairs} related article pairs')
+        return pairs
+
+    def generate_comments(self, article_ids):
+        """
+        create comments for every article.
+        the number of comments per article follows an exponential
+        distribution, so a few articles get most of the comments.
+
+        Args:
+            article_ids (List[UUID]): keys of the generated articles
+
+        Returns:
+            int: number of comments
+        """
+        comments = []
+        total = 0
+        mean = self.config.comments_per_article
+        for article_id in article_ids:
+            count = int(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+            for index in range(count):
+                comments.append(Comment(
+                    id=self.make_uuid(),
+                    article_id=article_id,
+                    name=f'reader-{self.rng.randint(1, 10000)}',
+                    comment=self.rng.choice(SENTENCES).format(word=self.rng.choice(WORDS)),
+                    is_active=self.rng.random() >= self.config.inactive_ratio,))
+            if len(comments) >= self.config.batch_size:
+                Comment.objects.bulk_create(comments)
+                total += len(comments)
+                comments = []
+        Comment.objects.bulk_create(comments)
+        total += len(comments)
+        self.log(f'created {total} comments')
+        return total
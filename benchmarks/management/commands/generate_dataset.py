@@ -0,0 +1,47 @@
+from dataclasses import fields
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from benchmarks.generator import DatasetConfig, DatasetGenerator
+
+
+class Command(BaseCommand):
+    """
+    generate a synthetic dataset for load and scale testing.
+    every option maps to a field of DatasetConfig.
+    rows are committed batch by batch, run it against an empty database.
+
+    Example:
+        python manage.py generate_dataset --articles 100000 --tags 5000 \\
+            --comments-per-article 20 --seed 42
+    """
+    help = 'Generate a deterministic synthetic dataset of articles, tags and comments.'
+
+    def add_arguments(self, parser):
+        defaults = DatasetConfig()
+        for field in fields(DatasetConfig):
+            option = f'--{field.name.replace("_", "-")}'
+            default = getattr(defaults, field.name)
+            if field.type is bool:
+                parser.add_argument(
+                    f'--skip-{field.name}', dest=field.name, action='store_false',
+                    help=f'do not {field.name} the articles.')
+            else:
+                parser.add_argument(
+                    option, type=type(default), default=default,
+                    help=f'defaults to {default}.')
+        parser.add_argument(
+            '--author', default='dataset',
+            help='username of the author, created when it does not exist.')
+
+    def handle(self, *args, **options):
+        config = DatasetConfig(**{
+            field.name: options[field.name] for field in fields(DatasetConfig)})
+        author, _ = get_user_model().objects.get_or_create(
+            username=options['author'],
+            defaults={'email': f'{options["author"]}@example.com'})
+        generator = DatasetGenerator(config, author, log=self.stdout.write)
+        created = generator.generate()
+        summary = ', '.join(f'{count} {name}' for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f'created {summary}.'))
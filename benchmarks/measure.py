@@ -0,0 +1,143 @@
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+# wall time and memory depend on the machine, so they are compared with a
+# tolerance. the query count is deterministic and has to match exactly or improve.
+TIME_TOLERANCE = float(os.environ.get('BENCHMARK_TIME_TOLERANCE', 3.0))
+TIME_SLACK_MS = float(os.environ.get('BENCHMARK_TIME_SLACK_MS', 50.0))
+MEMORY_TOLERANCE = float(os.environ.get('BENCHMARK_MEMORY_TOLERANCE', 1.5))
+MEMORY_SLACK_KB = float(os.environ.get('BENCHMARK_MEMORY_SLACK_KB', 512.0))
+
+
+@dataclass
+class Measurement:
+    """
+    the cost of a single request.
+
+    Attributes:
+        status_code (int): response status code
+        queries (int): number of database queries
+        wall_ms (float): wall time in milliseconds
+        peak_kb (float): peak memory allocated while handling the request
+    """
+    status_code: int
+    queries: int
+    wall_ms: float
+    peak_kb: float
+
+    def to_baseline(self):
+        return {
+            'queries': self.queries,
+            'wall_ms': round(self.wall_ms, 2),
+            'peak_kb': round(self.peak_kb, 1),
+        }
+
+
+def consume(response):
+    """
+    read the body of a streaming response,
+    its queries run while the content is iterated.
+
+    Returns:
+        HttpResponse: the response
+    """
+    if getattr(response, 'streaming', False):
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(request, setup=None, repeat=3):
+    """
+    run a request and measure it.
+    the query count and peak memory are taken from the first run,
+    the wall time is the fastest of all runs.
+
+    Args:
+        request (Callable[[], HttpResponse]): function sending the request
+        setup (Callable[[], None]|None): function run before each request, not measured
+        repeat (int): number of runs used for the wall time
+
+    Returns:
+        Measurement: measured cost
+    """
+    setup = setup or (lambda: None)
+    setup()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        response = consume(request())
+    # captured_queries reads the log lazily and every request resets it,
+    # so the count has to be taken before the next request
+    query_count = len(queries)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        consume(request())
+        timings.append((time.perf_counter() - started) * 1000)
+    return Measurement(
+        status_code=response.status_code,
+        queries=query_count,
+        wall_ms=min(timings),
+        peak_kb=peak / 1024,
+    )
+
+
+def load_baseline():
+    """
+    Returns:
+        dict: committed baseline keyed by route name
+    """
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
+
+
+def write_baseline(results):
+    """
+    overwrite the committed baseline with new results.
+
+    Args:
+        results (dict): measurements keyed by route name
+    """
+    baseline = {name: measurement.to_baseline()
+                for name, measurement in sorted(results.items())}
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=4) + '\n')
+
+
+def find_regressions(name, measurement, baseline):
+    """
+    compare a measurement with its baseline.
+
+    Args:
+        name (str): route name
+        measurement (Measurement): measured cost
+        baseline (dict): baseline of the route
+
+    Returns:
+        List[str]: descriptions of every regression
+    """
+    regressions = []
+    if measurement.queries > baseline['queries']:
+        regressions.append(
+            f'{name}: {measurement.queries} queries, baseline is {baseline["queries"]}')
+    time_limit = baseline['wall_ms'] * TIME_TOLERANCE + TIME_SLACK_MS
+    if measurement.wall_ms > time_limit:
+        regressions.append(
+            f'{name}: {measurement.wall_ms:.1f} ms, limit is {time_limit:.1f} ms')
+    memory_limit = baseline['peak_kb'] * MEMORY_TOLERANCE + MEMORY_SLACK_KB
+    if measurement.peak_kb > memory_limit:
+        regressions.append(
+            f'{name}: {measurement.peak_kb:.0f} KB peak, limit is {memory_limit:.0f} KB')
+    return regressions
@@ -0,0 +1,325 @@
+"""
+Note:
+    run only this suite with `python manage.py test benchmarks`.
+    to accept new numbers after an intended change run it with
+    BENCHMARK_UPDATE_BASELINE=1 and commit benchmarks/baseline.json.
+"""
+import hashlib
+import io
+import itertools
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+from django.urls import get_resolver
+from PIL import Image
+
+from .dataset import seed_dataset
+from .generator import DatasetConfig, DatasetGenerator
+from .measure import consume, find_regressions, load_baseline, measure, write_baseline
+from articles.models import Article
+from articles.views import ArticleListView
+from comments.models import Comment
+from core.additional.paginator import CursorPaginator
+from feeds.builders import rebuild_all
+from tags.models import Tag
+from uploads.models import ChunkedUpload, Upload
+
+# named routes without a benchmark. the admin generates add, change, delete and
+# history views for every model, its index and changelists are benchmarked instead.
+# imgur_uploader sends the image to imgur.
+UNBENCHMARKED_ROUTE_PREFIXES = ('admin:', )
+UNBENCHMARKED_ROUTES = {'imgur_uploader'}
+
+
+def get_route_names(resolver=None, namespace=''):
+    """
+    Args:
+        resolver (URLResolver|None): resolver to walk, the root urlconf by default
+        namespace (str): namespace prefix of the names of the resolver
+
+    Returns:
+        Set[str]: namespaced names of every named route
+    """
+    resolver = resolver or get_resolver()
+    names = {namespace + name for name in resolver.reverse_dict if isinstance(name, str)}
+    for key, (_, sub_resolver) in resolver.namespace_dict.items():
+        names |= get_route_names(sub_resolver, f'{namespace}{key}:')
+    return names
+
+
+class DatasetGeneratorTestCase(TestCase):
+
+    def generate(self, seed):
+        author = get_user_model().objects.get_or_create(username='dataset')[0]
+        config = DatasetConfig(articles=12, tags=5, comments_per_article=3,
+                               batch_size=5, seed=seed)
+        return DatasetGenerator(config, author).generate()
+
+    def get_keys(self):
+        return (
+            list(Article.objects.get_queryset().order_by('slug').values_list('id', 'content')),
+            list(Comment.objects.get_queryset().order_by('id').values_list('id', flat=True)),
+        )
+
+    def test_generator_is_deterministic(self):
+        created = self.generate(seed=1)
+        self.assertEqual(created['articles'], 12)
+        self.assertEqual(Article.objects.get_queryset().count(), 12)
+        self.assertEqual(Comment.objects.get_queryset().count(), created['comments'])
+        keys = self.get_keys()
+        Article.objects.get_queryset().delete()
+        Tag.objects.get_queryset().delete()
+        self.generate(seed=1)
+        self.assertEqual(self.get_keys(), keys)
+
+
+MAINTENANCE_MODE_STATE_FILE = os.path.join(
+    tempfile.gettempdir(), 'benchmark_maintenance_mode_state.txt')
+UPLOAD_SPOOL_ROOT = os.path.join(tempfile.gettempdir(), 'benchmark_spool')
+
+
+def make_png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), 'white').save(buffer, format='PNG')
+    buffer.seek(0)
+    buffer.name = 'benchmark.png'
+    return buffer
+
+
+@override_settings(MAINTENANCE_MODE_STATE_FILE_PATH=MAINTENANCE_MODE_STATE_FILE,
+                   UPLOAD_SPOOL_ROOT=UPLOAD_SPOOL_ROOT, PAGE_CACHE_ENABLED=True)
+class RouteBenchmarkTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset()
+        cls.article = cls.dataset['articles'][0]
+        cls.series_article = cls.dataset['articles'][1]
+        cls.series_article.tags.add(
+            next(tag for tag in cls.dataset['tags'] if tag.name == 'Series'))
+        cls.tag = cls.dataset['tags'][0]
+        rebuild_all()
+
+    def setUp(self):
+        self.counter = itertools.count()
+
+    def login(self):
+        self.client.login(username='benchmark', password='benchmark1234')
+
+    def logout(self):
+        self.client.logout()
+
+    def anonymous(self):
+        """
+        log out and empty the page cache, so the uncached path is measured.
+        """
+        cache.clear()
+        self.logout()
+
+    def get_routes(self):
+        """
+        every route of core/urls.py with the request that exercises it.
+
+        Returns:
+            Dict[str, Tuple[Callable, Callable|None]]: request and setup keyed by route name
+        """
+        client = self.client
+        detail_url = reverse('articles:article_detail',
+                             kwargs={'slug': self.article.slug})
+        list_url = reverse('articles:article_list')
+        fragment_url = reverse('articles:article_list_fragment')
+        next_cursor = CursorPaginator(
+            Article.objects.published(), ArticleListView.paginate_by, 'publish_at',
+        ).get_page().next_cursor
+        delete_target = self.dataset['articles'][-1]
+
+        def warm_up(url):
+            def setup():
+                self.logout()
+                client.get(url)
+            return setup
+
+        def restore_delete_target():
+            Article.objects.get_queryset().filter(
+                pk=delete_target.pk).update(is_active=True)
+            self.login()
+
+        chunk = b'\x00' * 1024
+        chunk_headers = {
+            'HTTP_CONTENT_RANGE': f'bytes 0-{len(chunk) - 1}/{len(chunk)}',
+            'HTTP_X_CHUNK_SHA256': hashlib.sha256(chunk).hexdigest(),
+        }
+        state = {}
+
+        def start_chunked_upload(written=False):
+            def setup():
+                self.login()
+                upload = ChunkedUpload.objects.start(
+                    self.dataset['user'], 'benchmark.mp4', len(chunk), 'video/mp4')
+                if written:
+                    upload.move_offset(0, len(chunk), upload.write_chunk(
+                        io.BytesIO(chunk), 0, len(chunk), chunk_headers['HTTP_X_CHUNK_SHA256']))
+                state['chunked_upload'] = upload
+            return setup
+
+        def spool_upload():
+            self.anonymous()
+            state['upload'] = Upload.objects.spool(SimpleUploadedFile(
+                'benchmark.png', make_png().getvalue(), 'image/png'), folder='benchmark')
+
+        return {
+            'article_list': (lambda: client.get(list_url), self.anonymous),
+            'article_list_page_2': (
+                lambda: client.get(list_url + f'?cursor={next_cursor}'), self.anonymous),
+            'article_list_fragment': (
+                lambda: client.get(fragment_url + f'?cursor={next_cursor}'), self.anonymous),
+            'article_list_search': (
+                lambda: client.get(list_url + '?search=Django'), self.anonymous),
+            'article_list_search_japanese': (
+                lambda: client.get(list_url + '?search=プログラミング'), self.anonymous),
+            'article_list_tag': (
+                lambda: client.get(list_url + f'?tags={self.tag.name}'), self.anonymous),
+            'article_list_cached': (lambda: client.get(list_url), warm_up(list_url)),
+            'article_list_logged_in': (lambda: client.get(list_url), self.login),
+            'article_detail': (lambda: client.get(detail_url), self.anonymous),
+            'article_detail_series': (
+                lambda: client.get(self.series_article.get_absolute_url()), self.anonymous),
+            'article_detail_cached': (lambda: client.get(detail_url), warm_up(detail_url)),
+            'article_detail_logged_in': (lambda: client.get(detail_url), self.login),
+            'article_new': (
+                lambda: client.get(reverse('articles:article_new')), self.login),
+            'article_edit': (
+                lambda: client.get(reverse('articles:article_edit',
+                                           kwargs={'slug': self.article.slug})), self.login),
+            'article_delete': (
+                lambda: client.post(reverse('articles:article_delete',
+                                            kwargs={'slug': delete_target.slug})),
+                restore_delete_target),
+            'comment_new': (
+                lambda: client.post(reverse('comments:comment_new'), data={
+                    'verify': 'ぶんし',
+                    'article_slug': self.article.slug,
+                    'name': 'benchmark',
+                    'comment': '# comment',
+                }), self.anonymous),
+            'tag_ajax_new': (
+                lambda: client.post(reverse('tags:tag_ajax_new'), data={
+                    'tag_name': f'benchmark-tag-{next(self.counter)}',
+                }), self.login),
+            'tag_list': (lambda: client.get(reverse('tags:tag_list')), self.anonymous),
+            'tag_detail': (
+                lambda: client.get(self.tag.get_absolute_url()), self.anonymous),
+            'api_article_list': (
+                lambda: client.get(reverse('api:article_list')), self.logout),
+            'api_article_export': (
+                lambda: client.get(reverse('api:article_list') + '?stream=1'), self.logout),
+            'api_article_detail': (
+                lambda: client.get(reverse('api:article_detail',
+                                           kwargs={'slug': self.article.slug})), self.logout),
+            'api_comment_list': (
+                lambda: client.get(reverse('api:comment_list',
+                                           kwargs={'slug': self.article.slug})), self.logout),
+            'api_tag_list': (lambda: client.get(reverse('api:tag_list')), self.logout),
+            'sitemap': (lambda: client.get(reverse('feeds:sitemap')), self.logout),
+            'sitemap_chunk': (
+                lambda: client.get(reverse('feeds:sitemap_chunk', kwargs={'chunk': 0})),
+                self.logout),
+            'atom_feed': (lambda: client.get(reverse('feeds:atom')), self.logout),
+            'rss_feed': (lambda: client.get(reverse('feeds:rss')), self.logout),
+            'tag_atom_feed': (
+                lambda: client.get(reverse('feeds:tag_atom', kwargs={'pk': self.tag.pk})),
+                self.logout),
+            'tag_rss_feed': (
+                lambda: client.get(reverse('feeds:tag_rss', kwargs={'pk': self.tag.pk})),
+                self.logout),
+            'upload_detail': (
+                lambda: client.get(state['upload'].get_absolute_url()), spool_upload),
+            'chunked_upload_start': (
+                lambda: client.post(reverse('uploads:chunked_upload_start'), data={
+                    'name': 'benchmark.mp4',
+                    'size': len(chunk),
+                    'content_type': 'video/mp4',
+                }), self.login),
+            'chunked_upload_offset': (
+                lambda: client.get(state['chunked_upload'].get_absolute_url()),
+                start_chunked_upload()),
+            'chunked_upload_chunk': (
+                lambda: client.put(
+                    state['chunked_upload'].get_absolute_url(), chunk,
+                    content_type='application/octet-stream', **chunk_headers),
+                start_chunked_upload()),
+            'chunked_upload_complete': (
+                lambda: client.post(reverse('uploads:chunked_upload_complete',
+                                            kwargs={'pk': state['chunked_upload'].pk})),
+                start_chunked_upload(written=True)),
+            'markdown_uploader': (
+                lambda: client.post(reverse('markdown_uploader_page'), data={
+                    'title': self.article.title,
+                    'markdown-image-upload': make_png(),
+                }, HTTP_X_REQUESTED_WITH='XMLHttpRequest'), self.login),
+            'markdown_batch_uploader': (
+                lambda: client.post(reverse('markdown_batch_uploader_page'), data={
+                    'markdown-image-upload': [make_png() for _ in range(3)],
+                }), self.login),
+            'martor_markdownify': (
+                lambda: client.post(reverse('martor_markdownfy'), data={
+                    'content': self.article.content,
+                }), self.login),
+            'martor_search_user': (
+                lambda: client.get(reverse('search_user_json') + '?username=bench'), self.login),
+            # maintenance_mode_off runs next and turns maintenance mode off again
+            'maintenance_mode_on': (
+                lambda: client.get(reverse('maintenance_mode_on')), self.login),
+            'maintenance_mode_off': (
+                lambda: client.get(reverse('maintenance_mode_off')), self.login),
+            'admin_honeypot_index': (
+                lambda: client.get(reverse('admin_honeypot:index')), self.anonymous),
+            'admin_honeypot_login': (
+                lambda: client.get(reverse('admin_honeypot:login')), self.anonymous),
+            'admin_index': (lambda: client.get(reverse('admin:index')), self.login),
+            'admin_article_changelist': (
+                lambda: client.get(reverse('admin:articles_article_changelist')), self.login),
+            'admin_article_changelist_search': (
+                lambda: client.get(reverse('admin:articles_article_changelist') + '?q=Django'),
+                self.login),
+            'admin_comment_changelist': (
+                lambda: client.get(reverse('admin:comments_comment_changelist')), self.login),
+            'admin_tag_changelist': (
+                lambda: client.get(reverse('admin:tags_tag_changelist')), self.login),
+            'admin_user_changelist': (
+                lambda: client.get(reverse('admin:users_customuser_changelist')), self.login),
+        }
+
+    def test_every_named_route_has_a_benchmark(self):
+        covered = set()
+        for request, setup in self.get_routes().values():
+            setup()
+            covered.add(consume(request()).resolver_match.view_name)
+        missing = {
+            name for name in get_route_names() - covered - UNBENCHMARKED_ROUTES
+            if not name.startswith(UNBENCHMARKED_ROUTE_PREFIXES)
+        }
+        self.assertEqual(missing, set(), 'add the routes to get_routes()')
+
+    def test_routes_against_baseline(self):
+        results = {}
+        for name, (request, setup) in self.get_routes().items():
+            results[name] = measure(request, setup=setup)
+            with self.subTest(route=name):
+                self.assertLess(results[name].status_code, 500)
+        if os.environ.get('BENCHMARK_UPDATE_BASELINE'):
+            write_baseline(results)
+            return
+        baseline = load_baseline()
+        regressions = []
+        for name, measurement in results.items():
+            with self.subTest(route=name):
+                self.assertIn(name, baseline,
+                              'route has no baseline, run with BENCHMARK_UPDATE_BASELINE=1')
+                regressions += find_regressions(name, measurement, baseline[name])
+        self.assertEqual(regressions, [], '\n'.join(regressions))
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
 from .models import Comment
+from core.additional.admin_filters import AutocompleteFilter
+from core.additional.paginator import ApproximateCountPaginator
+
+
+class ArticleFilter(AutocompleteFilter):
+    title = 'article'
+    field_name = 'article'
 
 
 class CommentAdmin(admin.ModelAdmin):
@@ -14,6 +21,10 @@ class CommentAdmin(admin.ModelAdmin):
         search_fields (List): list of fields in model that the user can search through in admin site
         actions (List): list of custom functions to add custom actions to admin site
         inlines (List): list of custom Inline classes to add relational fields in admin site
+        list_select_related (List): relations loaded with the rows of the changelist
+        autocomplete_fields (List): relations picked with the autocomplete widget in the form
+        paginator (Paginator): paginator that estimates the count of large changelists
+        show_full_result_count (bool): skip the extra COUNT(*) of the whole table
     """
 
     list_display = [
@@ -26,20 +37,51 @@ class CommentAdmin(admin.ModelAdmin):
         'id',
     ]
     list_filter = [
-        'article',
+        ArticleFilter,
         'is_active',
     ]
     search_fields = [
         'comment',
     ]
+    list_select_related = [
+        'article',
+    ]
+    autocomplete_fields = [
+        'article',
+    ]
     actions = ['active', 'inactive']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        search through CommentQuerySet.matching instead of
+        icontains lookups over search_fields.
+        search_fields is kept so the admin renders the search box.
+        """
+        if not search_term:
+            return queryset, False
+        return queryset.matching(search_term), False
+
+    def get_queryset(self, request):
+        """
+        the article column only shows the title,
+        so the large text columns of the article and the search vectors are not loaded.
+        """
+        return super().get_queryset(request).defer(
+            'search_vector', 'article__content', 'article__content_html',
+            'article__search_vector')
+
+    @property
+    def media(self):
+        return super().media + ArticleFilter.get_media(self.model, self.admin_site)
 
     def active(self, request, queryset):
         """
         function to set the target model's "is_active" to True.
         used in admin site.
         """
-        queryset.update(is_active=True)
+        queryset.set_active(True)
 
     active.short_description = '閲覧可能'
 
@@ -48,7 +90,7 @@ class CommentAdmin(admin.ModelAdmin):
         function to set the target model's "is_active" to False.
         used in admin site.
         """
-        queryset.update(is_active=False)
+        queryset.set_active(False)
 
     inactive.short_description = '閲覧不可能'
 
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_auto_20200816_0145'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(is_active=True), fields=['article', 'timestamp'], name='comment_active_article_idx'),
+        ),
+    ]
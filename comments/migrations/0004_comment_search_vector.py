@@ -0,0 +1,59 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:52
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# the trigger keeps search_vector up to date on every insert and update,
+# including bulk_create and queryset.update which skip Comment.save.
+CREATE_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION comments_comment_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.comment, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER comments_comment_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, comment
+    ON comments_comment
+    FOR EACH ROW EXECUTE PROCEDURE comments_comment_search_vector_update();
+
+CREATE INDEX comments_comment_search_vector_gin
+    ON comments_comment USING gin (search_vector);
+
+UPDATE comments_comment SET comment = comment;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP INDEX IF EXISTS comments_comment_search_vector_gin;
+DROP TRIGGER IF EXISTS comments_comment_search_vector_trigger ON comments_comment;
+DROP FUNCTION IF EXISTS comments_comment_search_vector_update();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_VECTOR_SQL)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# japanese queries are not split into words by the simple text search config,
+# CommentQuerySet.matching answers them with icontains lookups instead.
+# on postgresql icontains compiles to UPPER("column"::text) LIKE UPPER(...),
+# these trigram indexes are built on the same expression so the planner can use them.
+# queries shorter than three characters have no trigram and still scan the table.
+CREATE_TRIGRAM_INDEXES_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX comments_comment_name_trgm
+    ON comments_comment USING gin (UPPER(name::text) gin_trgm_ops);
+
+CREATE INDEX comments_comment_comment_trgm
+    ON comments_comment USING gin (UPPER(comment::text) gin_trgm_ops);
+"""
+
+DROP_TRIGRAM_INDEXES_SQL = """
+DROP INDEX IF EXISTS comments_comment_name_trgm;
+DROP INDEX IF EXISTS comments_comment_comment_trgm;
+"""
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGRAM_INDEXES_SQL)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGRAM_INDEXES_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_comment_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
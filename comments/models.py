@@ -1,12 +1,15 @@
+from django.contrib.postgres.search import SearchQuery, SearchVectorField
 from django.db import models
 from django.utils.safestring import mark_safe
 from markdown import markdown
 
-from core.additional.models import CoreModel
+from core.additional.models import CoreModel, CoreQuerySet
 from articles.models import Article
+from articles.ngram import has_cjk
+from articles.search import SEARCH_CONFIG, supports_full_text_search
 
 
-class CommentQuerySet(models.QuerySet):
+class CommentQuerySet(CoreQuerySet):
     """
     custom QuerySet for model Comment
     """
@@ -19,6 +22,24 @@ class CommentQuerySet(models.QuerySet):
         queryset = self.filter(is_active=True)
         return queryset
 
+    def matching(self, query: str):
+        """
+        filter objects whose name or comment match the query.
+        on postgresql the search_vector column and its gin index are used,
+        japanese queries use icontains lookups served by the trigram gin indexes
+        of migration 0005. other databases fall back to icontains lookups without an index.
+
+        Args:
+            query (str): user input query
+
+        Returns:
+            queryset: return all objects that match the query
+        """
+        if supports_full_text_search(self.db) and not has_cjk(query):
+            return self.filter(search_vector=SearchQuery(
+                query, config=SEARCH_CONFIG, search_type='websearch'))
+        return self.filter(models.Q(name__icontains=query) | models.Q(comment__icontains=query))
+
 
 class CommentManager(models.Manager):
     """
@@ -49,11 +70,23 @@ class Comment(CoreModel):
         Article, on_delete=models.CASCADE, related_name='comments')
     name = models.CharField("name", max_length=255, default="unknown")
     comment = models.TextField('comment', help_text='Markdown対応')
+    # weighted tsvector of name and comment, maintained by a database trigger on postgresql
+    search_vector = SearchVectorField(null=True, editable=False)
 
     objects = CommentManager()
 
     class Meta:
+        """
+        Attributes:
+            ordering (List): use to determine the ordering of model objects when listed
+            indexes (List): comments are read as the active comments of articles
+                            ordered by timestamp, which this index returns without a sort
+        """
         ordering = ('timestamp', )
+        indexes = [
+            models.Index(fields=['article', 'timestamp'], name='comment_active_article_idx',
+                         condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         if len(self.comment) > 20:
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+
+from tasks.registry import task
+from .models import Comment
+
+
+@task
+def send_comment_notification(comment_id):
+    """
+    send an email to the blog creator about a new comment.
+    for message content we load the template txt file.
+
+    Args:
+        comment_id (str): primary key of the comment
+    """
+    comment = Comment._base_manager.select_related(
+        'article').filter(pk=comment_id).first()
+    if comment is None:
+        return
+    subject = 'You have a new comment'
+    context_data = {
+        'article': comment.article,
+        'comment': comment,
+    }
+    message = render_to_string(
+        'mails/comment_notification_email.txt', context_data)
+    from_email = settings.DEFAULT_FROM_EMAIL
+    recipient_list = [settings.EMAIL_HOST_USER]
+    send_mail(subject, message, from_email, recipient_list)
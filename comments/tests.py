@@ -1,11 +1,16 @@
 from http import HTTPStatus as status
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.shortcuts import reverse
 
 from .models import Comment
+from .tasks import send_comment_notification
 from articles.models import Article
+from tasks.models import Task
+from tasks.worker import run_pending
 
 
 class CommentModelTestCase(TestCase):
@@ -53,6 +58,7 @@ class CommentModelTestCase(TestCase):
 class CommentViewTestCase(TestCase):
 
     def setUp(self):
+        cache.clear()
         user = get_user_model().objects.create_user(
             username='testuser',
             email='testuser@test.com',
@@ -85,6 +91,24 @@ class CommentViewTestCase(TestCase):
         comments = Comment.objects.all()
         self.assertEqual(comments.count(), 2)
 
+    @override_settings(EMAIL_HOST_USER='owner@example.com')
+    def test_comment_notification_is_sent_by_worker(self):
+        context_data = {
+            'verify': 'ぶんし',
+            'article_slug': self.article.slug,
+            'name': 'unknown',
+            'comment': 'notify me',
+        }
+        self.client.post(reverse('comments:comment_new'), data=context_data)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.filter(
+            name=send_comment_notification.task_name, status=Task.PENDING).count(), 1)
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertIn('notify me', mail.outbox[0].body)
+        self.assertIn(self.article.title, mail.outbox[0].body)
+
     def test_comment_fail_with_verification(self):
         context_data = {
             'verify': '分子',
@@ -128,3 +152,78 @@ class CommentViewTestCase(TestCase):
             'articles:article_detail', kwargs={'slug': self.article.slug}))
         comments = Comment.objects.all()
         self.assertEqual(comments.count(), 1)
+
+
+class CommentAdminTestCase(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_superuser(
+            username='admin',
+            email='admin@test.com',
+            password='admin1234',)
+        self.articles = [Article.objects.create(
+            author=user,
+            title=f'example {index}',
+            slug=f'example-{index}',
+            description='example description',
+            content='#example',
+            keywords='example',
+            publish_at='2020-01-01 00:00',) for index in range(3)]
+        for article in self.articles:
+            for index in range(3):
+                Comment.objects.create(
+                    article=article,
+                    name='unknown',
+                    comment=f'comment {index}',)
+        self.client = Client()
+        self.client.force_login(user)
+        self.url = reverse('admin:comments_comment_changelist')
+
+    def test_changelist_does_not_list_every_article(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.OK)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, f'?article__id__exact={self.articles[0].pk}')
+        self.assertNotContains(response, f'<option value="{self.articles[0].pk}"')
+
+    def test_changelist_filters_by_article(self):
+        article = self.articles[1]
+        response = self.client.get(self.url, {'article': article.pk})
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(
+            {comment.article_id for comment in response.context['cl'].result_list},
+            {article.pk})
+        self.assertContains(response, f'<option value="{article.pk}" selected>')
+
+    def test_changelist_searches_comments(self):
+        comment = Comment.objects.filter(article=self.articles[2]).first()
+        comment.comment = 'a spam message'
+        comment.save()
+        response = self.client.get(self.url, {'q': 'spam'})
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(list(response.context['cl'].result_list), [comment])
+
+    def test_changelist_searches_japanese_comments(self):
+        comments = list(Comment.objects.filter(article=self.articles[1]))
+        comments[0].comment = 'とても参考になりました'
+        comments[0].save()
+        comments[1].name = '参考太郎'
+        comments[1].save()
+        response = self.client.get(self.url, {'q': '参考'})
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(set(response.context['cl'].result_list), set(comments[:2]))
+
+    def test_changelist_queries_do_not_grow_with_comments(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(4) as context:
+            self.client.get(self.url)
+        for article in self.articles:
+            Comment.objects.create(article=article, name='unknown', comment='more')
+        with self.assertNumQueries(len(context.captured_queries)):
+            self.client.get(self.url)
+
+    def test_article_autocomplete_searches_articles(self):
+        response = self.client.get(
+            reverse('admin:articles_article_autocomplete'), {'term': 'example'})
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(len(response.json()['results']), 3)
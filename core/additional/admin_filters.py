@@ -0,0 +1,70 @@
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    list filter for a foreign key that picks the related object with the
+    admin autocomplete widget instead of listing every related object.
+    only the selected object is loaded, the options are searched through
+    the autocomplete view of the related admin, so it needs search_fields.
+    the media of the widget must be added to the media of the model admin,
+    see get_media.
+
+    Attributes:
+        field_name (str): name of the foreign key to filter by
+        template (str): template that renders the widget
+    """
+    field_name = None
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, request, params, model, model_admin):
+        self.parameter_name = self.field_name
+        super().__init__(request, params, model, model_admin)
+        self.widget = self.get_widget(model, model_admin.admin_site)
+
+    @classmethod
+    def get_widget(cls, model, admin_site):
+        """
+        Returns:
+            AutocompleteSelect: widget bound to the choices of the foreign key
+        """
+        field = model._meta.get_field(cls.field_name)
+        return field.formfield(
+            widget=AutocompleteSelect(field.remote_field, admin_site), required=False).widget
+
+    @classmethod
+    def get_media(cls, model, admin_site):
+        """
+        Returns:
+            Media: scripts and styles of the widget
+        """
+        return cls.get_widget(model, admin_site).media
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.field_name: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        """
+        a single choice with the rendered widget, the other query parameters
+        so the form keeps them, and the url that clears the filter.
+        """
+        yield {
+            'widget': self.widget.render(self.parameter_name, self.value(), attrs={
+                'onchange': 'this.form.submit()',
+                'style': 'width: 100%',
+            }),
+            'params': [(name, value) for name, value in changelist.params.items()
+                       if name not in (self.parameter_name, PAGE_VAR)],
+            'clear_url': changelist.get_query_string(remove=[self.parameter_name, PAGE_VAR]),
+            'selected': self.value() is not None,
+        }
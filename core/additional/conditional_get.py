@@ -0,0 +1,71 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    build a strong etag from the values a page is rendered from.
+    CONDITIONAL_GET_VERSION is part of every etag, change it
+    when templates change so cached copies are revalidated.
+
+    Args:
+        parts (Any): values whose repr identifies the page
+
+    Returns:
+        str: quoted etag
+    """
+    digest = hashlib.sha1(repr((settings.CONDITIONAL_GET_VERSION, parts)).encode())
+    return quote_etag(digest.hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    mixin for class based views to answer conditional GET requests.
+    the validators are read before the object, so a request whose
+    If-None-Match or If-Modified-Since still matches gets a 304
+    without the object queries or template rendering.
+    full responses get the ETag and Last-Modified headers
+    and have to be revalidated before they are reused.
+    this mixin has to come after PageCacheMixin, the page cache stores
+    the validators with the page and answers cached pages without queries.
+
+    Note:
+        views have to override get_validators.
+    """
+
+    def get_validators(self):
+        """
+        Returns:
+            Tuple[str, datetime]|None: etag and last modified datetime of the page.
+                None when the page has no validators, it is then always rendered
+        """
+        raise NotImplementedError(
+            'ConditionalGetMixin requires get_validators()')
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, no_cache=True)
+        if self.request.user.is_authenticated:
+            # pages of logged in users must not be stored by shared caches
+            patch_cache_control(response, private=True)
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp()))
+        if response is not None:
+            return self.set_validators(response, etag, last_modified)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.set_validators(response, etag, last_modified)
+        return response
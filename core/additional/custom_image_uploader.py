@@ -1,15 +1,33 @@
 import os
 import json
-import uuid
 
 from django.conf import settings
-from django.http import HttpResponse
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
 from django.utils.translation import ugettext_lazy as _
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import View
 
 from martor.utils import LazyEncoder
 
-import cloudinary
+from articles.permissions import AccessPermissionToUsers
+from uploads.handlers import IMAGE_CONTENT_TYPES, ImageValidationUploadHandler
+from uploads.images import ImageTooLarge, check_image_pixels
+from uploads.models import Upload
+from uploads.storage import get_spool_max_size
+from uploads.tasks import transfer_batch
+
+
+def get_image_folder():
+    """
+    images are named after their content, so they share one folder
+    and renaming an article does not move or copy its images.
+
+    Returns:
+        str: folder of the markdown images
+    """
+    return os.path.join(settings.MEDIA_URL, 'article/markdown/')
 
 
 class MarkdownImageUploader(View):
@@ -21,10 +39,8 @@ class MarkdownImageUploader(View):
         """
         called when images are uploaded to martor's markdown field.
         validation is from martor's documentation.
-        it will upload images to cloudinary.
-
-        Note:
-            when there is '?' in the to be foldername the image upload will not work.
+        images are spooled and the provisional url is returned right away,
+        the task worker transfers them to settings.UPLOAD_STORAGE (cloudinary).
         """
         article_title = request.POST['title']
         if not article_title:
@@ -37,11 +53,7 @@ class MarkdownImageUploader(View):
             return HttpResponse(_('Invalid request!'))
 
         image = request.FILES['markdown-image-upload']
-        image_types = [
-            'image/png', 'image/jpg',
-            'image/jpeg', 'image/pjpeg', 'image/gif'
-        ]
-        if image.content_type not in image_types:
+        if image.content_type not in IMAGE_CONTENT_TYPES:
             # return error when the image type
             # is not an expected type
             data = json.dumps({
@@ -51,10 +63,11 @@ class MarkdownImageUploader(View):
             return HttpResponse(
                 data, content_type='application/json', status=405)
 
-        if image.size > settings.MAX_IMAGE_UPLOAD_SIZE:
-            # return error when the image size
-            # is over the setted MAX_IMAGE_UPLOAD_SIZE
-            to_MB = settings.MAX_IMAGE_UPLOAD_SIZE / (1024 * 1024)
+        max_size = get_spool_max_size(settings.MAX_IMAGE_UPLOAD_SIZE)
+        if image.size > max_size:
+            # return error when the image size is over the setted
+            # MAX_IMAGE_UPLOAD_SIZE or what the spool storage accepts
+            to_MB = max_size / (1024 * 1024)
             data = json.dumps({
                 'status': 405,
                 'error': _('Maximum image file is %(size) MB.') % {'size': to_MB}
@@ -62,24 +75,85 @@ class MarkdownImageUploader(View):
             return HttpResponse(
                 data, content_type='application/json', status=405)
 
+        try:
+            check_image_pixels(image)
+        except ImageTooLarge:
+            # return error when the image would decode
+            # to more than IMAGE_MAX_PIXELS pixels
+            data = json.dumps({
+                'status': 405,
+                'error': _('Image has too many pixels.')
+            }, cls=LazyEncoder)
+            return HttpResponse(
+                data, content_type='application/json', status=405)
+
         # when the image is valid
 
-        # create new name for image
-        img_name = f'{uuid.uuid4().hex[:10]}-{image.name.replace(" ", "-")}'
-        # assign new name to the image that is being uploaded
-        image.name = img_name
-        # create folder path
-        img_folder = os.path.join(
-            settings.MEDIA_URL, f'article/{article_title}/markdown/')
-        # save image to cloudinary
-        cloudinary_img = cloudinary.uploader.upload(
-            image, folder=img_folder, overwrite=True)
-        # get the saved image url from cloudinary response
-        cloudinary_img_url = cloudinary_img['secure_url']
+        # spool image and queue the transfer to cloudinary.
+        # the image is named after its content, an image uploaded before is reused
+        upload = Upload.objects.spool(image, folder=get_image_folder())
         # name json data to return to markdown
         data = json.dumps({
             'status': 200,
-            'link': cloudinary_img_url,
+            'link': upload.get_link(),
             'name': image.name
         })
         return HttpResponse(data, content_type='application/json')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class MarkdownImageBatchUploader(AccessPermissionToUsers, View):
+    """
+    image uploader for many images in one request.
+    images are validated while the request body is parsed,
+    the valid ones are spooled and transferred together by one task
+    that uploads them concurrently.
+
+    Note:
+        csrf is checked in post() after the upload handler is installed,
+        the csrf middleware would parse the body before that.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self.validation_handler = ImageValidationUploadHandler(request)
+        request.upload_handlers.insert(0, self.validation_handler)
+        return super().dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def post(self, request, *args, **kwargs):
+        """
+        called with the images in 'markdown-image-upload'.
+
+        Returns:
+            JsonResponse: manifest with the error of every skipped file and the link of every spooled file
+        """
+        images = request.FILES.getlist('markdown-image-upload')
+        img_folder = get_image_folder()
+        files = [{'name': name, 'status': 405, 'error': _(error)}
+                 for name, error in self.validation_handler.errors]
+        uploads = []
+        with transaction.atomic():
+            for image in images:
+                if image.content_type not in IMAGE_CONTENT_TYPES:
+                    # empty files never reach receive_data_chunk()
+                    files.append({'name': image.name, 'status': 405,
+                                  'error': _('Bad image format.')})
+                    continue
+                try:
+                    check_image_pixels(image)
+                except ImageTooLarge:
+                    files.append({'name': image.name, 'status': 405,
+                                  'error': _('Image has too many pixels.')})
+                    continue
+                upload = Upload.objects.spool(image, folder=img_folder, transfer=False)
+                if upload.status == Upload.PENDING:
+                    uploads.append(upload)
+                files.append({
+                    'name': image.name,
+                    'status': 200,
+                    'link': upload.get_link(),
+                })
+            if uploads:
+                transfer_batch.enqueue(
+                    upload_ids=[str(upload.pk) for upload in uploads])
+        return JsonResponse({'status': 200, 'files': files}, encoder=LazyEncoder)
@@ -1,6 +1,33 @@
 from uuid import uuid4
 
 from django.db import models
+from django.utils import timezone
+
+from .signals import activity_changed
+
+
+class CoreQuerySet(models.QuerySet):
+    """
+    custom QuerySet shared by the QuerySets of CoreModel subclasses
+    """
+
+    def set_active(self, is_active: bool):
+        """
+        update is_active of all objects in bulk and send activity_changed,
+        since update() does not send post_save.
+        updated is set too, it is part of the validators of conditional GET.
+
+        Args:
+            is_active (bool): new value of is_active
+
+        Returns:
+            int: number of updated objects
+        """
+        pks = list(self.values_list('pk', flat=True))
+        updated = self.model._base_manager.filter(
+            pk__in=pks).update(is_active=is_active, updated=timezone.now())
+        activity_changed.send(sender=self.model, pks=pks, is_active=is_active)
+        return updated
 
 
 class CoreModel(models.Model):
@@ -0,0 +1,233 @@
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+PAGE_KEY_PREFIX = 'page_cache:page:'
+URL_KEY_PREFIX = 'page_cache:url:'
+VERSION_KEY_PREFIX = 'page_cache:version:'
+
+# the csrf token is unique to each visitor, so it is replaced with a
+# placeholder before the page is stored and filled in again when served.
+CSRF_TOKEN_PATTERN = re.compile(
+    r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_TOKEN_PLACEHOLDER = '__page_cache_csrf_token__'
+# headers stored with the page, the validators of conditional GET among them
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+
+def get_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def get_url_key(request):
+    """
+    Args:
+        request (HttpRequest): current request
+
+    Returns:
+        str: cache key of the dependencies of the page for the absolute url of the request
+    """
+    url = request.build_absolute_uri()
+    return URL_KEY_PREFIX + hashlib.md5(url.encode('utf-8')).hexdigest()
+
+
+def get_page_key(url_key, versions):
+    """
+    the versions of the dependencies are part of the key,
+    so a page can not be found anymore once one of them is invalidated.
+
+    Args:
+        url_key (str): key of get_url_key
+        versions (Dict[str, int]): version of each dependency of the page
+
+    Returns:
+        str: cache key of the page
+    """
+    source = repr((url_key, sorted(versions.items())))
+    return PAGE_KEY_PREFIX + hashlib.md5(source.encode('utf-8')).hexdigest()
+
+
+def get_version_key(dependency):
+    return VERSION_KEY_PREFIX + dependency
+
+
+def get_versions(dependencies):
+    """
+    read the current version of each dependency.
+    a missing version is created from the clock, so a version that was
+    evicted never comes back with a value an old page was stored with.
+
+    Args:
+        dependencies (Iterable[str]): keys of the rows a page is built from
+
+    Returns:
+        Dict[str, int]: version of each dependency
+    """
+    cache = get_cache()
+    dependencies = set(dependencies)
+    stored = cache.get_many([get_version_key(dependency) for dependency in dependencies])
+    versions = {}
+    for dependency in dependencies:
+        version_key = get_version_key(dependency)
+        version = stored.get(version_key)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(version_key, version, None):
+                version = cache.get(version_key, version)
+        versions[dependency] = version
+    return versions
+
+
+def is_cacheable_request(request):
+    """
+    only anonymous GET requests without pending messages are cached.
+    logged in users see drafts and edit links,
+    messages are shown only once to the visitor they were meant for.
+
+    Args:
+        request (HttpRequest): current request
+
+    Returns:
+        bool: True if the page can be served from or stored in the cache
+    """
+    return (
+        settings.PAGE_CACHE_ENABLED and
+        request.method in ('GET', 'HEAD') and
+        'messages' not in request.COOKIES and
+        not request.user.is_authenticated
+    )
+
+
+def get_cached_page(request):
+    """
+    Args:
+        request (HttpRequest): current request
+
+    Returns:
+        Tuple[HttpResponse|None, Dict[str, int]]: the cached page, None on a cache miss,
+            and the versions of the dependencies the url was last stored with
+    """
+    cache = get_cache()
+    url_key = get_url_key(request)
+    dependencies = cache.get(url_key)
+    if dependencies is None:
+        return None, {}
+    versions = get_versions(dependencies)
+    page = cache.get(get_page_key(url_key, versions))
+    if page is None:
+        return None, versions
+    content = page['content'].replace(
+        CSRF_TOKEN_PLACEHOLDER, get_token(request))
+    response = HttpResponse(content, content_type=page['content_type'])
+    for header, value in page.get('headers', {}).items():
+        response[header] = value
+    response['X-Page-Cache'] = 'hit'
+    return response, versions
+
+
+def store_page(request, response, dependencies, timeout, versions=None):
+    """
+    store a rendered page under the versions of its dependencies.
+    nothing is read and written back, so pages stored at the same time
+    do not overwrite each other.
+
+    Args:
+        request (HttpRequest): current request
+        response (HttpResponse): rendered response
+        dependencies (Iterable[str]): keys of the rows the page was built from
+        timeout (int): seconds to keep the page
+        versions (Dict[str, int]|None): versions read before the page was rendered.
+            a dependency invalidated while the page was rendered keeps the older
+            version, so the page is stored under a key that is already stale
+    """
+    cache = get_cache()
+    dependencies = sorted(set(dependencies))
+    versions = {dependency: version for dependency, version in (versions or {}).items()
+                if dependency in dependencies}
+    versions.update(get_versions(
+        dependency for dependency in dependencies if dependency not in versions))
+    url_key = get_url_key(request)
+    content = CSRF_TOKEN_PATTERN.sub(
+        rf'\g<1>{CSRF_TOKEN_PLACEHOLDER}\g<2>', response.content.decode(response.charset))
+    cache.set_many({
+        url_key: dependencies,
+        get_page_key(url_key, versions): {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'headers': {header: response[header]
+                        for header in CACHED_HEADERS if response.has_header(header)},
+        },
+    }, timeout)
+
+
+def invalidate(*dependencies):
+    """
+    increment the version of each dependency, the pages stored under the
+    previous version can not be found anymore and expire on their own.
+
+    Args:
+        dependencies (str): keys of the rows that changed
+    """
+    cache = get_cache()
+    for dependency in set(dependencies):
+        try:
+            cache.incr(get_version_key(dependency))
+        except ValueError:
+            # no page was stored with this dependency since the version was evicted,
+            # the next page creates a new version from the clock
+            pass
+
+
+class PageCacheMixin:
+    """
+    mixin for class based views to cache the rendered page for anonymous users.
+    each page is stored under the versions of the rows it depends on,
+    and invalidate() increments the version when one of those rows changes.
+
+    Note:
+        views have to override get_page_dependencies.
+    """
+
+    def get_page_dependencies(self):
+        """
+        Returns:
+            Iterable[str]: keys of the rows the page is built from
+        """
+        raise NotImplementedError(
+            'PageCacheMixin requires get_page_dependencies()')
+
+    def get_page_timeout(self):
+        """
+        Returns:
+            int: seconds to keep the page
+        """
+        return settings.PAGE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+        cached, versions = get_cached_page(request)
+        if cached is not None:
+            # a page stored with validators answers conditional requests itself
+            not_modified = get_conditional_response(
+                request,
+                etag=cached.get('ETag'),
+                last_modified=parse_http_date_safe(cached.get('Last-Modified')),
+                response=cached,)
+            return not_modified or cached
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        timeout = self.get_page_timeout()
+        if timeout > 0:
+            store_page(request, response, self.get_page_dependencies(), timeout, versions)
+        return response
@@ -0,0 +1,214 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """
+    read the row estimate of the query planner for a queryset.
+    only postgresql is supported.
+
+    Args:
+        queryset (QuerySet): queryset to estimate
+
+    Returns:
+        int|None: estimated number of rows. None if it cannot be estimated
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_objects(queryset):
+    """
+    count a queryset, with the planner's estimate instead of COUNT(*)
+    when settings.APPROXIMATE_COUNT is enabled and the estimate is
+    over settings.APPROXIMATE_COUNT_THRESHOLD.
+
+    Args:
+        queryset (QuerySet): queryset to count
+
+    Returns:
+        Tuple[int, bool]: number of objects and whether it is an estimate
+    """
+    if getattr(settings, 'APPROXIMATE_COUNT', False):
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= settings.APPROXIMATE_COUNT_THRESHOLD:
+            return estimate, True
+    return queryset.count(), False
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's estimate instead of COUNT(*)
+    when settings.APPROXIMATE_COUNT is enabled and the estimate is
+    over settings.APPROXIMATE_COUNT_THRESHOLD.
+    small results are still counted exactly.
+
+    Attributes:
+        is_approximate (bool): whether count is an estimate
+    """
+    is_approximate = False
+
+    @cached_property
+    def count(self):
+        """
+        Returns:
+            int: number of objects, estimated for large querysets
+        """
+        if hasattr(self.object_list, 'query'):
+            count, self.is_approximate = count_objects(self.object_list)
+            return count
+        return super().count
+
+
+class CursorPage:
+    """
+    a page of CursorPaginator.
+
+    Attributes:
+        object_list (List): objects of the page
+        next_cursor (str|None): cursor of the next page. None on the last page
+    """
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return False
+
+    def has_other_pages(self):
+        return self.has_next()
+
+
+class CursorPaginator:
+    """
+    keyset pagination over a datetime field and the primary key, newest first.
+    a page is read with one range query from the position of the last object
+    of the previous page, so deep pages cost the same as the first one
+    and no COUNT is needed. rows where the field is null come first.
+    the queryset should be backed by an index on (-field, -pk).
+
+    Attributes:
+        field (str): name of the datetime field to order by
+    """
+    page_range = None
+
+    def __init__(self, queryset, per_page, field):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+
+    def get_ordering(self):
+        return [F(self.field).desc(nulls_first=True), F('pk').desc()]
+
+    def encode_cursor(self, obj):
+        """
+        Args:
+            obj (Model|dict): last object of a page, or a row of values() with pk
+
+        Returns:
+            str: cursor of the page after the object
+        """
+        if isinstance(obj, dict):
+            value, pk = obj[self.field], obj['pk']
+        else:
+            value, pk = getattr(obj, self.field), obj.pk
+        position = [value.isoformat() if value is not None else None, str(pk)]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """
+        Args:
+            cursor (str): cursor returned by encode_cursor
+
+        Returns:
+            Tuple[datetime|None, str]: field value and primary key of the last object
+
+        Raises:
+            InvalidPage: when the cursor can not be decoded
+        """
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError(cursor)
+            pk = self.queryset.model._meta.pk.to_python(pk)
+        except (binascii.Error, TypeError, ValueError, ValidationError) as error:
+            raise InvalidPage('Invalid cursor') from error
+        return value, pk
+
+    def get_after(self, cursor):
+        """
+        Args:
+            cursor (str): cursor of the last object of the previous page
+
+        Returns:
+            Q: lookup of the objects that come after the cursor
+        """
+        value, pk = self.decode_cursor(cursor)
+        if value is None:
+            return Q(**{f'{self.field}__isnull': True, 'pk__lt': pk}) | \
+                Q(**{f'{self.field}__isnull': False})
+        return Q(**{f'{self.field}__lt': value}) | Q(**{self.field: value, 'pk__lt': pk})
+
+    def get_page_queryset(self, cursor=None):
+        """
+        Args:
+            cursor (str|None): cursor of the previous page. None for the first page
+
+        Returns:
+            QuerySet: objects of the page and one more,
+                the extra object tells whether there is a next page
+
+        Raises:
+            InvalidPage: when the cursor can not be decoded
+        """
+        queryset = self.queryset.order_by(*self.get_ordering())
+        if cursor:
+            queryset = queryset.filter(self.get_after(cursor))
+        return queryset[:self.per_page + 1]
+
+    def get_page(self, cursor=None):
+        """
+        Args:
+            cursor (str|None): cursor of the previous page. None for the first page
+
+        Returns:
+            CursorPage: the page after the cursor
+
+        Raises:
+            InvalidPage: when the cursor can not be decoded
+        """
+        object_list = list(self.get_page_queryset(cursor))
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return CursorPage(object_list, next_cursor)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    raised when a view runs more queries than its query_budget.
+    """
+
+
+class QueryBudgetMixin:
+    """
+    mixin for class based views to declare the maximum number of
+    queries a single request may run, template rendering included.
+    the budget is only checked when settings.QUERY_BUDGET_ENFORCE is True.
+    this mixin has to be the first base class so it wraps the other mixins.
+
+    Attributes:
+        query_budget (int|None): maximum number of queries. None disables the check
+    """
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        run the view while capturing queries and raise
+        QueryBudgetExceeded when the budget is exceeded.
+        TemplateResponse is rendered here so queries from
+        the template are counted too.
+        """
+        if self.query_budget is None or not settings.QUERY_BUDGET_ENFORCE:
+            return super().dispatch(request, *args, **kwargs)
+        with CaptureQueriesContext(connection) as queries:
+            response = super().dispatch(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response.render()
+        if len(queries) > self.query_budget:
+            executed = '\n'.join(query['sql']
+                                 for query in queries.captured_queries)
+            raise QueryBudgetExceeded(
+                f'{self.__class__.__name__} ran {len(queries)} queries, '
+                f'the budget is {self.query_budget}.\n{executed}')
+        return response
@@ -0,0 +1,53 @@
+import json
+import re
+
+from django.db import connections, transaction
+
+SQLITE_INDEX_PATTERN = re.compile(r'USING (?:COVERING )?INDEX (\S+)')
+
+
+def collect_index_names(plan):
+    """
+    Args:
+        plan (dict|list): node of a postgresql json plan
+
+    Returns:
+        Set[str]: names of the indexes scanned by the node and its children
+    """
+    names = set()
+    if isinstance(plan, list):
+        for node in plan:
+            names |= collect_index_names(node)
+    elif isinstance(plan, dict):
+        if 'Index Name' in plan:
+            names.add(plan['Index Name'])
+        for key in ('Plan', 'Plans'):
+            if key in plan:
+                names |= collect_index_names(plan[key])
+    return names
+
+
+def explain(queryset):
+    """
+    read the plan of a queryset.
+    on postgresql sequential scans are disabled while planning,
+    so the plan shows whether an index can serve the query even
+    when the tables are too small for the planner to prefer it.
+
+    Args:
+        queryset (QuerySet): queryset to explain
+
+    Returns:
+        Tuple[str, Set[str]]: the plan as text and the names of the indexes it uses
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain(format='json')
+        return plan, collect_index_names(json.loads(plan))
+    plan = queryset.explain()
+    if connection.vendor == 'sqlite':
+        return plan, set(SQLITE_INDEX_PATTERN.findall(plan))
+    return plan, set()
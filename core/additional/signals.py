@@ -0,0 +1,7 @@
+from django.db.models.signals import ModelSignal
+
+# sent by CoreQuerySet.set_active after is_active was updated in bulk,
+# because queryset.update() does not send post_save.
+# sender is the model class, receives pks (List[UUID]) and is_active (bool).
+# ModelSignal lets receivers use a lazy 'app_label.Model' sender.
+activity_changed = ModelSignal(use_caching=True)
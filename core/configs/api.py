@@ -0,0 +1,5 @@
+# number of objects in a page of the json api, clients can ask for up to API_MAX_PAGE_SIZE
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# rows read per database round trip by streaming exports
+API_STREAM_CHUNK_SIZE = 500
@@ -0,0 +1,31 @@
+import os
+
+# the page cache has to be shared by every worker process,
+# set CACHE_BACKEND to a shared backend (memcached, redis, database) in production.
+CACHE_BACKEND = os.environ.get(
+    'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+# backends that only live in one process or on one host
+LOCAL_CACHE_BACKENDS = [
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.dummy.DummyCache',
+]
+
+# full page cache for anonymous users.
+# pages are invalidated by the web workers, the admin and the task worker,
+# so it is only enabled by default when the cache is shared by all of them.
+PAGE_CACHE_ENABLED = bool(int(os.environ.get(
+    'PAGE_CACHE_ENABLED', int(CACHE_BACKEND not in LOCAL_CACHE_BACKENDS))))
+PAGE_CACHE_ALIAS = 'default'
+# pages are also invalidated by signals, this is the upper limit
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# part of every ETag, change it after a template change so
+# browsers and the CDN stop revalidating pages rendered by the old templates
+CONDITIONAL_GET_VERSION = os.environ.get('CONDITIONAL_GET_VERSION', '1')
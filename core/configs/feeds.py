@@ -0,0 +1,12 @@
+import os
+
+# feeds and the sitemap are rendered by the task worker without a request,
+# so absolute urls are built from FEED_SITE_URL
+FEED_SITE_URL = os.environ.get('FEED_SITE_URL', 'https://onandgo-molecule.herokuapp.com')
+FEED_TITLE = os.environ.get('APPLICATION_NAME') or 'molecule'
+# number of newest articles in the atom and rss feeds
+FEED_SIZE = 20
+# the sitemap is an index of chunks of FEED_SITEMAP_CHUNK_SIZE articles.
+# a sitemap holds at most 50,000 urls and the first chunk also has the home page.
+# an article keeps its chunk, so a change rebuilds one chunk and the index
+FEED_SITEMAP_CHUNK_SIZE = 10000
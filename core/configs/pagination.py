@@ -0,0 +1,7 @@
+import os
+
+# use the query planner's row estimate instead of COUNT(*) for large lists.
+# only used on postgresql, other databases always count.
+APPROXIMATE_COUNT = bool(int(os.environ.get('APPROXIMATE_COUNT', 0)))
+# below this estimate an exact COUNT(*) is cheap enough to run
+APPROXIMATE_COUNT_THRESHOLD = 10000
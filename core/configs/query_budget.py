@@ -0,0 +1,5 @@
+import os
+
+# raise QueryBudgetExceeded when a view runs more queries than its query_budget.
+# enable in development and in tests, keep it off in production.
+QUERY_BUDGET_ENFORCE = bool(int(os.environ.get('QUERY_BUDGET_ENFORCE', 0)))
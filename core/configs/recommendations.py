@@ -0,0 +1,13 @@
+# suggestions on the article page, computed offline by `python manage.py update_recommendations`
+RECOMMENDATION_COUNT = 5
+# cosine similarity below this is not worth suggesting
+RECOMMENDATION_MIN_SCORE = 0.05
+# how many times the terms of each part of an article are counted, the body counts once
+RECOMMENDATION_WEIGHTS = {
+    'title': 3,
+    'description': 2,
+    'keywords': 2,
+    'tags': 3,
+}
+# articles whose similarities are computed per batch of the matrix product
+RECOMMENDATION_BATCH_SIZE = 256
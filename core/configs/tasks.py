@@ -0,0 +1,9 @@
+# database backed task queue, see tasks/ and `python manage.py run_tasks`.
+# a failed task is retried after TASK_RETRY_DELAY * 2 ** (attempts - 1) seconds
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 30
+TASK_RETRY_MAX_DELAY = 60 * 60
+# running tasks locked longer than this are considered abandoned by a dead worker
+TASK_LOCK_TIMEOUT = 10 * 60
+# seconds the worker sleeps when the queue is empty
+TASK_POLL_INTERVAL = 5
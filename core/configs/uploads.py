@@ -0,0 +1,47 @@
+import os
+
+# storage the background worker transfers uploaded images to.
+# uploads.storage.LocalUploadStorage keeps them under MEDIA_ROOT,
+# which is what development and tests use instead of cloudinary.
+UPLOAD_STORAGE = os.environ.get(
+    'UPLOAD_STORAGE', 'uploads.storage.CloudinaryUploadStorage')
+# uploads are written to the spool storage before the worker transfers them,
+# so the web and worker processes have to share it.
+# uploads.storage.FileSystemSpoolStorage keeps them under UPLOAD_SPOOL_ROOT,
+# which has to be a volume mounted by both processes.
+# uploads.storage.DatabaseSpoolStorage keeps them in the database in chunks of
+# UPLOAD_SPOOL_CHUNK_SIZE bytes for hosts without a shared volume, such as heroku dynos.
+# it refuses files over UPLOAD_SPOOL_DATABASE_MAX_SIZE bytes, large videos do not belong in the database
+UPLOAD_SPOOL_STORAGE = os.environ.get(
+    'UPLOAD_SPOOL_STORAGE', 'uploads.storage.FileSystemSpoolStorage')
+UPLOAD_SPOOL_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_DATABASE_MAX_SIZE = int(os.environ.get(
+    'UPLOAD_SPOOL_DATABASE_MAX_SIZE', 32 * 1024 * 1024))
+UPLOAD_SPOOL_ROOT = os.environ.get(
+    'UPLOAD_SPOOL_ROOT',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)))), 'media', 'spool'))
+# number of files transferred at the same time by transfer_batch
+UPLOAD_TRANSFER_WORKERS = int(os.environ.get('UPLOAD_TRANSFER_WORKERS', 4))
+
+# uploaded images and covers are resized to fit IMAGE_MAX_DIMENSION pixels
+# and encoded as IMAGE_FORMAT (WEBP, JPEG or PNG) without exif metadata
+IMAGE_MAX_DIMENSION = 2000
+IMAGE_FORMAT = 'WEBP'
+IMAGE_QUALITY = 80
+# images with more pixels are refused before they are decoded,
+# a small compressed file can decode to gigabytes of pixels
+IMAGE_MAX_PIXELS = 50_000_000
+# widths of the derivatives generated for srcset, only widths smaller than the image are made.
+# IMAGE_SIZES is the sizes attribute, {width} is the width of the full size image
+IMAGE_DERIVATIVE_WIDTHS = [480, 960, 1440]
+IMAGE_SIZES = '(max-width: {width}px) 100vw, {width}px'
+# sweep_blobs keeps unreferenced files used within this many seconds
+BLOB_SWEEP_GRACE = 24 * 60 * 60
+
+# large files such as article videos are uploaded in chunks of at most
+# CHUNKED_UPLOAD_CHUNK_SIZE bytes, the client is told this size.
+# sessions not touched within CHUNKED_UPLOAD_EXPIRY seconds are deleted by sweep_blobs
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY = 24 * 60 * 60
@@ -57,6 +57,11 @@ INSTALLED_APPS = [
     'tags.apps.TagsConfig',
     'articles.apps.ArticlesConfig',
     'comments.apps.CommentsConfig',
+    'tasks.apps.TasksConfig',
+    'uploads.apps.UploadsConfig',
+    'api.apps.ApiConfig',
+    'feeds.apps.FeedsConfig',
+    'benchmarks.apps.BenchmarksConfig',
     # third party that is recommended to be in the end
     'django_cleanup.apps.CleanupConfig',
 ]
@@ -173,9 +178,33 @@ from core.configs.message_framework import *
 # cloudinary configs
 from core.configs.cloudinary import *
 
+# upload configs
+from core.configs.uploads import *
+
 # martor
 from core.configs.martor import *
 
+# pagination configs
+from core.configs.pagination import *
+
+# json api configs
+from core.configs.api import *
+
+# feed configs
+from core.configs.feeds import *
+
+# recommendation configs
+from core.configs.recommendations import *
+
+# query budget configs
+from core.configs.query_budget import *
+
+# cache configs
+from core.configs.cache import *
+
+# task queue configs
+from core.configs.tasks import *
+
 # debug_toolbar configs
 from core.configs.debug_toolbar import *
 
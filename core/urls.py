@@ -3,7 +3,7 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
-from core.additional.custom_image_uploader import MarkdownImageUploader
+from core.additional.custom_image_uploader import MarkdownImageUploader, MarkdownImageBatchUploader
 
 urlpatterns = [
     # django admin
@@ -13,10 +13,15 @@ urlpatterns = [
     path('martor/', include('martor.urls')),
     path('api/uploader/', MarkdownImageUploader.as_view(),
          name='markdown_uploader_page'),
+    path('api/uploader/batch/', MarkdownImageBatchUploader.as_view(),
+         name='markdown_batch_uploader_page'),
     path('maintenance-mode/', include('maintenance_mode.urls')),
     # local apps
     path('comments/', include('comments.urls')),
     path('tags/', include('tags.urls')),
+    path('uploads/', include('uploads.urls')),
+    path('api/v1/', include('api.urls')),
+    path('', include('feeds.urls')),
     path('', include('articles.urls')),
 ]
 
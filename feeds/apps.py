@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class FeedsConfig(AppConfig):
+    name = 'feeds'
+
+    def ready(self):
+        """
+        import signals so the receivers are connected.
+        """
+        from . import signals  # noqa: F401
@@ -0,0 +1,241 @@
+from django.conf import settings
+from django.db.models import Max
+from django.shortcuts import reverse
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from articles.models import Article
+from core.additional.conditional_get import make_etag
+from tags.models import Tag
+from .models import FeedDocument, FeedEntry
+
+CONTENT_TYPES = {
+    FeedDocument.SITEMAP: 'application/xml; charset=utf-8',
+    FeedDocument.ATOM: 'application/atom+xml; charset=utf-8',
+    FeedDocument.RSS: 'application/rss+xml; charset=utf-8',
+}
+
+
+def get_site_url(path=''):
+    """
+    Args:
+        path (str): absolute path on the site
+
+    Returns:
+        str: absolute url under FEED_SITE_URL
+    """
+    return settings.FEED_SITE_URL.rstrip('/') + path
+
+
+def get_open_chunk():
+    """
+    Returns:
+        int: sitemap chunk a new entry is added to, the last one until it is full
+    """
+    last = FeedEntry.objects.aggregate(chunk=Max('sitemap_chunk'))['chunk']
+    if last is None:
+        return 0
+    if FeedEntry.objects.filter(sitemap_chunk=last).count() >= settings.FEED_SITEMAP_CHUNK_SIZE:
+        return last + 1
+    return last
+
+
+def update_entry(article_id):
+    """
+    render the fragments of an article again, or delete its entry
+    when the article is not published anymore.
+
+    Args:
+        article_id (UUID|str): primary key of the article
+
+    Returns:
+        Tuple[Set[UUID], Set[int]]: tags whose feeds contain or contained the article,
+            and the sitemap chunk that contains or contained it
+    """
+    entry = FeedEntry.objects.filter(article_id=article_id).first()
+    tag_ids = set()
+    chunks = set()
+    if entry is not None:
+        tag_ids.update(entry.tags.values_list('pk', flat=True))
+        chunks.add(entry.sitemap_chunk)
+    article = Article._base_manager.select_related('author').filter(pk=article_id).first()
+    if article is None or not article.is_active or not article.is_published:
+        if entry is not None:
+            entry.delete()
+        return tag_ids, chunks
+    tags = list(article.tags.filter(is_active=True).order_by('name'))
+    context = {
+        'article': article,
+        'url': get_site_url(article.get_absolute_url()),
+        'tags': tags,
+    }
+    defaults = {
+        'published': article.publish_at,
+        'updated': article.updated,
+        'sitemap_xml': render_to_string('feeds/sitemap_entry.xml', context),
+        'atom_xml': render_to_string('feeds/atom_entry.xml', context),
+        'rss_xml': render_to_string('feeds/rss_entry.xml', context),
+    }
+    if entry is None:
+        defaults['sitemap_chunk'] = get_open_chunk()
+    entry, _ = FeedEntry.objects.update_or_create(article=article, defaults=defaults)
+    entry.tags.set(tags)
+    tag_ids.update(tag.pk for tag in tags)
+    chunks.add(entry.sitemap_chunk)
+    return tag_ids, chunks
+
+
+def store_document(key, content):
+    """
+    the row is only written when the content changed,
+    so its etag and last_modified stay valid for unchanged documents.
+
+    Args:
+        key (str): key of the document
+        content (str): xml document
+
+    Returns:
+        bool: True when the document was written
+    """
+    document = FeedDocument.objects.filter(key=key).first()
+    if document is not None and document.content == content:
+        return False
+    FeedDocument.objects.update_or_create(key=key, defaults={
+        'content': content,
+        'content_type': CONTENT_TYPES[key.split(':')[0]],
+        'etag': make_etag('feed', key, content),
+        'last_modified': timezone.now(),
+    })
+    return True
+
+
+def save_document(key, template, entries, **context):
+    """
+    join the stored fragments of the entries into a document.
+
+    Args:
+        key (str): key of the document
+        template (str): template of the document
+        entries (QuerySet): ordered entries of the document
+        context: extra context of the template
+
+    Returns:
+        bool: True when the document changed
+    """
+    kind = key.split(':')[0]
+    fragment = f'{kind}_xml'
+    rows = list(entries.values_list(fragment, 'updated'))
+    updated = max((row[1] for row in rows), default=None)
+    content = render_to_string(template, {
+        'site_url': get_site_url(),
+        'title': settings.FEED_TITLE,
+        'updated': updated or timezone.now(),
+        'entries': [row[0] for row in rows],
+        **context,
+    })
+    return store_document(key, content)
+
+
+def build_sitemap(chunks):
+    """
+    build the given sitemap chunks, and the sitemap index when one of them changed.
+    a chunk left without entries is deleted, except the first one, which has the home page.
+
+    Args:
+        chunks (Iterable[int]): numbers of the chunks to build
+    """
+    changed = False
+    for chunk in set(chunks):
+        key = FeedDocument.get_sitemap_key(chunk)
+        entries = FeedEntry.objects.filter(sitemap_chunk=chunk).order_by('published', 'id')
+        if chunk and not entries.exists():
+            changed |= FeedDocument.objects.filter(key=key).delete()[0] > 0
+            continue
+        changed |= save_document(key, 'feeds/sitemap.xml', entries, home=chunk == 0)
+    if changed or not FeedDocument.objects.filter(key=FeedDocument.SITEMAP).exists():
+        build_sitemap_index()
+
+
+def build_sitemap_index():
+    """
+    list the sitemap chunks with the time they last changed.
+    """
+    documents = FeedDocument.objects.filter(
+        key__startswith=FeedDocument.get_sitemap_key('')).values_list('key', 'last_modified')
+    chunks = sorted((int(key.split(':')[1]), last_modified) for key, last_modified in documents)
+    content = render_to_string('feeds/sitemap_index.xml', {
+        'site_url': get_site_url(),
+        'chunks': [
+            {'path': reverse('feeds:sitemap_chunk', kwargs={'chunk': chunk}),
+             'last_modified': last_modified}
+            for chunk, last_modified in chunks
+        ],
+    })
+    store_document(FeedDocument.SITEMAP, content)
+
+
+def build_documents(tag_ids=(), chunks=()):
+    """
+    build the given sitemap chunks, the site feeds and the feeds of the given tags.
+    feeds of tags that are gone or inactive are deleted.
+
+    Args:
+        tag_ids (Iterable[UUID]): tags whose feeds have to be built
+        chunks (Iterable[int]): sitemap chunks that have to be built
+    """
+    entries = FeedEntry.objects.order_by('-published', '-id')
+    size = settings.FEED_SIZE
+    build_sitemap(chunks)
+    save_document(FeedDocument.ATOM, 'feeds/atom.xml', entries[:size],
+                  path=reverse('feeds:atom'))
+    save_document(FeedDocument.RSS, 'feeds/rss.xml', entries[:size],
+                  path=reverse('feeds:rss'))
+    tag_ids = set(tag_ids)
+    tags = Tag.objects.all().filter(pk__in=tag_ids)
+    for tag in tags:
+        tag_entries = entries.filter(tags=tag)[:size]
+        title = f'{settings.FEED_TITLE} - {tag.name}'
+        for kind in (FeedDocument.ATOM, FeedDocument.RSS):
+            save_document(FeedDocument.get_tag_key(kind, tag.pk), f'feeds/{kind}.xml',
+                          tag_entries, title=title,
+                          path=reverse(f'feeds:tag_{kind}', kwargs={'pk': tag.pk}))
+    removed = tag_ids - {tag.pk for tag in tags}
+    FeedDocument.objects.filter(key__in=[
+        FeedDocument.get_tag_key(kind, tag_id)
+        for tag_id in removed for kind in (FeedDocument.ATOM, FeedDocument.RSS)
+    ]).delete()
+
+
+def pack_sitemap_chunks():
+    """
+    give the entries consecutive chunks of FEED_SITEMAP_CHUNK_SIZE in publish order,
+    filling the gaps left by removed entries, and delete the chunks that are not used anymore.
+
+    Returns:
+        Set[int]: numbers of the chunks in use
+    """
+    size = settings.FEED_SITEMAP_CHUNK_SIZE
+    entries = list(FeedEntry.objects.order_by('published', 'id').only('id', 'sitemap_chunk'))
+    for position, entry in enumerate(entries):
+        entry.sitemap_chunk = position // size
+    FeedEntry.objects.bulk_update(entries, ['sitemap_chunk'], batch_size=1000)
+    chunks = set(range(max(1, -(-len(entries) // size))))
+    FeedDocument.objects.filter(
+        key__startswith=FeedDocument.get_sitemap_key(''),
+    ).exclude(key__in=[FeedDocument.get_sitemap_key(chunk) for chunk in chunks]).delete()
+    return chunks
+
+
+def rebuild_all():
+    """
+    render every entry and build every document again.
+    used to fill the tables the first time and after a template change.
+    """
+    published = set(Article.objects.published().values_list('pk', flat=True))
+    stale = set(FeedEntry.objects.values_list('article_id', flat=True)) - published
+    tag_ids = set(Tag.objects.get_queryset().values_list('pk', flat=True))
+    for article_id in published | stale:
+        update_entry(article_id)
+    chunks = pack_sitemap_chunks()
+    build_documents(tag_ids, chunks)
+    build_sitemap_index()
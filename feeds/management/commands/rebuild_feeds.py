@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from feeds.builders import rebuild_all
+from feeds.models import FeedDocument, FeedEntry
+
+
+class Command(BaseCommand):
+    """
+    render every feed entry and build the sitemap and the feeds.
+    run it once after deploying the feeds app, and after a change
+    to the feed templates or FEED_SITE_URL.
+    """
+    help = 'render every feed entry and build the sitemap and the feeds'
+
+    def handle(self, *args, **options):
+        rebuild_all()
+        self.stdout.write(
+            f'{FeedEntry.objects.count()} entries, '
+            f'{FeedDocument.objects.count()} documents')
@@ -0,0 +1,49 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('articles', '0012_active_indexes'),
+        ('tags', '0003_auto_20200829_0016'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('content', models.TextField()),
+                ('content_type', models.CharField(max_length=64)),
+                ('etag', models.CharField(max_length=64)),
+                ('last_modified', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published', models.DateTimeField()),
+                ('updated', models.DateTimeField()),
+                ('sitemap_xml', models.TextField()),
+                ('atom_xml', models.TextField()),
+                ('rss_xml', models.TextField()),
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entry', to='articles.article')),
+                ('tags', models.ManyToManyField(blank=True, related_name='feed_entries', to='tags.Tag')),
+            ],
+            options={
+                'verbose_name_plural': 'feed entries',
+                'ordering': ['-published', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-published', '-id'], name='feed_entry_published_idx'),
+        ),
+    ]
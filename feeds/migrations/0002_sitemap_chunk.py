@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feeds', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedentry',
+            name='sitemap_chunk',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
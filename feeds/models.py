@@ -0,0 +1,97 @@
+from django.db import models
+
+from articles.models import Article
+from tags.models import Tag
+
+
+class FeedEntry(models.Model):
+    """
+    the rendered sitemap, atom and rss fragments of a published article.
+    an entry is rendered by a task when the article changes, so building
+    a document only joins stored fragments and never renders markdown.
+
+    Attributes:
+        article (OneToOneField): published article
+        tags (ManyToManyField): active tags of the article, used to build the tag feeds
+        published (DateTimeField): publish_at of the article
+        updated (DateTimeField): updated of the article
+        sitemap_chunk (PositiveIntegerField): number of the sitemap document the entry is in.
+            it is given once, so an entry stays in its chunk when others are added or removed
+        sitemap_xml (TextField): <url> element of the sitemap
+        atom_xml (TextField): <entry> element of the atom feeds
+        rss_xml (TextField): <item> element of the rss feeds
+    """
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, related_name='feed_entry')
+    tags = models.ManyToManyField(Tag, blank=True, related_name='feed_entries')
+    published = models.DateTimeField()
+    updated = models.DateTimeField()
+    sitemap_chunk = models.PositiveIntegerField(default=0, db_index=True)
+    sitemap_xml = models.TextField()
+    atom_xml = models.TextField()
+    rss_xml = models.TextField()
+
+    class Meta:
+        """
+        Attributes:
+            ordering (List): use to determine the ordering of model objects when listed
+            indexes (List): feeds read the newest entries
+        """
+        ordering = ['-published', '-id']
+        indexes = [
+            models.Index(fields=['-published', '-id'], name='feed_entry_published_idx'),
+        ]
+        verbose_name_plural = 'feed entries'
+
+    def __str__(self):
+        return str(self.article_id)
+
+
+class FeedDocument(models.Model):
+    """
+    a sitemap or feed stored as it is served.
+    crawlers and feed readers read one row by key.
+
+    Attributes:
+        key (CharField): SITEMAP for the sitemap index, the sitemap chunks of get_sitemap_key(),
+            ATOM, RSS, or the tag feeds of get_tag_key()
+        content (TextField): xml document
+        content_type (CharField): mime type of the document
+        etag (CharField): quoted etag of the content
+        last_modified (DateTimeField): when the content last changed
+    """
+    SITEMAP = 'sitemap'
+    ATOM = 'atom'
+    RSS = 'rss'
+
+    key = models.CharField(max_length=64, unique=True)
+    content = models.TextField()
+    content_type = models.CharField(max_length=64)
+    etag = models.CharField(max_length=64)
+    last_modified = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
+
+    @classmethod
+    def get_sitemap_key(cls, chunk):
+        """
+        Args:
+            chunk (int): number of the sitemap chunk
+
+        Returns:
+            str: key of the sitemap chunk
+        """
+        return f'{cls.SITEMAP}:{chunk}'
+
+    @staticmethod
+    def get_tag_key(kind, tag_id):
+        """
+        Args:
+            kind (str): ATOM or RSS
+            tag_id (UUID|str): primary key of the tag
+
+        Returns:
+            str: key of the feed of the tag
+        """
+        return f'{kind}:{tag_id}'
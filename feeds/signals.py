@@ -0,0 +1,60 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from articles.models import Article
+from core.additional.signals import activity_changed
+from tags.models import Tag
+from .tasks import rebuild_feeds, update_feed_entry, update_tag_feeds
+
+
+@receiver(post_save, sender=Article)
+def update_article_entry(sender, instance, **kwargs):
+    update_feed_entry.enqueue(article_id=str(instance.pk))
+
+
+@receiver(activity_changed, sender=Article)
+def update_article_entries_in_bulk(sender, pks, **kwargs):
+    for article_id in pks:
+        update_feed_entry.enqueue(article_id=str(article_id))
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Tag)
+def rebuild_after_delete(sender, instance, **kwargs):
+    """
+    the entries and their links to tags are deleted with the row,
+    so the documents they were in are not known anymore.
+    articles and tags are deactivated rather than deleted, this is rare.
+    """
+    rebuild_feeds.enqueue()
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tagged_article_entries(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    reverse is True when the change was made from the tag side.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        if action == 'post_clear':
+            update_tag_feeds.enqueue(tag_id=str(instance.pk))
+        for article_id in pk_set or []:
+            update_feed_entry.enqueue(article_id=str(article_id))
+    else:
+        update_feed_entry.enqueue(article_id=str(instance.pk))
+
+
+@receiver(post_save, sender=Tag)
+def update_renamed_tag_feeds(sender, instance, created, **kwargs):
+    """
+    a new tag is not in any entry yet.
+    """
+    if not created:
+        update_tag_feeds.enqueue(tag_id=str(instance.pk))
+
+
+@receiver(activity_changed, sender=Tag)
+def update_tag_feeds_in_bulk(sender, pks, **kwargs):
+    for tag_id in pks:
+        update_tag_feeds.enqueue(tag_id=str(tag_id))
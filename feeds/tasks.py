@@ -0,0 +1,53 @@
+from articles.models import Article
+from tasks.registry import task
+from .builders import build_documents, rebuild_all, update_entry
+from .models import FeedEntry
+
+
+@task
+def update_feed_entry(article_id):
+    """
+    render the entry of an article and build the documents it appears in.
+    a scheduled article is updated once more at its publish_at,
+    so it appears in the feeds once it is published.
+
+    Args:
+        article_id (str): primary key of the article
+    """
+    build_documents(*update_entry(article_id))
+    publish_at = Article.objects.scheduled().filter(
+        pk=article_id).values_list('publish_at', flat=True).first()
+    if publish_at is not None:
+        update_feed_entry.enqueue(run_at=publish_at, article_id=article_id)
+
+
+@task
+def update_tag_feeds(tag_id):
+    """
+    render the entries of the articles of a tag, since they show its name,
+    and build the feeds of the tag. the feeds of an inactive tag are deleted.
+    entries that still link to the tag are rendered too, the tag
+    may have been removed from their articles.
+
+    Args:
+        tag_id (str): primary key of the tag
+    """
+    tag_ids = {tag_id}
+    chunks = set()
+    article_ids = set(Article.tags.through.objects.filter(
+        tag_id=tag_id).values_list('article_id', flat=True))
+    article_ids.update(FeedEntry.tags.through.objects.filter(
+        tag_id=tag_id).values_list('feedentry__article_id', flat=True))
+    for article_id in article_ids:
+        entry_tag_ids, entry_chunks = update_entry(article_id)
+        tag_ids.update(entry_tag_ids)
+        chunks.update(entry_chunks)
+    build_documents(tag_ids, chunks)
+
+
+@task
+def rebuild_feeds():
+    """
+    render every entry and build every document again.
+    """
+    rebuild_all()
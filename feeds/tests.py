@@ -0,0 +1,139 @@
+import io
+from http import HTTPStatus as status
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.shortcuts import reverse
+from django.utils import timezone
+
+from .models import FeedDocument, FeedEntry
+from articles.models import Article
+from tags.models import Tag
+from tasks.models import Task
+from tasks.worker import run_pending
+
+
+class FeedTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='testuser@test.com',
+            password='testuser1234',)
+        self.tag = Tag.objects.create(name='example tag')
+        self.article = Article.objects.create(
+            author=self.user,
+            title='example',
+            slug='example',
+            description='example description',
+            content='#example',
+            keywords='example',
+            publish_at='2020-01-01 00:00Z',)
+        self.article.tags.set([self.tag])
+        run_pending()
+
+    def test_published_article_is_in_every_document(self):
+        self.assertEqual(FeedEntry.objects.get().article, self.article)
+        for name in ('atom', 'rss'):
+            response = self.client.get(reverse(f'feeds:{name}'))
+            self.assertEqual(response.status_code, status.OK)
+            self.assertContains(response, '/example/')
+        response = self.client.get(reverse('feeds:sitemap'))
+        self.assertContains(response, '<sitemapindex')
+        self.assertContains(response, '/sitemap-0.xml</loc>')
+        response = self.client.get(reverse('feeds:sitemap_chunk', kwargs={'chunk': 0}))
+        self.assertContains(response, '/example/')
+        response = self.client.get(reverse('feeds:tag_atom', kwargs={'pk': self.tag.pk}))
+        self.assertContains(response, '<category term="example tag"/>')
+        self.assertContains(response, '<content type="html">&lt;h1')
+
+    def test_feed_is_served_with_one_query_and_revalidated(self):
+        url = reverse('feeds:atom')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response['Content-Type'], 'application/atom+xml; charset=utf-8')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.NOT_MODIFIED)
+
+    def test_unchanged_document_keeps_its_etag(self):
+        etag = FeedDocument.objects.get(key=FeedDocument.ATOM).etag
+        Article.objects.create(
+            author=self.user,
+            title='draft',
+            slug='draft',
+            description='draft',
+            content='#draft',
+            keywords='draft',)
+        run_pending()
+        self.assertEqual(FeedDocument.objects.get(key=FeedDocument.ATOM).etag, etag)
+
+    def test_deactivated_article_is_removed(self):
+        Article.objects.filter(pk=self.article.pk).set_active(False)
+        run_pending()
+        self.assertFalse(FeedEntry.objects.exists())
+        response = self.client.get(reverse('feeds:rss'))
+        self.assertNotContains(response, '/example/')
+
+    def test_scheduled_article_is_added_when_published(self):
+        publish_at = timezone.now() + timezone.timedelta(hours=1)
+        article = Article.objects.create(
+            author=self.user,
+            title='scheduled',
+            slug='scheduled',
+            description='scheduled',
+            content='#scheduled',
+            keywords='scheduled',
+            publish_at=publish_at,)
+        run_pending()
+        self.assertFalse(FeedEntry.objects.filter(article=article).exists())
+        scheduled = Task.objects.get(status=Task.PENDING)
+        self.assertEqual(scheduled.run_at, publish_at)
+        Article.objects.filter(pk=article.pk).update(publish_at=timezone.now())
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        self.assertTrue(FeedEntry.objects.filter(article=article).exists())
+
+    def test_deactivated_tag_feed_is_deleted(self):
+        Tag.objects.filter(pk=self.tag.pk).set_active(False)
+        run_pending()
+        response = self.client.get(reverse('feeds:tag_rss', kwargs={'pk': self.tag.pk}))
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+        self.assertNotContains(self.client.get(reverse('feeds:atom')), 'example tag')
+
+    @override_settings(FEED_SITEMAP_CHUNK_SIZE=2)
+    def test_sitemap_change_rebuilds_only_its_chunk(self):
+        articles = [self.article] + [Article.objects.create(
+            author=self.user,
+            title=f'example {number}',
+            slug=f'example-{number}',
+            description='example description',
+            content='#example',
+            keywords='example',
+            publish_at=f'2020-01-0{number + 1} 00:00Z',) for number in range(1, 5)]
+        run_pending()
+        self.assertEqual(
+            list(FeedEntry.objects.order_by('published').values_list('sitemap_chunk', flat=True)),
+            [0, 0, 1, 1, 2])
+        response = self.client.get(reverse('feeds:sitemap'))
+        for chunk in range(3):
+            self.assertContains(response, f'/sitemap-{chunk}.xml</loc>')
+        etags = dict(FeedDocument.objects.values_list('key', 'etag'))
+        Article.objects.filter(pk=articles[2].pk).set_active(False)
+        run_pending()
+        changed = {key for key, etag in FeedDocument.objects.values_list('key', 'etag')
+                   if etags.get(key) != etag}
+        self.assertEqual(changed, {FeedDocument.SITEMAP, FeedDocument.get_sitemap_key(1),
+                                   FeedDocument.ATOM, FeedDocument.RSS})
+        response = self.client.get(reverse('feeds:sitemap_chunk', kwargs={'chunk': 1}))
+        self.assertNotContains(response, '/example-2/')
+        self.assertContains(response, '/example-3/')
+        call_command('rebuild_feeds', stdout=io.StringIO())
+        self.assertEqual(
+            list(FeedEntry.objects.order_by('published').values_list('sitemap_chunk', flat=True)),
+            [0, 0, 1, 1])
+        self.assertFalse(FeedDocument.objects.filter(key=FeedDocument.get_sitemap_key(2)).exists())
+        self.assertNotContains(self.client.get(reverse('feeds:sitemap')), '/sitemap-2.xml')
@@ -0,0 +1,18 @@
+from django.urls import path
+
+from .models import FeedDocument
+from .views import FeedDocumentView
+
+app_name = 'feeds'
+
+urlpatterns = [
+    path('sitemap.xml', FeedDocumentView.as_view(key=FeedDocument.SITEMAP), name='sitemap'),
+    path('sitemap-<int:chunk>.xml',
+         FeedDocumentView.as_view(key=FeedDocument.SITEMAP), name='sitemap_chunk'),
+    path('feeds/atom.xml', FeedDocumentView.as_view(key=FeedDocument.ATOM), name='atom'),
+    path('feeds/rss.xml', FeedDocumentView.as_view(key=FeedDocument.RSS), name='rss'),
+    path('feeds/tags/<uuid:pk>/atom.xml',
+         FeedDocumentView.as_view(key=FeedDocument.ATOM), name='tag_atom'),
+    path('feeds/tags/<uuid:pk>/rss.xml',
+         FeedDocumentView.as_view(key=FeedDocument.RSS), name='tag_rss'),
+]
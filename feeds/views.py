@@ -0,0 +1,36 @@
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from core.additional.conditional_get import ConditionalGetMixin
+from .models import FeedDocument
+
+
+class FeedDocumentView(ConditionalGetMixin, View):
+    """
+    serve a stored sitemap or feed with one query by key.
+    the documents are built by tasks when articles change,
+    so polling never reads the articles or renders markdown.
+
+    Attributes:
+        key (str): key of the document, the sitemap chunks and the tag feeds build it from the url
+    """
+    key = None
+
+    def get_key(self):
+        chunk = self.kwargs.get('chunk')
+        if chunk is not None:
+            return FeedDocument.get_sitemap_key(chunk)
+        pk = self.kwargs.get('pk')
+        if pk is None:
+            return self.key
+        return FeedDocument.get_tag_key(self.key, pk)
+
+    def get_validators(self):
+        self.document = FeedDocument.objects.filter(key=self.get_key()).first()
+        if self.document is None:
+            raise Http404
+        return self.document.etag, self.document.last_modified
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(self.document.content,
+                            content_type=self.document.content_type)
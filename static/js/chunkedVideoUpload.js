@@ -0,0 +1,127 @@
+/**
+ * upload the video chosen in the article form in chunks before the form is sent.
+ * every chunk is sent with its range and sha256, a failed chunk is retried
+ * from the offset the server reports, and an upload interrupted by a reload
+ * resumes when the same file is chosen again.
+ * once complete, the upload id is put in the hidden video_upload field
+ * and the file input is cleared so the form does not carry the video.
+ */
+
+const chunkedVideoUpload = (inputId, hiddenId, startUrl, csrfToken) => {
+    const input = document.getElementById(inputId);
+    const hidden = document.getElementById(hiddenId);
+    if (!input || !hidden) {
+        return;
+    }
+    const form = input.form;
+    const progress = document.createElement('progress');
+    progress.className = 'uk-progress';
+    progress.hidden = true;
+    input.after(progress);
+    const maxRetries = 5;
+
+    const toHex = (buffer) => Array.from(new Uint8Array(buffer))
+        .map(byte => byte.toString(16).padStart(2, '0')).join('');
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    const storageKey = (file) => `chunked-upload:${file.name}:${file.size}:${file.lastModified}`;
+
+    const request = (url, options = {}) => fetch(url, {
+        credentials: 'same-origin',
+        ...options,
+        headers: {'X-CSRFToken': csrfToken, ...(options.headers || {})},
+    });
+
+    const openSession = async (file) => {
+        const saved = localStorage.getItem(storageKey(file));
+        if (saved) {
+            const response = await request(saved);
+            if (response.ok) {
+                return response.json();
+            }
+        }
+        const formData = new FormData();
+        formData.append('name', file.name);
+        formData.append('size', file.size);
+        formData.append('content_type', file.type);
+        const response = await request(startUrl, {method: 'POST', body: formData});
+        if (!response.ok) {
+            throw new Error((await response.json()).error);
+        }
+        const session = await response.json();
+        localStorage.setItem(storageKey(file), session.url);
+        return session;
+    };
+
+    const sendChunks = async (file, session) => {
+        const chunkSize = session.chunk_size || 8 * 1024 * 1024;
+        let offset = session.offset;
+        let retries = 0;
+        while (offset < file.size) {
+            progress.value = offset / file.size;
+            const chunk = await file.slice(offset, offset + chunkSize).arrayBuffer();
+            const digest = toHex(await crypto.subtle.digest('SHA-256', chunk));
+            let response;
+            try {
+                response = await request(session.url, {
+                    method: 'PUT',
+                    body: chunk,
+                    headers: {
+                        'Content-Type': 'application/octet-stream',
+                        'Content-Range': `bytes ${offset}-${offset + chunk.byteLength - 1}/${file.size}`,
+                        'X-Chunk-Sha256': digest,
+                    },
+                });
+            } catch (error) {
+                response = null;
+            }
+            if (response && response.ok) {
+                offset = (await response.json()).offset;
+                retries = 0;
+                continue;
+            }
+            if (response && response.status === 409) {
+                // the server has a different offset, continue from there
+                offset = (await response.json()).offset;
+                continue;
+            }
+            if (++retries > maxRetries) {
+                throw new Error('upload failed, choose the file again to resume.');
+            }
+            await sleep(1000 * 2 ** retries);
+            const state = await request(session.url).then(r => r.json()).catch(() => null);
+            if (state) {
+                offset = state.offset;
+            }
+        }
+        const response = await request(`${session.url}complete/`, {method: 'POST'});
+        if (!response.ok) {
+            throw new Error((await response.json()).error);
+        }
+        return response.json();
+    };
+
+    input.addEventListener('change', async () => {
+        const file = input.files[0];
+        hidden.value = '';
+        if (!file) {
+            return;
+        }
+        const submit = form.querySelector('[type="submit"]');
+        submit.disabled = true;
+        progress.hidden = false;
+        progress.value = 0;
+        try {
+            const session = await sendChunks(file, await openSession(file));
+            localStorage.removeItem(storageKey(file));
+            hidden.value = session.id;
+            input.value = '';
+            progress.value = 1;
+            UIkit.notification(`${file.name} uploaded.`, {status: 'success'});
+        } catch (error) {
+            console.error(error);
+            UIkit.notification(`${file.name}: ${error.message}`, {status: 'danger'});
+        } finally {
+            submit.disabled = false;
+        }
+    });
+}
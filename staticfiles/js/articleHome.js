@@ -7,4 +7,39 @@ document.addEventListener('DOMContentLoaded', _ => {
             searchForm.submit();
         });
     }
-});
\ No newline at end of file
+
+    // load the next page of articles when the "more" link scrolls into view.
+    // the fragment ends with the link to the page after it.
+    const loadMore = (link, observer) => {
+        observer.unobserve(link);
+        fetch(link.dataset.fragmentUrl, {credentials: 'same-origin'})
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(html => {
+                link.insertAdjacentHTML('afterend', html);
+                const links = link.parentElement.querySelectorAll('.article-list-more');
+                const next = Array.from(links).find(other => other !== link);
+                link.remove();
+                if (next) {
+                    observer.observe(next);
+                }
+            })
+            .catch(error => console.error(error));
+    };
+
+    const moreLink = document.querySelector('.article-list-more');
+    if (moreLink && 'IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(entries => {
+            for (const entry of entries) {
+                if (entry.isIntersecting) {
+                    loadMore(entry.target, observer);
+                }
+            }
+        }, {rootMargin: '200px'});
+        observer.observe(moreLink);
+    }
+});
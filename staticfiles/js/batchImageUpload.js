@@ -0,0 +1,55 @@
+/**
+ * upload every image dropped or pasted into the martor editor in one request
+ * and insert the returned links at the cursor.
+ */
+
+const batchImageUpload = (fieldName, uploadUrl, csrfToken) => {
+    const editorElement = document.getElementById(`martor-${fieldName}`);
+    if (!editorElement) {
+        return;
+    }
+    const editor = ace.edit(editorElement);
+
+    const upload = (files) => {
+        const images = Array.from(files).filter(file => file.type.startsWith('image/'));
+        if (images.length === 0) {
+            return false;
+        }
+        const formData = new FormData();
+        for (const image of images) {
+            formData.append('markdown-image-upload', image);
+        }
+        fetch(uploadUrl, {
+            method: 'POST',
+            body: formData,
+            headers: {'X-CSRFToken': csrfToken},
+            credentials: 'same-origin',
+        }).then(response => response.json()).then(manifest => {
+            const lines = [];
+            for (const file of manifest.files || []) {
+                if (file.status === 200) {
+                    lines.push(`![${file.name}](${file.link})`);
+                } else {
+                    UIkit.notification(`${file.name}: ${file.error}`, {status: 'danger'});
+                }
+            }
+            if (lines.length > 0) {
+                editor.insert(lines.join('\n') + '\n');
+            }
+        }).catch(error => console.error(error));
+        return true;
+    };
+
+    editorElement.addEventListener('drop', event => {
+        if (upload(event.dataTransfer.files)) {
+            event.preventDefault();
+            event.stopPropagation();
+        }
+    }, true);
+    editorElement.addEventListener('paste', event => {
+        if (upload(event.clipboardData.files)) {
+            event.preventDefault();
+            event.stopPropagation();
+        }
+    }, true);
+}
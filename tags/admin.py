@@ -4,14 +4,14 @@ from .models import Tag
 
 
 def active(self, request, queryset):
-    queryset.update(is_active=True)
+    queryset.set_active(True)
 
 
 active.short_description = '閲覧可能'
 
 
 def inactive(self, request, queryset):
-    queryset.update(is_active=False)
+    queryset.set_active(False)
 
 
 inactive.short_description = '閲覧不可能'
@@ -21,6 +21,8 @@ class TagAdmin(admin.ModelAdmin):
     list_display = [
         'id',
         'name',
+        'published_count',
+        'latest_published_at',
         'is_active',
     ]
     list_display_links = [
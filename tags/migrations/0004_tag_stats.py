@@ -0,0 +1,61 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:29
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+
+def fill_tag_stats(apps, schema_editor):
+    """
+    count the published articles of every tag once.
+    tags with scheduled articles get the task that refreshes them at publish_at.
+    """
+    Tag = apps.get_model('tags', 'Tag')
+    Task = apps.get_model('tasks', 'Task')
+    now = timezone.now()
+    published = Q(article__is_active=True, article__publish_at__lte=now)
+    scheduled = Q(article__is_active=True, article__publish_at__gt=now)
+    tags = Tag.objects.annotate(
+        count=Count('article', filter=published),
+        latest=Max('article__publish_at', filter=published),
+        next=Min('article__publish_at', filter=scheduled),)
+    for tag in tags:
+        tag.published_count = tag.count
+        tag.latest_published_at = tag.latest
+        tag.next_publish_at = tag.next
+        tag.save(update_fields=['published_count', 'latest_published_at', 'next_publish_at'])
+        if tag.next is not None:
+            Task.objects.create(
+                name='tags.tasks.update_tag_stats',
+                payload={'tag_ids': [str(tag.pk)]},
+                run_at=tag.next,
+                max_attempts=settings.TASK_MAX_ATTEMPTS,)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0003_auto_20200829_0016'),
+        ('articles', '0012_active_indexes'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='latest_published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='next_publish_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='published_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_tag_stats, migrations.RunPython.noop),
+    ]
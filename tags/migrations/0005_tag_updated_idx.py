@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0004_tag_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-updated'], name='tag_updated_idx'),
+        ),
+    ]
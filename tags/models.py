@@ -1,10 +1,11 @@
 from django.db import models
 from django.db.models import Q
+from django.urls import reverse
 
-from core.additional.models import CoreModel
+from core.additional.models import CoreModel, CoreQuerySet
 
 
-class TagQuerySet(models.QuerySet):
+class TagQuerySet(CoreQuerySet):
 
     def all(self):
         return self.filter(is_active=True)
@@ -16,6 +17,20 @@ class TagQuerySet(models.QuerySet):
         )
         return self.filter(lookup)
 
+    def published(self):
+        """
+        active tags of at least one published article,
+        read from the stored statistics.
+
+        Returns:
+            queryset: tags ordered by name
+        """
+        lookup = (
+            Q(is_active=True) &
+            Q(published_count__gt=0)
+        )
+        return self.filter(lookup).order_by('name')
+
 
 class TagManager(models.Manager):
 
@@ -30,6 +45,9 @@ class TagManager(models.Manager):
             return self.get_queryset().none()
         return self.get_queryset().search(query)
 
+    def published(self):
+        return self.get_queryset().published()
+
 
 class Tag(CoreModel):
     """
@@ -37,8 +55,19 @@ class Tag(CoreModel):
 
     Attributes:
         name (CharField): the name of tag
+        published_count (PositiveIntegerField): number of active published articles with the tag
+        latest_published_at (DateTimeField): newest publish_at of those articles
+        next_publish_at (DateTimeField): oldest publish_at of the scheduled articles with the tag.
+                                         the statistics are refreshed again at this time
+
+    Note:
+        the statistics are maintained by tags.tasks.refresh_tag_stats
+        when articles or their tags change, so pages never count the articles.
     """
     name = models.CharField(max_length=100, unique=True)
+    published_count = models.PositiveIntegerField(default=0, editable=False)
+    latest_published_at = models.DateTimeField(null=True, blank=True, editable=False)
+    next_publish_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     objects = TagManager()
 
@@ -46,8 +75,15 @@ class Tag(CoreModel):
         """
         Attributes:
             ordering (List): use to determine the ordering of model objects when listed
+            indexes (List): updated is indexed for the validators of the article list
         """
         ordering = ['timestamp', 'updated', ]
+        indexes = [
+            models.Index(fields=['-updated'], name='tag_updated_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+    def get_absolute_url(self):
+        return reverse('tags:tag_detail', kwargs={'pk': self.pk})
@@ -0,0 +1,59 @@
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+from articles.page_cache import TAG_LIST, tag_key
+from core.additional.page_cache import invalidate
+from tasks.registry import task
+from .models import Tag
+
+STAT_FIELDS = ['published_count', 'latest_published_at', 'next_publish_at']
+
+
+def refresh_tag_stats(tag_ids):
+    """
+    count the published articles of the given tags and store the result.
+    only the rows of these tags are aggregated, and only the tags whose
+    statistics changed are written. when a tag has scheduled articles
+    the refresh is enqueued again for the next publish_at.
+
+    Args:
+        tag_ids (Iterable[UUID|str]): tags whose articles changed
+
+    Returns:
+        List[Tag]: tags whose statistics changed
+    """
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return []
+    now = timezone.now()
+    published = Q(article__is_active=True, article__publish_at__lte=now)
+    scheduled = Q(article__is_active=True, article__publish_at__gt=now)
+    tags = Tag.objects.get_queryset().filter(pk__in=tag_ids).annotate(
+        new_published_count=Count('article', filter=published),
+        new_latest_published_at=Max('article__publish_at', filter=published),
+        new_next_publish_at=Min('article__publish_at', filter=scheduled),)
+    changed = []
+    for tag in tags:
+        values = [getattr(tag, f'new_{field}') for field in STAT_FIELDS]
+        if values == [getattr(tag, field) for field in STAT_FIELDS]:
+            continue
+        if tag.new_next_publish_at not in (None, tag.next_publish_at):
+            update_tag_stats.enqueue(run_at=tag.new_next_publish_at, tag_ids=[str(tag.pk)])
+        for field, value in zip(STAT_FIELDS, values):
+            setattr(tag, field, value)
+        changed.append(tag)
+    if changed:
+        Tag.objects.bulk_update(changed, STAT_FIELDS)
+        invalidate(TAG_LIST, *[tag_key(tag.pk) for tag in changed])
+    return changed
+
+
+@task
+def update_tag_stats(tag_ids):
+    """
+    refresh the statistics of tags once their scheduled articles are published.
+
+    Args:
+        tag_ids (List[str]): primary keys of the tags
+    """
+    refresh_tag_stats(tag_ids)
@@ -1,8 +1,15 @@
+from http import HTTPStatus as status
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.shortcuts import reverse
+from django.utils import timezone
 
 from .models import Tag
+from .tasks import update_tag_stats
+from articles.models import Article
+from tasks.models import Task
+from tasks.worker import run_pending
 
 
 class TagModelTestCase(TestCase):
@@ -25,3 +32,74 @@ class TagModelTestCase(TestCase):
         tags = Tag.objects.all()
         self.assertEqual(tags.count(), 1)
         self.assertEqual(second_tag.name, 'example2')
+
+
+class TagStatsTestCase(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='testuser@test.com',
+            password='testuser1234',)
+        self.tag = Tag.objects.create(name='example')
+        self.article = Article.objects.create(
+            author=self.user,
+            title='example',
+            slug='example',
+            description='example description',
+            content='#example',
+            keywords='example',
+            publish_at='2020-01-01 00:00Z',)
+        self.article.tags.set([self.tag])
+
+    def get_tag(self):
+        return Tag.objects.get_queryset().get(pk=self.tag.pk)
+
+    def test_tag_change_updates_stats(self):
+        tag = self.get_tag()
+        self.assertEqual(tag.published_count, 1)
+        self.assertEqual(tag.latest_published_at.year, 2020)
+        self.article.tags.clear()
+        self.assertEqual(self.get_tag().published_count, 0)
+        self.tag.article_set.add(self.article)
+        self.assertEqual(self.get_tag().published_count, 1)
+
+    def test_soft_delete_updates_stats(self):
+        self.article.is_active = False
+        self.article.save()
+        self.assertEqual(self.get_tag().published_count, 0)
+        Article.objects.get_queryset().filter(pk=self.article.pk).set_active(True)
+        self.assertEqual(self.get_tag().published_count, 1)
+
+    def test_scheduled_article_is_counted_when_published(self):
+        publish_at = timezone.now() + timezone.timedelta(hours=1)
+        article = Article.objects.create(
+            author=self.user,
+            title='scheduled',
+            slug='scheduled',
+            description='scheduled',
+            content='#scheduled',
+            keywords='scheduled',
+            publish_at=publish_at,)
+        article.tags.set([self.tag])
+        tag = self.get_tag()
+        self.assertEqual(tag.published_count, 1)
+        self.assertEqual(tag.next_publish_at, publish_at)
+        scheduled = Task.objects.get(name=update_tag_stats.task_name)
+        self.assertEqual(scheduled.run_at, publish_at)
+        Article.objects.filter(pk=article.pk).update(publish_at=timezone.now())
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        tag = self.get_tag()
+        self.assertEqual(tag.published_count, 2)
+        self.assertIsNone(tag.next_publish_at)
+
+    def test_tag_pages_read_stored_stats(self):
+        Tag.objects.create(name='unused')
+        response = self.client.get(reverse('tags:tag_list'))
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual([tag.name for tag in response.context['tag_list']], ['example'])
+        response = self.client.get(self.tag.get_absolute_url())
+        self.assertEqual(response.status_code, status.OK)
+        self.assertContains(response, '1 articles')
+        self.assertEqual(list(response.context['article_list']), [self.article])
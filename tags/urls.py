@@ -1,9 +1,11 @@
 from django.urls import path
 
-from .views import TagAjaxCreateView
+from .views import TagAjaxCreateView, TagDetailView, TagListView
 
 app_name = 'tags'
 
 urlpatterns = [
     path('create/ajax/', TagAjaxCreateView.as_view(), name='tag_ajax_new'),
+    path('<uuid:pk>/', TagDetailView.as_view(), name='tag_detail'),
+    path('', TagListView.as_view(), name='tag_list'),
 ]
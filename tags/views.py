@@ -1,7 +1,17 @@
-from django.http import JsonResponse
-from django.views.generic import View
+import math
+
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
+from django.views.generic import DetailView, ListView, View
 
 from .models import Tag
+from articles.models import Article
+from articles.page_cache import ARTICLE_LIST, TAG_LIST, get_page_timeout, tag_key
+from core.additional.page_cache import PageCacheMixin
+from core.additional.paginator import CursorPaginator
+
+# font sizes of the tag cloud in rem, from the least to the most used tag
+CLOUD_SIZES = (0.875, 1, 1.25, 1.5, 2)
 
 
 class TagAjaxCreateView(View):
@@ -14,3 +24,79 @@ class TagAjaxCreateView(View):
             'name': tag.name,
         }
         return JsonResponse(context)
+
+
+class TagListView(PageCacheMixin, ListView):
+    """
+    tag cloud of the tags of published articles.
+    the counts are read from the stored statistics of the tags.
+
+    Attributes:
+        template_name (str): a path to template that is responsible to render objects
+        context_object_name (str): to override context object name used in template
+    """
+    template_name = 'tags/tag_list.html'
+    context_object_name = 'tag_list'
+
+    def get_queryset(self):
+        return Tag.objects.published()
+
+    def get_context_data(self, **kwargs):
+        """
+        the font size of each tag grows with the log of its count.
+        """
+        context = super().get_context_data(**kwargs)
+        tags = list(context['tag_list'])
+        largest = max((tag.published_count for tag in tags), default=1)
+        scale = math.log(largest + 1)
+        for tag in tags:
+            step = math.log(tag.published_count + 1) / scale if scale else 0
+            tag.cloud_size = CLOUD_SIZES[round(step * (len(CLOUD_SIZES) - 1))]
+        context['tag_list'] = tags
+        return context
+
+    def get_page_dependencies(self):
+        return [TAG_LIST]
+
+
+class TagDetailView(PageCacheMixin, DetailView):
+    """
+    landing page of a tag with its published articles, newest first.
+    the articles are paged by cursor like the article list.
+
+    Attributes:
+        template_name (str): a path to template that is responsible to render objects
+        context_object_name (str): to override context object name used in template
+        paginate_by (int): number of articles in a page
+        cursor_kwarg (str): query parameter of the keyset pagination cursor
+    """
+    template_name = 'tags/tag_detail.html'
+    context_object_name = 'tag'
+    paginate_by = 20
+    cursor_kwarg = 'cursor'
+
+    def get_queryset(self):
+        return Tag.objects.all()
+
+    def get_context_data(self, **kwargs):
+        """
+        Raises:
+            Http404: when the cursor is invalid
+        """
+        context = super().get_context_data(**kwargs)
+        paginator = CursorPaginator(
+            Article.objects.published().filter(tags=self.object),
+            self.paginate_by, 'publish_at')
+        try:
+            page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        context['article_list'] = page.object_list
+        context['next_cursor'] = page.next_cursor
+        return context
+
+    def get_page_dependencies(self):
+        return [tag_key(self.object.pk), ARTICLE_LIST]
+
+    def get_page_timeout(self):
+        return get_page_timeout()
@@ -0,0 +1,56 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    """
+    custom admin for model Task.
+    pending and failed tasks are visible here, failed tasks can be retried.
+
+    Attributes:
+        list_desplay (List): list of fields in model to display in admin site
+        list_filter (List): list of fields in model that the user can filter through in admin site
+        search_fields (List): list of fields in model that the user can search through in admin site
+        readonly_fields (List): list of fields that can not be edited in admin site
+        actions (List): list of custom functions to add custom actions to admin site
+    """
+
+    list_display = [
+        'id',
+        'name',
+        'status',
+        'attempts',
+        'max_attempts',
+        'run_at',
+        'timestamp',
+    ]
+    list_filter = [
+        'status',
+        'name',
+    ]
+    search_fields = [
+        'name',
+    ]
+    readonly_fields = [
+        'attempts',
+        'locked_at',
+        'last_error',
+        'timestamp',
+        'updated',
+    ]
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        """
+        function to run the selected tasks again from the first attempt.
+        used in admin site.
+        """
+        queryset.exclude(status=Task.RUNNING).update(
+            status=Task.PENDING, attempts=0, run_at=timezone.now(), locked_at=None)
+
+    retry.short_description = '再実行'
+
+
+admin.site.register(Task, TaskAdmin)
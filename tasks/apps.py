@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    name = 'tasks'
+
+    def ready(self):
+        """
+        import the tasks module of every installed app
+        so the worker knows every registered task.
+        """
+        autodiscover_modules('tasks')
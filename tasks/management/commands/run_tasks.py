@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import run_pending
+
+
+class Command(BaseCommand):
+    """
+    run tasks stored in the database.
+    the worker polls the queue and sleeps TASK_POLL_INTERVAL seconds
+    when it is empty. several workers can run at the same time.
+
+    Example:
+        python manage.py run_tasks
+        python manage.py run_tasks --burst
+    """
+    help = 'Run pending background tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='exit once the queue is empty instead of polling.')
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='exit after running this many tasks.')
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        total = 0
+        while limit is None or total < limit:
+            count = run_pending(None if limit is None else limit - total)
+            total += count
+            if count == 0:
+                if options['burst']:
+                    break
+                time.sleep(settings.TASK_POLL_INTERVAL)
+        self.stdout.write(self.style.SUCCESS(f'ran {total} task(s).'))
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:45
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='payload')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=10, verbose_name='status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=1, verbose_name='max attempts')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='run at')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='locked at')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('-timestamp',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'run_at'], name='tasks_task_status_run_at'),
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    custom QuerySet for model Task
+    """
+
+    def runnable(self, now=None):
+        """
+        pending tasks that are due, and running tasks whose worker
+        has held the lock longer than TASK_LOCK_TIMEOUT.
+
+        Args:
+            now (datetime): current time. defaults to timezone.now()
+
+        Returns:
+            queryset: tasks a worker can claim, oldest first
+        """
+        now = now or timezone.now()
+        expired = now - timezone.timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+        lookup: Q = (
+            Q(status=Task.PENDING, run_at__lte=now) |
+            Q(status=Task.RUNNING, locked_at__lt=expired)
+        )
+        return self.filter(lookup).order_by('run_at')
+
+
+class TaskManager(models.Manager):
+    """
+    custom manager for model Task using TaskQuerySet
+    """
+
+    def get_queryset(self):
+        """
+        set custom QuerySet to use in manager
+
+        Returns:
+            TaskQuerySet: return TaskQuerySet using model Task
+        """
+        return TaskQuerySet(self.model, using=self._db)
+
+    def runnable(self, now=None):
+        """
+        call .runnable() from TaskQuerySet
+
+        Returns:
+            queryset: return queryset returned from TaskQuerySet.runnable()
+        """
+        return self.get_queryset().runnable(now)
+
+
+class Task(models.Model):
+    """
+    a job stored in the database and executed by `python manage.py run_tasks`.
+    the row is written in the same transaction as the data it refers to,
+    so a task is never lost and never runs before that data is committed.
+
+    Attributes:
+        name (CharField): dotted name of the registered function
+        payload (JSONField): keyword arguments of the function
+        status (CharField): pending, running, done or failed
+        attempts (PositiveIntegerField): number of times the task was started
+        max_attempts (PositiveIntegerField): the task fails after this many attempts
+        run_at (DateTimeField): the task is not started before this time
+        locked_at (DateTimeField): when a worker started the current attempt
+        last_error (TextField): traceback of the last failed attempt
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'pending'),
+        (RUNNING, 'running'),
+        (DONE, 'done'),
+        (FAILED, 'failed'),
+    ]
+
+    name = models.CharField('name', max_length=255)
+    payload = models.JSONField('payload', default=dict, blank=True)
+    status = models.CharField(
+        'status', max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField('attempts', default=0)
+    max_attempts = models.PositiveIntegerField('max attempts', default=1)
+    run_at = models.DateTimeField('run at', default=timezone.now)
+    locked_at = models.DateTimeField('locked at', null=True, blank=True)
+    last_error = models.TextField('last error', blank=True)
+    timestamp = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = TaskManager()
+
+    class Meta:
+        ordering = ('-timestamp', )
+        indexes = [
+            models.Index(fields=['status', 'run_at'],
+                         name='tasks_task_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
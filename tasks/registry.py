@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.utils import timezone
+
+_registry = {}
+
+
+class UnknownTask(Exception):
+    """
+    raised when a task name is not registered with @task
+    """
+
+
+def get_task_name(func):
+    return f'{func.__module__}.{func.__name__}'
+
+
+def task(func=None, *, max_attempts=None):
+    """
+    register a function as a task.
+    the function is called by the worker with the payload as keyword arguments,
+    so the payload must be serializable to json.
+    a task can be attempted more than once, keep it idempotent.
+
+    Example:
+        @task
+        def send_comment_notification(comment_id):
+            ...
+
+        send_comment_notification.enqueue(comment_id=str(comment.pk))
+
+    Args:
+        func (Callable): function to register
+        max_attempts (int): defaults to settings.TASK_MAX_ATTEMPTS
+
+    Returns:
+        Callable: the function with an enqueue attribute
+    """
+    def register(func):
+        name = get_task_name(func)
+        _registry[name] = func
+        func.task_name = name
+
+        def enqueue(run_at=None, **payload):
+            return enqueue_task(name, payload, run_at=run_at,
+                                max_attempts=max_attempts)
+
+        func.enqueue = enqueue
+        return func
+
+    if func is None:
+        return register
+    return register(func)
+
+
+def get_task(name):
+    """
+    Args:
+        name (str): dotted name of the task
+
+    Returns:
+        Callable: the registered function
+
+    Raises:
+        UnknownTask: if no function is registered under the name
+    """
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(name)
+
+
+def enqueue_task(name, payload, run_at=None, max_attempts=None):
+    """
+    store a task for the worker.
+    call it inside the transaction that writes the data the task needs,
+    the worker only sees the task once that transaction is committed.
+
+    Args:
+        name (str): dotted name of the task
+        payload (dict): keyword arguments of the task
+        run_at (datetime): the task is not started before this time
+        max_attempts (int): defaults to settings.TASK_MAX_ATTEMPTS
+
+    Returns:
+        Task: the stored task
+    """
+    from .models import Task
+
+    get_task(name)
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,)
@@ -0,0 +1,93 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .registry import UnknownTask, enqueue_task, task
+from .worker import claim_task, run_pending
+
+calls = []
+
+
+@task
+def record_call(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def always_fail():
+    raise RuntimeError('smtp is down')
+
+
+@override_settings(TASK_RETRY_DELAY=30, TASK_RETRY_MAX_DELAY=3600)
+class TaskQueueTestCase(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_pending_task(self):
+        record_call.enqueue(value=1)
+        stored = Task.objects.get()
+        self.assertEqual(stored.name, 'tasks.tests.record_call')
+        self.assertEqual(stored.payload, {'value': 1})
+        self.assertEqual(stored.status, Task.PENDING)
+        self.assertEqual(calls, [])
+
+    def test_enqueue_unknown_task(self):
+        with self.assertRaises(UnknownTask):
+            enqueue_task('tasks.tests.missing', {})
+
+    def test_worker_runs_due_tasks_only(self):
+        record_call.enqueue(value=1)
+        record_call.enqueue(
+            value=2, run_at=timezone.now() + timezone.timedelta(hours=1))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 1)
+        self.assertEqual(Task.objects.filter(status=Task.PENDING).count(), 1)
+
+    def test_failed_task_is_retried_with_backoff(self):
+        always_fail.enqueue()
+        before = timezone.now()
+        run_pending()
+        stored = Task.objects.get()
+        self.assertEqual(stored.status, Task.PENDING)
+        self.assertEqual(stored.attempts, 1)
+        self.assertIn('smtp is down', stored.last_error)
+        self.assertGreaterEqual(stored.run_at, before + timezone.timedelta(seconds=30))
+        # the retry is not due yet
+        self.assertIsNone(claim_task())
+        Task.objects.update(run_at=timezone.now())
+        run_pending()
+        stored.refresh_from_db()
+        self.assertEqual(stored.status, Task.FAILED)
+        self.assertEqual(stored.attempts, 2)
+
+    def test_abandoned_task_is_claimed_again(self):
+        record_call.enqueue(value=1)
+        Task.objects.update(
+            status=Task.RUNNING,
+            locked_at=timezone.now() - timezone.timedelta(hours=1))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_abandoned_task_without_attempts_left_fails(self):
+        abandoned = record_call.enqueue(value=1)
+        record_call.enqueue(value=2)
+        Task.objects.filter(pk=abandoned.pk).update(
+            status=Task.RUNNING,
+            attempts=abandoned.max_attempts,
+            locked_at=timezone.now() - timezone.timedelta(hours=1))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [2])
+        stored = Task.objects.get(pk=abandoned.pk)
+        self.assertEqual(stored.status, Task.FAILED)
+        self.assertEqual(stored.attempts, stored.max_attempts)
+        self.assertIsNone(stored.locked_at)
+        self.assertIn('expired', stored.last_error)
+
+    def test_run_tasks_command(self):
+        record_call.enqueue(value=1)
+        record_call.enqueue(value=2)
+        call_command('run_tasks', burst=True, stdout=open('/dev/null', 'w'))
+        self.assertEqual(sorted(calls), [1, 2])
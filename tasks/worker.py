@@ -0,0 +1,123 @@
+import logging
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+
+def get_retry_delay(attempts):
+    """
+    exponential backoff between attempts.
+
+    Args:
+        attempts (int): number of attempts made so far
+
+    Returns:
+        timedelta: delay before the next attempt
+    """
+    seconds = settings.TASK_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+    return timezone.timedelta(
+        seconds=min(seconds, settings.TASK_RETRY_MAX_DELAY))
+
+
+def claim_task():
+    """
+    lock the oldest runnable task and mark it as running.
+    skip_locked lets several workers poll the same table
+    without waiting on each other or claiming the same row.
+    a running task whose lock expired counts its lost attempt,
+    it is marked as failed instead of claimed once it has no attempts left.
+
+    Returns:
+        Task|None: the claimed task, None if the queue is empty
+    """
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            task = Task.objects.runnable(now).select_for_update(
+                skip_locked=True).first()
+            if task is None:
+                return None
+            if task.status == Task.RUNNING and task.attempts >= task.max_attempts:
+                fail_expired_task(task)
+                continue
+            task.status = Task.RUNNING
+            task.locked_at = now
+            task.attempts += 1
+            task.save(update_fields=['status', 'locked_at', 'attempts', 'updated'])
+        return task
+
+
+def fail_expired_task(task):
+    """
+    mark a task whose worker died or timed out on its last attempt as failed.
+
+    Args:
+        task (Task): locked running task with an expired lock
+    """
+    task.status = Task.FAILED
+    task.last_error = (f'the lock taken at {task.locked_at.isoformat()} expired '
+                       f'after attempt {task.attempts} of {task.max_attempts}')
+    task.locked_at = None
+    task.save(update_fields=['status', 'locked_at', 'last_error', 'updated'])
+    logger.error('task %s %s failed, its lock expired', task.pk, task.name)
+
+
+def run_task(task):
+    """
+    call the function of a claimed task and record the outcome.
+    a failed task goes back to pending with a backoff delay
+    until it runs out of attempts.
+
+    Args:
+        task (Task): task returned by claim_task()
+
+    Returns:
+        bool: True if the task succeeded
+    """
+    try:
+        get_task(task.name)(**task.payload)
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+            logger.error('task %s %s failed', task.pk, task.name)
+        else:
+            task.status = Task.PENDING
+            task.run_at = timezone.now() + get_retry_delay(task.attempts)
+            logger.warning('task %s %s will be retried at %s',
+                           task.pk, task.name, task.run_at)
+        succeeded = False
+    else:
+        task.status = Task.DONE
+        succeeded = True
+    task.locked_at = None
+    task.save(update_fields=[
+        'status', 'run_at', 'locked_at', 'last_error', 'updated'])
+    return succeeded
+
+
+def run_pending(limit=None):
+    """
+    run runnable tasks until the queue is empty.
+
+    Args:
+        limit (int): maximum number of tasks to run. no limit if None
+
+    Returns:
+        int: number of tasks run
+    """
+    count = 0
+    while limit is None or count < limit:
+        task = claim_task()
+        if task is None:
+            break
+        run_task(task)
+        count += 1
+    return count
@@ -0,0 +1,70 @@
+from django.contrib import admin
+
+from .models import ChunkedUpload, Upload
+
+
+class UploadAdmin(admin.ModelAdmin):
+    """
+    custom admin for model Upload
+
+    Attributes:
+        list_desplay (List): list of fields in model to display in admin site
+        list_filter (List): list of fields in model that the user can filter through in admin site
+        search_fields (List): list of fields in model that the user can search through in admin site
+        readonly_fields (List): list of fields that can not be edited in admin site
+    """
+
+    list_display = [
+        'id',
+        'name',
+        'size',
+        'status',
+        'timestamp',
+    ]
+    list_filter = [
+        'status',
+    ]
+    search_fields = [
+        'name',
+    ]
+    readonly_fields = [
+        'spool_name',
+        'url',
+        'status',
+    ]
+
+
+admin.site.register(Upload, UploadAdmin)
+
+
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    """
+    custom admin for model ChunkedUpload
+
+    Attributes:
+        list_desplay (List): list of fields in model to display in admin site
+        list_filter (List): list of fields in model that the user can filter through in admin site
+        readonly_fields (List): list of fields that can not be edited in admin site
+    """
+
+    list_display = [
+        'id',
+        'name',
+        'user',
+        'offset',
+        'size',
+        'status',
+        'updated',
+    ]
+    list_filter = [
+        'status',
+    ]
+    readonly_fields = [
+        'offset',
+        'sha256',
+        'spool_name',
+        'status',
+    ]
+
+
+admin.site.register(ChunkedUpload, ChunkedUploadAdmin)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+
+
+def get_file_hash(file):
+    """
+    hash a file chunk by chunk.
+
+    Args:
+        file (File): file to hash
+
+    Returns:
+        str: sha256 hex digest of the content
+    """
+    digest = hashlib.sha256()
+    if hasattr(file, 'chunks'):
+        for chunk in file.chunks():
+            digest.update(chunk)
+    else:
+        file.seek(0)
+        for chunk in iter(lambda: file.read(64 * 1024), b''):
+            digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def get_content_name(file, filename):
+    """
+    name a file after its content.
+    the same bytes always get the same name, whatever the article or the file was called.
+
+    Args:
+        file (File): file to name
+        filename (str): original file name, only the extension is kept
+
+    Returns:
+        str: sha256 of the content with the original extension
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    return f'{get_file_hash(file)}{extension}'
+
+
+def get_referenced_blob_ids(blobs):
+    """
+    find the blobs that are still used by an article.
+    covers and videos are referenced by the name stored in the field,
+    uploads by their url appearing in the content of an article,
+    or the provisional url of an upload that resolved to the blob.
+    inactive articles count as references, they can be activated again.
+
+    Args:
+        blobs (Iterable[Blob]): blobs to check
+
+    Returns:
+        Set[int]: primary keys of the referenced blobs
+    """
+    from articles.models import Article
+    from .models import Blob, Upload
+
+    articles = Article._base_manager.all()
+    names = {
+        Blob.COVER: set(articles.exclude(cover='').values_list('cover', flat=True)),
+        Blob.VIDEO: set(articles.exclude(video='').values_list('video', flat=True)),
+    }
+    referenced = set()
+    uploads = {}
+    for blob in blobs:
+        if blob.kind == Blob.UPLOAD:
+            uploads[blob.url] = blob.pk
+        elif blob.name in names[blob.kind]:
+            referenced.add(blob.pk)
+    provisional = Upload.objects.filter(blob_id__in=uploads.values()).only('blob_id')
+    for upload in provisional.iterator():
+        uploads[upload.get_absolute_url()] = upload.blob_id
+    for content in articles.values_list('content', flat=True).iterator():
+        for url in [url for url in uploads if url in content]:
+            referenced.add(uploads.pop(url))
+        if not uploads:
+            break
+    return referenced
+
+
+def delete_blob(blob):
+    """
+    delete a blob, its stored file and the derivatives of the file.
+    the row is deleted first and only if it was not used again in the meantime,
+    so a blob reused while the sweep runs is kept.
+
+    Args:
+        blob (Blob): unreferenced blob
+
+    Returns:
+        bool: True if the blob was deleted
+    """
+    from articles.models import Article
+    from .models import Blob, ResponsiveImage
+    from .storage import get_upload_storage
+
+    deleted, _ = Blob.objects.filter(
+        pk=blob.pk, last_used_at=blob.last_used_at).delete()
+    if not deleted:
+        return False
+    upload_storage = get_upload_storage()
+    if blob.kind == Blob.UPLOAD:
+        upload_storage.delete(blob.url)
+    else:
+        Article._meta.get_field(blob.kind).storage.delete(blob.name)
+    for image in ResponsiveImage.objects.filter(source=blob.url):
+        for derivative in image.derivatives:
+            upload_storage.delete(derivative['url'])
+        image.delete()
+    return True
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from .storage import get_spool_max_size
+
+IMAGE_CONTENT_TYPES = [
+    'image/png', 'image/jpg',
+    'image/jpeg', 'image/pjpeg', 'image/gif'
+]
+
+
+class ImageValidationUploadHandler(FileUploadHandler):
+    """
+    upload handler that validates images while the request body is parsed.
+    a file with another content type is skipped at its first chunk,
+    and a file is dropped as soon as it grows over MAX_IMAGE_UPLOAD_SIZE
+    or the largest file the spool storage accepts,
+    so invalid files are never written to memory or to a temporary file.
+    it has to be the first handler of request.upload_handlers.
+
+    Note:
+        SkipFile is never raised from new_file(). the parser closes the file
+        of every handler on SkipFile, and the handlers after this one would
+        still hold the previous, already parsed, file at that point.
+
+    Attributes:
+        errors (List[Tuple[str, str]]): file name and error of every skipped file
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.errors = []
+        self.max_size = get_spool_max_size(settings.MAX_IMAGE_UPLOAD_SIZE)
+        self.received = 0
+        self.error = None
+
+    def new_file(self, field_name, file_name, content_type, *args, **kwargs):
+        super().new_file(field_name, file_name, content_type, *args, **kwargs)
+        self.received = 0
+        self.error = None
+        if content_type not in IMAGE_CONTENT_TYPES:
+            self.error = 'Bad image format.'
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.error is None and self.received > self.max_size:
+            to_MB = self.max_size / (1024 * 1024)
+            self.error = f'Maximum image file is {to_MB:.0f} MB.'
+        if self.error is not None:
+            self.errors.append((self.file_name, self.error))
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
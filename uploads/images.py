@@ -0,0 +1,223 @@
+import io
+import os
+import warnings
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+CONTENT_TYPES = {
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+}
+EXTENSIONS = {
+    'WEBP': '.webp',
+    'JPEG': '.jpg',
+    'PNG': '.png',
+}
+
+
+class ImageTooLarge(ValueError):
+    """
+    an image with more than IMAGE_MAX_PIXELS pixels,
+    or one Pillow considers a decompression bomb.
+    """
+
+
+@dataclass
+class OptimizedImage:
+    """
+    result of optimize_image.
+
+    Attributes:
+        content (bytes): encoded image
+        name (str): file name with the extension of the new format
+        content_type (str): mime type of the new format
+        width (int): width in pixels
+        height (int): height in pixels
+        original_size (int): size of the uploaded file in bytes
+        size (int): size of content in bytes
+    """
+    content: bytes
+    name: str
+    content_type: str
+    width: int
+    height: int
+    original_size: int
+    size: int
+
+
+def get_image_size(file):
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def open_image(file):
+    """
+    open an image and check its size before the pixels are decoded.
+
+    Args:
+        file (file): image file
+
+    Returns:
+        Image: image whose pixels are not loaded yet
+
+    Raises:
+        ImageTooLarge: the image has more than IMAGE_MAX_PIXELS pixels
+        UnidentifiedImageError, OSError: Pillow can not read the file
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', Image.DecompressionBombWarning)
+        try:
+            image = Image.open(file)
+        except (Image.DecompressionBombError, Image.DecompressionBombWarning) as error:
+            raise ImageTooLarge(str(error)) from error
+    if image.width * image.height > settings.IMAGE_MAX_PIXELS:
+        raise ImageTooLarge(
+            f'{image.width}x{image.height} is over {settings.IMAGE_MAX_PIXELS} pixels')
+    return image
+
+
+def check_image_pixels(file):
+    """
+    validate the size of an uploaded image before it is stored.
+    files Pillow can not read pass, they are kept as they are.
+
+    Args:
+        file (File): uploaded file
+
+    Raises:
+        ImageTooLarge: the image has more than IMAGE_MAX_PIXELS pixels
+    """
+    try:
+        open_image(file)
+    except (UnidentifiedImageError, OSError):
+        pass
+    finally:
+        file.seek(0)
+
+
+def flatten_image(image):
+    """
+    composite an image with transparency onto a white background,
+    converting it straight to RGB would turn transparent areas black.
+
+    Args:
+        image (Image): image with an alpha channel or a transparent color
+
+    Returns:
+        Image: RGB image
+    """
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def optimize_image(file, name):
+    """
+    resize an image to IMAGE_MAX_DIMENSION and encode it as IMAGE_FORMAT.
+    the exif orientation is applied to the pixels, then exif and other
+    metadata are dropped, only the icc color profile is kept.
+
+    Args:
+        file (File): image file
+        name (str): file name of the image
+
+    Returns:
+        OptimizedImage|None: None if the image can not be optimized,
+            animated images and files Pillow can not read are kept as they are
+
+    Raises:
+        ImageTooLarge: the image has more than IMAGE_MAX_PIXELS pixels
+    """
+    original_size = get_image_size(file)
+    try:
+        image = open_image(file)
+        image.load()
+    except (UnidentifiedImageError, OSError):
+        return None
+    finally:
+        file.seek(0)
+    if getattr(image, 'is_animated', False):
+        return None
+    icc_profile = image.info.get('icc_profile')
+    image = ImageOps.exif_transpose(image)
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    if max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    image_format = settings.IMAGE_FORMAT
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    if has_alpha and image_format != 'JPEG':
+        image = image.convert('RGBA')
+    elif has_alpha:
+        image = flatten_image(image)
+    else:
+        image = image.convert('RGB')
+    options = {'quality': settings.IMAGE_QUALITY}
+    if image_format == 'PNG':
+        options = {'optimize': True}
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    content = buffer.getvalue()
+    return OptimizedImage(
+        content=content,
+        name=os.path.splitext(name)[0] + EXTENSIONS[image_format],
+        content_type=CONTENT_TYPES[image_format],
+        width=image.width,
+        height=image.height,
+        original_size=original_size,
+        size=len(content),)
+
+
+def get_derivative_name(name, width):
+    stem, extension = os.path.splitext(name)
+    return f'{stem}-{width}w{extension}'
+
+
+def make_derivatives(content, name):
+    """
+    resize an optimized image to every IMAGE_DERIVATIVE_WIDTHS
+    smaller than the image itself.
+
+    Args:
+        content (bytes): encoded image, usually the output of optimize_image
+        name (str): file name of the image
+
+    Returns:
+        List[OptimizedImage]: derivatives ordered by width.
+            empty for animated images and formats optimize_image does not write
+
+    Raises:
+        ImageTooLarge: the image has more than IMAGE_MAX_PIXELS pixels
+    """
+    image = open_image(io.BytesIO(content))
+    image_format = image.format
+    if image_format not in CONTENT_TYPES or getattr(image, 'is_animated', False):
+        return []
+    options = {'quality': settings.IMAGE_QUALITY}
+    if image.info.get('icc_profile'):
+        options['icc_profile'] = image.info['icc_profile']
+    derivatives = []
+    for width in sorted(settings.IMAGE_DERIVATIVE_WIDTHS):
+        if width >= image.width:
+            break
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, format=image_format, **options)
+        derivatives.append(OptimizedImage(
+            content=buffer.getvalue(),
+            name=get_derivative_name(name, width),
+            content_type=CONTENT_TYPES[image_format],
+            width=width,
+            height=height,
+            original_size=len(content),
+            size=len(buffer.getvalue()),))
+    return derivatives
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from uploads.blobs import delete_blob, get_referenced_blob_ids
+from uploads.models import Blob, ChunkedUpload
+
+
+class Command(BaseCommand):
+    """
+    delete stored files that no article refers to anymore.
+    django_cleanup ignores Article because its files can be shared,
+    this command replaces it with reference counting.
+    blobs used within the grace period are kept, an editor may still
+    be writing an article that refers to them.
+    chunked uploads not touched within CHUNKED_UPLOAD_EXPIRY are deleted too.
+
+    Example:
+        python manage.py sweep_blobs --dry-run
+    """
+    help = 'Delete uploaded files that are not referenced by any article.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=settings.BLOB_SWEEP_GRACE,
+            help='keep blobs used within this many seconds.')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='list the blobs that would be deleted.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timezone.timedelta(seconds=options['grace'])
+        candidates = list(Blob.objects.filter(last_used_at__lt=cutoff))
+        referenced = get_referenced_blob_ids(candidates)
+        unreferenced = [blob for blob in candidates if blob.pk not in referenced]
+        deleted = 0
+        for blob in unreferenced:
+            if options['dry_run']:
+                self.stdout.write(f'{blob.kind} {blob.url}')
+            elif delete_blob(blob):
+                deleted += 1
+        expired = list(ChunkedUpload.objects.expired())
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(unreferenced)} of {len(candidates)} blob(s) '
+                f'and {len(expired)} chunked upload(s) would be deleted.'))
+            return
+        for upload in expired:
+            upload.discard()
+        self.stdout.write(self.style.SUCCESS(
+            f'deleted {deleted} blob(s) and {len(expired)} chunked upload(s).'))
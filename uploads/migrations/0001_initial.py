@@ -0,0 +1,34 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:48
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('folder', models.CharField(blank=True, max_length=255, verbose_name='folder')),
+                ('content_type', models.CharField(max_length=100, verbose_name='content type')),
+                ('size', models.PositiveBigIntegerField(verbose_name='size')),
+                ('spool_name', models.CharField(blank=True, max_length=255, verbose_name='spool name')),
+                ('url', models.CharField(blank=True, max_length=500, verbose_name='url')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('done', 'done')], default='pending', max_length=10, verbose_name='status')),
+            ],
+            options={
+                'ordering': ('-timestamp',),
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='upload',
+            name='original_size',
+            field=models.PositiveBigIntegerField(null=True, verbose_name='original size'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.1.14 on 2026-10-18 00:57
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0002_upload_original_size'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponsiveImage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('source', models.CharField(max_length=500, unique=True, verbose_name='source')),
+                ('width', models.PositiveIntegerField(verbose_name='width')),
+                ('height', models.PositiveIntegerField(verbose_name='height')),
+                ('derivatives', models.JSONField(blank=True, default=list, verbose_name='derivatives')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
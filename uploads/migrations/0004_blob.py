@@ -0,0 +1,41 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0003_responsive_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('upload', 'upload'), ('cover', 'cover'), ('video', 'video')], max_length=10, verbose_name='kind')),
+                ('sha256', models.CharField(max_length=64, verbose_name='sha256')),
+                ('name', models.CharField(blank=True, max_length=255, verbose_name='name')),
+                ('url', models.CharField(max_length=500, verbose_name='url')),
+                ('size', models.PositiveBigIntegerField(null=True, verbose_name='size')),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='last used at')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='upload',
+            name='sha256',
+            field=models.CharField(blank=True, max_length=64, verbose_name='sha256'),
+        ),
+        migrations.AddConstraint(
+            model_name='blob',
+            constraint=models.UniqueConstraint(fields=('kind', 'sha256'), name='unique_blob_kind_sha256'),
+        ),
+        migrations.AddField(
+            model_name='upload',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uploads', to='uploads.blob'),
+        ),
+    ]
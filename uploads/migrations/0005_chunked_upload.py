@@ -0,0 +1,37 @@
+# Generated by Django 3.1.14 on 2026-10-18 01:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('uploads', '0004_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('name', models.CharField(max_length=255, verbose_name='name')),
+                ('content_type', models.CharField(blank=True, max_length=100, verbose_name='content type')),
+                ('size', models.PositiveBigIntegerField(verbose_name='size')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='offset')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='sha256')),
+                ('spool_name', models.CharField(max_length=255, verbose_name='spool name')),
+                ('status', models.CharField(choices=[('uploading', 'uploading'), ('complete', 'complete')], default='uploading', max_length=10, verbose_name='status')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-timestamp',),
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-18 02:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0005_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpooledFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='name')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='size')),
+                ('timestamp', models.DateTimeField(auto_now_add=True, verbose_name='timestamp')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SpooledChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveBigIntegerField(verbose_name='position')),
+                ('data', models.BinaryField(verbose_name='data')),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='uploads.spooledfile')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='spooledchunk',
+            constraint=models.UniqueConstraint(fields=('file', 'position'), name='unique_spooled_chunk_position'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.14 on 2026-10-18 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0015_article_updated_idx'),
+        ('uploads', '0006_spooled_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='upload',
+            name='articles',
+            field=models.ManyToManyField(blank=True, related_name='_upload_articles_+', to='articles.Article', verbose_name='articles'),
+        ),
+    ]
@@ -0,0 +1,523 @@
+import hashlib
+import os
+import re
+import uuid
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.shortcuts import reverse
+from django.utils import timezone
+
+from core.additional.models import CoreModel, CoreQuerySet
+from .blobs import get_content_name, get_file_hash
+from .storage import get_spool_storage
+
+
+@lru_cache(maxsize=None)
+def get_provisional_url_pattern():
+    """
+    Returns:
+        Pattern: matches the provisional url of an upload, the group is its primary key
+    """
+    placeholder = str(uuid.UUID(int=0))
+    prefix, suffix = reverse('uploads:upload_detail', kwargs={'pk': placeholder}).split(placeholder)
+    return re.compile(
+        re.escape(prefix) + r'([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})' +
+        re.escape(suffix))
+
+
+class UploadManager(models.Manager):
+    """
+    custom manager for model Upload
+    """
+
+    def resolve_links(self, content):
+        """
+        replace the provisional urls of transferred uploads with their stored url,
+        so content does not keep urls that only redirect.
+
+        Args:
+            content (str): markdown content
+
+        Returns:
+            Tuple[str, Set[UUID]]: content with the stored urls,
+                and the uploads whose provisional url stays until they are transferred
+        """
+        pks = set(get_provisional_url_pattern().findall(content or ''))
+        if not pks:
+            return content, set()
+        pending = set()
+        for upload in self.filter(pk__in=pks).only('url', 'status'):
+            if upload.status == Upload.DONE:
+                content = content.replace(upload.get_absolute_url(), upload.url)
+            else:
+                pending.add(upload.pk)
+        return content, pending
+
+    def link_articles(self, article, pks):
+        """
+        record that an article refers to the provisional url of pending uploads,
+        so the transfer rewrites that article only.
+
+        Args:
+            article (Article): saved article
+            pks (Iterable[UUID]): pending uploads of resolve_links
+        """
+        Upload.articles.through.objects.bulk_create([
+            Upload.articles.through(upload_id=pk, article_id=article.pk) for pk in pks
+        ], ignore_conflicts=True)
+
+    def spool(self, file, folder, transfer=True):
+        """
+        write an uploaded file to the spool storage and queue its transfer.
+        the request only pays for a local disk write,
+        the worker pushes the file to settings.UPLOAD_STORAGE.
+        a file with the same content as a transferred upload is not spooled,
+        the upload is done right away with the url of the existing blob.
+
+        Args:
+            file (UploadedFile): uploaded file
+            folder (str): folder of the file in the upload storage
+            transfer (bool): queue transfer_upload. False when the caller
+                queues transfer_batch for several uploads
+
+        Returns:
+            Upload: the stored upload
+        """
+        from .tasks import transfer_upload
+
+        name = get_content_name(file, file.name)
+        sha256 = os.path.splitext(name)[0]
+        blob = Blob.objects.filter(kind=Blob.UPLOAD, sha256=sha256).first()
+        if blob is not None:
+            blob.last_used_at = timezone.now()
+            blob.save(update_fields=['last_used_at'])
+            return self.create(
+                name=name,
+                folder=folder,
+                content_type=file.content_type,
+                size=blob.size or file.size,
+                original_size=file.size,
+                sha256=sha256,
+                blob=blob,
+                url=blob.url,
+                status=Upload.DONE,)
+        spool_name = get_spool_storage().save(name, file)
+        with transaction.atomic(savepoint=False):
+            upload = self.create(
+                name=name,
+                folder=folder,
+                content_type=file.content_type,
+                size=file.size,
+                original_size=file.size,
+                sha256=sha256,
+                spool_name=spool_name,)
+            if transfer:
+                transfer_upload.enqueue(upload_id=str(upload.pk))
+        return upload
+
+
+class Upload(CoreModel):
+    """
+    a file uploaded through the markdown editor.
+    until the worker has transferred the file, it is served from the spool
+    directory at its provisional url, which redirects to the final url afterwards.
+
+    Attributes:
+        name (CharField): file name
+        folder (CharField): folder of the file in the upload storage
+        content_type (CharField): mime type of the file
+        size (PositiveBigIntegerField): size of the stored file in bytes
+        original_size (PositiveBigIntegerField): size of the uploaded file in bytes
+        sha256 (CharField): sha256 hex digest of the uploaded file
+        blob (ForeignKey): stored file the upload resolved to. set once transferred
+        spool_name (CharField): name of the file in the spool storage. empty once transferred
+        url (CharField): url of the file in the upload storage. empty until transferred
+        status (CharField): pending or done
+        articles (ManyToManyField): articles saved with the provisional url while the upload was pending
+    """
+    PENDING = 'pending'
+    DONE = 'done'
+    STATUS_CHOICES = [
+        (PENDING, 'pending'),
+        (DONE, 'done'),
+    ]
+
+    name = models.CharField('name', max_length=255)
+    folder = models.CharField('folder', max_length=255, blank=True)
+    content_type = models.CharField('content type', max_length=100)
+    size = models.PositiveBigIntegerField('size')
+    original_size = models.PositiveBigIntegerField('original size', null=True)
+    sha256 = models.CharField('sha256', max_length=64, blank=True)
+    blob = models.ForeignKey(
+        'Blob', on_delete=models.SET_NULL, null=True, blank=True, related_name='uploads')
+    spool_name = models.CharField('spool name', max_length=255, blank=True)
+    url = models.CharField('url', max_length=500, blank=True)
+    status = models.CharField(
+        'status', max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    articles = models.ManyToManyField(
+        'articles.Article', blank=True, related_name='+', verbose_name='articles')
+
+    objects = UploadManager()
+
+    class Meta:
+        ordering = ('-timestamp', )
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        """
+        provisional url of the upload, returned to the editor right away.
+
+        Returns:
+            str: url of UploadDetailView
+        """
+        return reverse('uploads:upload_detail', kwargs={'pk': self.pk})
+
+    def get_link(self):
+        """
+        url to put in article content.
+
+        Returns:
+            str: the stored url once transferred, the provisional url before that
+        """
+        if self.status == self.DONE:
+            return self.url
+        return self.get_absolute_url()
+
+
+class ResponsiveImage(CoreModel):
+    """
+    intrinsic size and smaller derivatives of an image,
+    used to build the srcset of img tags.
+
+    Attributes:
+        source (CharField): url of the full size image, as it appears in html
+        width (PositiveIntegerField): width of the full size image in pixels
+        height (PositiveIntegerField): height of the full size image in pixels
+        derivatives (JSONField): list of {'width': int, 'url': str} ordered by width
+    """
+    source = models.CharField('source', max_length=500, unique=True)
+    width = models.PositiveIntegerField('width')
+    height = models.PositiveIntegerField('height')
+    derivatives = models.JSONField('derivatives', default=list, blank=True)
+
+    def __str__(self):
+        return self.source
+
+    def get_srcset(self):
+        """
+        Returns:
+            str: srcset of the derivatives and the full size image
+        """
+        candidates = [f'{derivative["url"]} {derivative["width"]}w'
+                      for derivative in self.derivatives]
+        candidates.append(f'{self.source} {self.width}w')
+        return ', '.join(candidates)
+
+    def get_sizes(self):
+        """
+        Returns:
+            str: sizes attribute, the image is never shown wider than itself
+        """
+        return settings.IMAGE_SIZES.format(width=self.width)
+
+
+class Blob(models.Model):
+    """
+    a stored file identified by the sha256 of its content.
+    a byte-identical upload reuses the stored file instead of storing a new copy.
+    blobs are never deleted when a reference goes away,
+    `python manage.py sweep_blobs` deletes the ones nothing refers to.
+
+    Attributes:
+        kind (CharField): what the file is stored for. decides where references are looked up
+        sha256 (CharField): sha256 hex digest of the uploaded content
+        name (CharField): name of the file in the storage of the article field. empty for uploads
+        url (CharField): public url of the stored file
+        size (PositiveBigIntegerField): size of the stored file in bytes
+        last_used_at (DateTimeField): last time the blob was stored or reused
+    """
+    UPLOAD = 'upload'
+    COVER = 'cover'
+    VIDEO = 'video'
+    KIND_CHOICES = [
+        (UPLOAD, 'upload'),
+        (COVER, 'cover'),
+        (VIDEO, 'video'),
+    ]
+
+    kind = models.CharField('kind', max_length=10, choices=KIND_CHOICES)
+    sha256 = models.CharField('sha256', max_length=64)
+    name = models.CharField('name', max_length=255, blank=True)
+    url = models.CharField('url', max_length=500)
+    size = models.PositiveBigIntegerField('size', null=True)
+    last_used_at = models.DateTimeField('last used at', default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'sha256'], name='unique_blob_kind_sha256'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.sha256}'
+
+
+class ChunkedUploadQuerySet(CoreQuerySet):
+    """
+    custom QuerySet for model ChunkedUpload
+    """
+
+    def complete(self):
+        """
+        Returns:
+            QuerySet: uploads whose every byte was received and verified
+        """
+        return self.filter(status=ChunkedUpload.COMPLETE)
+
+    def expired(self):
+        """
+        Returns:
+            QuerySet: uploads not touched within CHUNKED_UPLOAD_EXPIRY seconds
+        """
+        cutoff = timezone.now() - timezone.timedelta(seconds=settings.CHUNKED_UPLOAD_EXPIRY)
+        return self.filter(updated__lt=cutoff)
+
+
+class ChunkedUploadManager(models.Manager):
+    """
+    custom manager for model ChunkedUpload
+    """
+
+    def get_queryset(self):
+        return ChunkedUploadQuerySet(self.model, using=self._db)
+
+    def complete(self):
+        return self.get_queryset().complete()
+
+    def expired(self):
+        return self.get_queryset().expired()
+
+    def start(self, user, name, size, content_type, sha256=''):
+        """
+        open an upload session with an empty spooled file.
+
+        Args:
+            user (User): user uploading the file
+            name (str): file name
+            size (int): size of the whole file in bytes
+            content_type (str): mime type of the file
+            sha256 (str): expected sha256 hex digest of the whole file, checked on complete
+
+        Returns:
+            ChunkedUpload: the new session
+        """
+        upload = self.model(
+            user=user,
+            name=name,
+            size=size,
+            content_type=content_type,
+            sha256=sha256.lower(),)
+        upload.spool_name = get_spool_storage().save(
+            f'chunked/{upload.pk}.part', ContentFile(b''))
+        upload.save()
+        return upload
+
+
+class ChunkedUpload(CoreModel):
+    """
+    a large file, such as an article video, uploaded in several requests.
+    the client sends chunks with their offset and sha256,
+    each chunk is appended to a spooled file, then the session is completed
+    and the form of the article refers to it instead of carrying the file.
+    an interrupted upload resumes from offset.
+
+    Attributes:
+        user (ForeignKey): user uploading the file
+        name (CharField): file name
+        content_type (CharField): mime type of the file
+        size (PositiveBigIntegerField): size of the whole file in bytes
+        offset (PositiveBigIntegerField): number of bytes received so far
+        sha256 (CharField): sha256 hex digest of the whole file.
+            the expected one until completed, the computed one after that
+        spool_name (CharField): name of the file in the spool storage
+        status (CharField): uploading or complete
+    """
+    UPLOADING = 'uploading'
+    COMPLETE = 'complete'
+    STATUS_CHOICES = [
+        (UPLOADING, 'uploading'),
+        (COMPLETE, 'complete'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='chunked_uploads')
+    name = models.CharField('name', max_length=255)
+    content_type = models.CharField('content type', max_length=100, blank=True)
+    size = models.PositiveBigIntegerField('size')
+    offset = models.PositiveBigIntegerField('offset', default=0)
+    sha256 = models.CharField('sha256', max_length=64, blank=True)
+    spool_name = models.CharField('spool name', max_length=255)
+    status = models.CharField(
+        'status', max_length=10, choices=STATUS_CHOICES, default=UPLOADING)
+
+    objects = ChunkedUploadManager()
+
+    class Meta:
+        ordering = ('-timestamp', )
+
+    def __str__(self):
+        return self.name
+
+    def get_absolute_url(self):
+        """
+        Returns:
+            str: url chunks are sent to
+        """
+        return reverse('uploads:chunked_upload_detail', kwargs={'pk': self.pk})
+
+    def to_json(self):
+        """
+        Returns:
+            dict: state of the session returned to the client
+        """
+        return {
+            'id': str(self.pk),
+            'url': self.get_absolute_url(),
+            'offset': self.offset,
+            'size': self.size,
+            'status': self.status,
+        }
+
+    def write_chunk(self, stream, start, length, sha256):
+        """
+        write a chunk to the spooled file at start, reading the stream in small
+        pieces so memory use does not depend on the chunk size.
+        bytes after start, left by an interrupted request, are overwritten.
+        the row is not locked while the body is read, the caller checks that
+        start is the offset before and calls move_offset under the lock after.
+
+        Args:
+            stream (file): request body
+            start (int): position of the first byte of the chunk
+            length (int): size of the chunk in bytes
+            sha256 (str): sha256 hex digest of the chunk sent by the client
+
+        Returns:
+            bool: False when the chunk is short or its checksum does not match
+        """
+        digest = hashlib.sha256()
+        received = 0
+
+        def read():
+            nonlocal received
+            while received < length:
+                data = stream.read(min(length - received, 64 * 1024))
+                if not data:
+                    break
+                digest.update(data)
+                received += len(data)
+                yield data
+
+        get_spool_storage().write(self.spool_name, start, read())
+        return received == length and digest.hexdigest() == sha256.lower()
+
+    def move_offset(self, start, length, written):
+        """
+        move the offset past a chunk written by write_chunk.
+        a chunk that was not written correctly is cut from the spooled file.
+        the caller has to lock the row.
+
+        Args:
+            start (int): position of the first byte of the chunk
+            length (int): size of the chunk in bytes
+            written (bool): value returned by write_chunk
+
+        Returns:
+            bool: False when another request moved the offset or completed
+                the session while the chunk was written, nothing is changed then
+        """
+        if self.status != self.UPLOADING or self.offset != start:
+            return False
+        if not written:
+            get_spool_storage().truncate(self.spool_name, start)
+            return True
+        self.offset = start + length
+        self.save(update_fields=['offset', 'updated'])
+        return True
+
+    def complete(self):
+        """
+        check the whole file and mark the session as complete.
+
+        Returns:
+            bool: False when bytes are missing or the file does not match
+                the sha256 given when the session was opened
+        """
+        if self.offset != self.size:
+            return False
+        with get_spool_storage().open(self.spool_name, 'rb') as file:
+            sha256 = get_file_hash(file)
+        if self.sha256 and self.sha256 != sha256:
+            return False
+        self.sha256 = sha256
+        self.status = self.COMPLETE
+        self.save(update_fields=['sha256', 'status', 'updated'])
+        return True
+
+    def discard(self):
+        """
+        delete the spooled file and the session.
+        """
+        get_spool_storage().delete(self.spool_name)
+        self.delete()
+
+
+class SpooledFile(models.Model):
+    """
+    a file waiting to be transferred, kept in the database by
+    uploads.storage.DatabaseSpoolStorage so the web and worker processes
+    see the same files wherever they run.
+
+    Attributes:
+        name (CharField): name of the file in the spool storage
+        size (PositiveBigIntegerField): size of the file in bytes
+        timestamp (DateTimeField): when the file was spooled
+    """
+    name = models.CharField('name', max_length=255, unique=True)
+    size = models.PositiveBigIntegerField('size', default=0)
+    timestamp = models.DateTimeField('timestamp', auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class SpooledChunk(models.Model):
+    """
+    a part of a spooled file of at most UPLOAD_SPOOL_CHUNK_SIZE bytes.
+
+    Attributes:
+        file (ForeignKey): spooled file the part belongs to
+        position (PositiveBigIntegerField): position of the first byte of the part in the file
+        data (BinaryField): bytes of the part
+    """
+    file = models.ForeignKey(SpooledFile, on_delete=models.CASCADE, related_name='chunks')
+    position = models.PositiveBigIntegerField('position')
+    data = models.BinaryField('data')
+
+    class Meta:
+        """
+        Attributes:
+            constraints (List): parts are read by position, the unique index serves the lookup
+        """
+        constraints = [
+            models.UniqueConstraint(
+                fields=['file', 'position'], name='unique_spooled_chunk_position'),
+        ]
+
+    def __str__(self):
+        return f'{self.file_id} @ {self.position}'
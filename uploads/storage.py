@@ -0,0 +1,328 @@
+import io
+import os
+import re
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+import cloudinary.uploader
+
+
+class UploadStorage:
+    """
+    interface of the stores uploads are transferred to.
+    set settings.UPLOAD_STORAGE to the dotted path of an implementation.
+    names are content hashes, so storing a name that already exists
+    can keep or overwrite the existing file.
+    """
+
+    def upload(self, file, name, folder):
+        """
+        store a file.
+
+        Args:
+            file (File): file to store
+            name (str): file name
+            folder (str): folder to store the file in
+
+        Returns:
+            str: public url of the stored file
+        """
+        raise NotImplementedError('UploadStorage requires upload()')
+
+    def delete(self, url):
+        """
+        delete a stored file.
+
+        Args:
+            url (str): public url returned by upload()
+        """
+        raise NotImplementedError('UploadStorage requires delete()')
+
+
+class CloudinaryUploadStorage(UploadStorage):
+    """
+    store uploads on cloudinary.
+    the file name without extension is used as public id.
+    """
+    PUBLIC_ID_PATTERN = re.compile(r'/upload/(?:v\d+/)?(?P<public_id>.+?)(?:\.[^./]+)?$')
+
+    def upload(self, file, name, folder):
+        file.name = name
+        response = cloudinary.uploader.upload(
+            file, folder=folder, public_id=os.path.splitext(name)[0], overwrite=True)
+        return response['secure_url']
+
+    def delete(self, url):
+        match = self.PUBLIC_ID_PATTERN.search(url)
+        if match is not None:
+            cloudinary.uploader.destroy(match.group('public_id'))
+
+
+class LocalUploadStorage(UploadStorage):
+    """
+    store uploads under MEDIA_ROOT.
+    used in development and tests so the whole upload path runs without cloudinary.
+    """
+
+    def __init__(self):
+        base_url = settings.MEDIA_URL
+        if not base_url.startswith(('/', 'http://', 'https://')):
+            base_url = f'/{base_url}'
+        self.storage = FileSystemStorage(
+            location=settings.MEDIA_ROOT, base_url=base_url)
+
+    def upload(self, file, name, folder):
+        stored_name = os.path.join(folder.strip('/'), name)
+        if not self.storage.exists(stored_name):
+            stored_name = self.storage.save(stored_name, file)
+        return self.storage.url(stored_name)
+
+    def delete(self, url):
+        if url.startswith(self.storage.base_url):
+            self.storage.delete(url[len(self.storage.base_url):])
+
+
+def get_upload_storage():
+    """
+    Returns:
+        UploadStorage: instance of settings.UPLOAD_STORAGE
+    """
+    return import_string(settings.UPLOAD_STORAGE)()
+
+
+class FileSystemSpoolStorage(FileSystemStorage):
+    """
+    spool files under UPLOAD_SPOOL_ROOT.
+    the web and worker processes have to mount it as a shared volume.
+
+    Attributes:
+        max_size (int|None): largest file the storage accepts, None when it is not limited
+    """
+    max_size = None
+
+    def __init__(self):
+        super().__init__(location=settings.UPLOAD_SPOOL_ROOT)
+
+    def write(self, name, start, pieces):
+        """
+        replace the bytes of a spooled file from start on.
+
+        Args:
+            name (str): name of the spooled file
+            start (int): position to write from, the file is cut there first
+            pieces (Iterable[bytes]): bytes to write
+        """
+        with open(self.path(name), 'r+b') as file:
+            file.seek(start)
+            file.truncate()
+            for piece in pieces:
+                file.write(piece)
+
+    def truncate(self, name, size):
+        """
+        Args:
+            name (str): name of the spooled file
+            size (int): number of bytes to keep
+        """
+        os.truncate(self.path(name), size)
+
+
+class SpooledFileReader(io.RawIOBase):
+    """
+    read-only stream over the chunks of a SpooledFile.
+    one chunk is loaded at a time, by its position.
+
+    Attributes:
+        file_id (int): primary key of the spooled file
+        size (int): size of the file in bytes
+    """
+
+    def __init__(self, file_id, size):
+        super().__init__()
+        self.file_id = file_id
+        self.size = size
+        self.position = 0
+        self.chunk_position = 0
+        self.chunk = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer):
+        from .models import SpooledChunk
+
+        if self.position >= self.size:
+            return 0
+        offset = self.position - self.chunk_position
+        if not 0 <= offset < len(self.chunk):
+            row = SpooledChunk.objects.filter(
+                file_id=self.file_id, position__lte=self.position,
+            ).order_by('-position').values_list('position', 'data').first()
+            if row is None:
+                return 0
+            self.chunk_position, self.chunk = row[0], bytes(row[1])
+            offset = self.position - self.chunk_position
+            if offset >= len(self.chunk):
+                return 0
+        data = self.chunk[offset:offset + len(buffer)]
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class DatabaseSpoolStorage(Storage):
+    """
+    spool files in the database, split into chunks of UPLOAD_SPOOL_CHUNK_SIZE bytes.
+    the web and worker processes always share the database,
+    so a file spooled by a request can be transferred by the worker on any host.
+    files over UPLOAD_SPOOL_DATABASE_MAX_SIZE are refused.
+    """
+
+    @property
+    def max_size(self):
+        return settings.UPLOAD_SPOOL_DATABASE_MAX_SIZE
+
+    def get_file(self, name):
+        from .models import SpooledFile
+
+        return SpooledFile.objects.filter(name=name).first()
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError('spooled files are written with save() and write()')
+        spooled = self.get_file(name)
+        if spooled is None:
+            raise FileNotFoundError(name)
+        reader = io.BufferedReader(
+            SpooledFileReader(spooled.pk, spooled.size),
+            buffer_size=settings.UPLOAD_SPOOL_CHUNK_SIZE)
+        return File(reader, name=name)
+
+    def _save(self, name, content):
+        from .models import SpooledFile
+
+        if content.size > self.max_size:
+            raise ValueError(f'{name} is larger than UPLOAD_SPOOL_DATABASE_MAX_SIZE')
+        with transaction.atomic():
+            spooled = SpooledFile.objects.create(name=name)
+            self.write_chunks(spooled, 0, content.chunks(settings.UPLOAD_SPOOL_CHUNK_SIZE))
+        return name
+
+    def write_chunks(self, spooled, start, pieces):
+        """
+        append pieces to a spooled file that ends at start,
+        buffered into chunks of UPLOAD_SPOOL_CHUNK_SIZE bytes.
+
+        Args:
+            spooled (SpooledFile): file to write to
+            start (int): current size of the file
+            pieces (Iterable[bytes]): bytes to write
+        """
+        from .models import SpooledChunk
+
+        chunk_size = settings.UPLOAD_SPOOL_CHUNK_SIZE
+        position = start
+        buffer = bytearray()
+        for piece in pieces:
+            buffer += piece
+            if position + len(buffer) > self.max_size:
+                raise ValueError(f'{spooled.name} is larger than UPLOAD_SPOOL_DATABASE_MAX_SIZE')
+            while len(buffer) >= chunk_size:
+                SpooledChunk.objects.create(
+                    file=spooled, position=position, data=bytes(buffer[:chunk_size]))
+                position += chunk_size
+                del buffer[:chunk_size]
+        if buffer:
+            SpooledChunk.objects.create(file=spooled, position=position, data=bytes(buffer))
+            position += len(buffer)
+        spooled.size = position
+        spooled.save(update_fields=['size'])
+
+    def write(self, name, start, pieces):
+        """
+        replace the bytes of a spooled file from start on.
+
+        Args:
+            name (str): name of the spooled file
+            start (int): position to write from, the file is cut there first
+            pieces (Iterable[bytes]): bytes to write
+        """
+        with transaction.atomic():
+            spooled = self.truncate(name, start)
+            self.write_chunks(spooled, spooled.size, pieces)
+
+    def truncate(self, name, size):
+        """
+        Args:
+            name (str): name of the spooled file
+            size (int): number of bytes to keep
+
+        Returns:
+            SpooledFile: the truncated file
+        """
+        spooled = self.get_file(name)
+        if spooled is None:
+            raise FileNotFoundError(name)
+        with transaction.atomic():
+            spooled.chunks.filter(position__gte=size).delete()
+            last = spooled.chunks.order_by('-position').first()
+            if last is not None and last.position + len(last.data) > size:
+                last.data = bytes(last.data)[:size - last.position]
+                last.save(update_fields=['data'])
+            spooled.size = min(spooled.size, size)
+            spooled.save(update_fields=['size'])
+        return spooled
+
+    def delete(self, name):
+        from .models import SpooledFile
+
+        SpooledFile.objects.filter(name=name).delete()
+
+    def exists(self, name):
+        from .models import SpooledFile
+
+        return SpooledFile.objects.filter(name=name).exists()
+
+    def size(self, name):
+        spooled = self.get_file(name)
+        if spooled is None:
+            raise FileNotFoundError(name)
+        return spooled.size
+
+
+def get_spool_max_size(limit):
+    """
+    Args:
+        limit (int): largest size allowed by the caller
+
+    Returns:
+        int: limit, lowered to the max_size of the spool storage
+    """
+    max_size = get_spool_storage().max_size
+    return limit if max_size is None else min(limit, max_size)
+
+
+def get_spool_storage():
+    """
+    Returns:
+        Storage: instance of settings.UPLOAD_SPOOL_STORAGE, where files wait to be transferred
+    """
+    return import_string(settings.UPLOAD_SPOOL_STORAGE)()
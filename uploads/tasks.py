@@ -0,0 +1,271 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import Value
+from django.db.models.functions import Replace
+from django.utils import timezone
+from PIL import UnidentifiedImageError
+
+from articles.models import Article
+from articles.page_cache import article_key
+from core.additional.page_cache import invalidate
+from feeds.tasks import update_feed_entry
+from tasks.registry import task
+from .images import ImageTooLarge, OptimizedImage, make_derivatives, open_image, optimize_image
+from .models import Blob, ResponsiveImage, Upload
+from .storage import get_spool_storage, get_upload_storage
+
+
+@dataclass
+class PushedImage:
+    """
+    result of push_upload and push_image.
+
+    Attributes:
+        url (str): url of the full size file in the storage
+        optimized (OptimizedImage|None): image that was pushed instead of the file
+        derivatives (List[dict]): {'width': int, 'url': str} of every pushed derivative
+    """
+    url: str
+    optimized: Optional[OptimizedImage] = None
+    derivatives: List[dict] = field(default_factory=list)
+
+
+@task
+def transfer_upload(upload_id):
+    """
+    push a spooled upload to the upload storage, then replace its
+    provisional url in the content of articles that already use it.
+
+    Args:
+        upload_id (str): primary key of the upload
+    """
+    upload = Upload.objects.filter(pk=upload_id).first()
+    if upload is None or upload.status == Upload.DONE:
+        return
+    complete_upload(upload, push_upload(upload, get_upload_storage()))
+
+
+@task
+def transfer_batch(upload_ids):
+    """
+    push several spooled uploads at once.
+    the files are pushed by a pool of UPLOAD_TRANSFER_WORKERS threads,
+    each reads its spooled file, so at most that many files are in memory.
+    the rows are only written from the calling thread.
+    when a file fails the others are still completed and the task
+    raises, so the retry only pushes the files that are still pending.
+
+    Args:
+        upload_ids (List[str]): primary keys of the uploads
+    """
+    uploads = list(Upload.objects.filter(
+        pk__in=upload_ids, status=Upload.PENDING))
+    if not uploads:
+        return
+    storage = get_upload_storage()
+    max_workers = max(1, min(settings.UPLOAD_TRANSFER_WORKERS, len(uploads)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(upload, executor.submit(push_spooled_upload, upload, storage))
+                   for upload in uploads]
+    errors = []
+    for upload, future in futures:
+        try:
+            pushed = future.result()
+        except Exception as error:
+            errors.append(f'{upload.name}: {error!r}')
+        else:
+            complete_upload(upload, pushed)
+    if errors:
+        raise RuntimeError('\n'.join(errors))
+
+
+def push_image(optimized, folder, storage):
+    """
+    send an optimized image and its derivatives to the upload storage.
+    it does not use the database so it can run in any thread.
+
+    Args:
+        optimized (OptimizedImage): full size image
+        folder (str): folder of the files in the storage
+        storage (UploadStorage): storage to push to
+
+    Returns:
+        PushedImage: urls of the image and its derivatives
+    """
+    url = storage.upload(ContentFile(optimized.content), optimized.name, folder)
+    derivatives = push_derivatives(
+        optimized.content, optimized.name, folder, storage)
+    return PushedImage(url=url, optimized=optimized, derivatives=derivatives)
+
+
+def push_derivatives(content, name, folder, storage):
+    """
+    send the derivatives of an image to the upload storage.
+
+    Args:
+        content (bytes): encoded full size image
+        name (str): file name of the image
+        folder (str): folder of the files in the storage
+        storage (UploadStorage): storage to push to
+
+    Returns:
+        List[dict]: {'width': int, 'url': str} of every derivative
+    """
+    return [
+        {'width': derivative.width,
+         'url': storage.upload(ContentFile(derivative.content), derivative.name, folder)}
+        for derivative in make_derivatives(content, name)
+    ]
+
+
+def create_responsive_image(source, content, name, folder):
+    """
+    push the derivatives of an image that is already stored elsewhere,
+    such as an article cover, and record them under its url.
+
+    Args:
+        source (str): url of the full size image
+        content (bytes): encoded full size image
+        name (str): file name of the image
+        folder (str): folder of the derivatives in the upload storage
+
+    Returns:
+        ResponsiveImage|None: None if the image can not be read or is too large
+    """
+    try:
+        width, height = open_image(io.BytesIO(content)).size
+    except (UnidentifiedImageError, OSError, ImageTooLarge):
+        return None
+    derivatives = push_derivatives(content, name, folder, get_upload_storage())
+    image, _ = ResponsiveImage.objects.update_or_create(
+        source=source, defaults={
+            'width': width,
+            'height': height,
+            'derivatives': derivatives,
+        })
+    return image
+
+
+def push_upload(upload, storage):
+    """
+    optimize a spooled image and send it to the upload storage
+    with its derivatives.
+    it only reads the spool storage so it can run in any thread.
+
+    Args:
+        upload (Upload): pending upload
+        storage (UploadStorage): storage to push to
+
+    Returns:
+        PushedImage: optimized is None when the original file was sent
+    """
+    with get_spool_storage().open(upload.spool_name, 'rb') as file:
+        try:
+            optimized = optimize_image(file, upload.name)
+        except ImageTooLarge:
+            # refused by the upload views, only files spooled before
+            # IMAGE_MAX_PIXELS was lowered get here. they are not decoded
+            optimized = None
+        if optimized is None:
+            return PushedImage(url=storage.upload(file, upload.name, upload.folder))
+    return push_image(optimized, upload.folder, storage)
+
+
+def push_spooled_upload(upload, storage):
+    """
+    push_upload for the threads of transfer_batch.
+    the connection a thread opened to read a database spool is closed with it.
+
+    Args:
+        upload (Upload): pending upload
+        storage (UploadStorage): storage to push to
+
+    Returns:
+        PushedImage: result of push_upload
+    """
+    try:
+        return push_upload(upload, storage)
+    finally:
+        connection.close()
+
+
+def save_responsive_image(pushed):
+    """
+    Args:
+        pushed (PushedImage): pushed image
+
+    Returns:
+        ResponsiveImage|None: None when the image was not optimized
+    """
+    if pushed.optimized is None:
+        return None
+    image, _ = ResponsiveImage.objects.update_or_create(
+        source=pushed.url, defaults={
+            'width': pushed.optimized.width,
+            'height': pushed.optimized.height,
+            'derivatives': pushed.derivatives,
+        })
+    return image
+
+
+def complete_upload(upload, pushed):
+    """
+    mark an upload as transferred, record its blob so the same content
+    is not transferred again, delete the spooled file
+    and replace the provisional url in article content.
+
+    Args:
+        upload (Upload): pushed upload
+        pushed (PushedImage): result of push_upload
+    """
+    spool_name = upload.spool_name
+    optimized = pushed.optimized
+    if optimized is not None:
+        upload.name = optimized.name
+        upload.content_type = optimized.content_type
+        upload.original_size = optimized.original_size
+        upload.size = optimized.size
+    upload.url = pushed.url
+    upload.status = Upload.DONE
+    upload.spool_name = ''
+    if upload.sha256:
+        upload.blob, _ = Blob.objects.update_or_create(
+            kind=Blob.UPLOAD, sha256=upload.sha256, defaults={
+                'url': upload.url,
+                'size': upload.size,
+                'last_used_at': timezone.now(),
+            })
+    upload.save()
+    save_responsive_image(pushed)
+    get_spool_storage().delete(spool_name)
+    replace_provisional_url(upload)
+
+
+def replace_provisional_url(upload):
+    """
+    replace the provisional url in the articles saved with it while the upload was pending.
+    the content is rewritten by the database in one update, so an edit saved
+    at the same time is not overwritten, then the rendered fields follow the new content.
+
+    Args:
+        upload (Upload): transferred upload
+    """
+    article_ids = list(Upload.articles.through.objects.filter(
+        upload_id=upload.pk).values_list('article_id', flat=True))
+    if not article_ids:
+        return
+    provisional_url = upload.get_absolute_url()
+    Article._base_manager.filter(
+        pk__in=article_ids, content__contains=provisional_url,
+    ).update(content=Replace('content', Value(provisional_url), Value(upload.url)))
+    for article in Article._base_manager.filter(pk__in=article_ids):
+        article.refresh_rendered_content()
+        update_feed_entry.enqueue(article_id=str(article.pk))
+    invalidate(*[article_key(article_id) for article_id in article_ids])
+    upload.articles.clear()
@@ -0,0 +1,478 @@
+import hashlib
+import io
+import shutil
+import tempfile
+from http import HTTPStatus as status
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.shortcuts import reverse
+from PIL import Image, ImageCms
+
+from .images import ImageTooLarge, make_derivatives, optimize_image
+from .models import Blob, ChunkedUpload, ResponsiveImage, Upload
+from .storage import DatabaseSpoolStorage, FileSystemSpoolStorage, get_spool_storage
+from .tasks import create_responsive_image
+from articles.forms import ArticleForm
+from articles.models import Article
+from tasks.models import Task
+from tasks.worker import run_pending
+
+
+def make_png(name='example.png', size=(8, 8)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'white').save(buffer, format='PNG')
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def make_photo(size=(3000, 1500)):
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientation: rotated 90 degrees
+    exif[0x010f] = 'camera maker'
+    Image.new('RGB', size, 'red').save(buffer, format='JPEG', exif=exif)
+    buffer.seek(0)
+    buffer.name = 'photo.jpg'
+    return buffer
+
+
+@override_settings(IMAGE_MAX_DIMENSION=1000, IMAGE_FORMAT='WEBP', IMAGE_QUALITY=80)
+class ImageOptimizationTestCase(TestCase):
+
+    def test_optimize_image_resizes_and_strips_exif(self):
+        photo = make_photo()
+        optimized = optimize_image(photo, 'photo.jpg')
+        self.assertEqual(optimized.name, 'photo.webp')
+        self.assertEqual(optimized.content_type, 'image/webp')
+        # the orientation is applied before resizing
+        self.assertEqual((optimized.width, optimized.height), (500, 1000))
+        self.assertEqual(optimized.original_size, len(photo.getvalue()))
+        self.assertEqual(optimized.size, len(optimized.content))
+        image = Image.open(io.BytesIO(optimized.content))
+        self.assertEqual(image.format, 'WEBP')
+        self.assertEqual(len(image.getexif()), 0)
+
+    def test_optimize_image_keeps_unreadable_files(self):
+        text = io.BytesIO(b'not an image')
+        self.assertIsNone(optimize_image(text, 'notes.txt'))
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_optimize_image_refuses_too_many_pixels(self):
+        with self.assertRaises(ImageTooLarge):
+            optimize_image(make_png(size=(20, 20)), 'example.png')
+        with self.assertRaises(ImageTooLarge):
+            make_derivatives(make_png(size=(20, 20)).getvalue(), 'example.png')
+
+    def test_optimize_image_refuses_decompression_bombs(self):
+        # over MAX_IMAGE_PIXELS Pillow warns, over twice as many it raises
+        for max_pixels in (300, 150):
+            with self.subTest(max_pixels=max_pixels), \
+                    mock.patch.object(Image, 'MAX_IMAGE_PIXELS', max_pixels):
+                with self.assertRaises(ImageTooLarge):
+                    optimize_image(make_png(size=(20, 20)), 'example.png')
+
+    @override_settings(IMAGE_FORMAT='JPEG', IMAGE_DERIVATIVE_WIDTHS=[100])
+    def test_optimize_image_flattens_transparency_and_keeps_icc_profile(self):
+        icc_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+        buffer = io.BytesIO()
+        Image.new('RGBA', (200, 200), (0, 0, 0, 0)).save(
+            buffer, format='PNG', icc_profile=icc_profile)
+        buffer.seek(0)
+        optimized = optimize_image(buffer, 'logo.png')
+        image = Image.open(io.BytesIO(optimized.content))
+        self.assertEqual(image.format, 'JPEG')
+        # transparent pixels become white instead of black
+        self.assertGreater(min(image.getpixel((0, 0))), 250)
+        self.assertEqual(image.info.get('icc_profile'), icc_profile)
+        derivative = make_derivatives(optimized.content, optimized.name)[0]
+        self.assertEqual(
+            Image.open(io.BytesIO(derivative.content)).info.get('icc_profile'), icc_profile)
+
+
+class TemporaryMediaMixin:
+    """
+    store media, spooled files and uploads in a temporary directory
+    and log in a user.
+    """
+
+    def setUp(self):
+        self.media_root = media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            MEDIA_URL='/media/',
+            UPLOAD_SPOOL_ROOT=f'{media_root}/spool',
+            UPLOAD_STORAGE='uploads.storage.LocalUploadStorage',)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            email='testuser@test.com',
+            password='testuser1234',)
+        self.client.login(username='testuser', password='testuser1234')
+
+
+class SpoolStorageTestCase(TemporaryMediaMixin, TestCase):
+
+    def check_storage(self, spool):
+        content = bytes(range(256)) * 4
+        name = spool.save('chunked/example.part', ContentFile(content[:300]))
+        spool.write(name, 250, [content[250:600], content[600:]])
+        self.assertEqual(spool.size(name), len(content))
+        with spool.open(name, 'rb') as file:
+            self.assertEqual(file.read(), content)
+            file.seek(700)
+            self.assertEqual(file.read(10), content[700:710])
+        spool.truncate(name, 500)
+        with spool.open(name, 'rb') as file:
+            self.assertEqual(file.read(), content[:500])
+        spool.delete(name)
+        self.assertFalse(spool.exists(name))
+
+    @override_settings(UPLOAD_SPOOL_CHUNK_SIZE=128)
+    def test_database_spool_storage(self):
+        self.check_storage(DatabaseSpoolStorage())
+
+    def test_file_system_spool_storage(self):
+        self.check_storage(FileSystemSpoolStorage())
+
+    @override_settings(UPLOAD_SPOOL_CHUNK_SIZE=128, UPLOAD_SPOOL_DATABASE_MAX_SIZE=1024)
+    def test_database_spool_storage_refuses_large_files(self):
+        spool = DatabaseSpoolStorage()
+        with self.assertRaises(ValueError):
+            spool.save('large.png', ContentFile(b'0' * 1025))
+        name = spool.save('chunked/example.part', ContentFile(b''))
+        with self.assertRaises(ValueError):
+            spool.write(name, 0, [b'0' * 512, b'0' * 513])
+
+    @override_settings(UPLOAD_SPOOL_STORAGE='uploads.storage.DatabaseSpoolStorage',
+                       UPLOAD_SPOOL_DATABASE_MAX_SIZE=1024)
+    def test_chunked_upload_over_database_spool_size_is_rejected(self):
+        response = self.client.post(reverse('uploads:chunked_upload_start'), data={
+            'name': 'lecture.mp4',
+            'size': 1025,
+            'content_type': 'video/mp4',
+        })
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+
+class UploadTestCase(TemporaryMediaMixin, TestCase):
+
+    def upload(self, size=(8, 8)):
+        response = self.client.post(reverse('markdown_uploader_page'), data={
+            'title': 'example',
+            'markdown-image-upload': make_png(size=size),
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, status.OK)
+        return response.json()['link']
+
+    @mock.patch('cloudinary.uploader.upload')
+    def test_upload_returns_provisional_url_without_transfer(self, upload):
+        link = self.upload()
+        upload.assert_not_called()
+        stored = Upload.objects.get()
+        self.assertEqual(link, stored.get_absolute_url())
+        self.assertEqual(stored.status, Upload.PENDING)
+        response = self.client.get(link)
+        self.assertEqual(response.status_code, status.OK)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(b''.join(response.streaming_content)[:4], b'\x89PNG')
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_upload_refuses_too_many_pixels(self):
+        response = self.client.post(reverse('markdown_uploader_page'), data={
+            'title': 'example',
+            'markdown-image-upload': make_png(size=(20, 20)),
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response.json()['error'], 'Image has too many pixels.')
+        self.assertFalse(Upload.objects.exists())
+
+    def test_worker_transfers_upload_and_rewrites_articles(self):
+        link = self.upload()
+        article = Article.objects.create(
+            author=self.user,
+            title='example',
+            slug='example',
+            description='example description',
+            content=f'![example]({link})',
+            keywords='example',
+            publish_at='2020-01-01 00:00',)
+        self.assertEqual(list(Upload.objects.get().articles.all()), [article])
+        # an edit written while the upload is transferred is kept
+        Article.objects.filter(pk=article.pk).update(content=f'![example]({link})\n\nedited')
+        run_pending()
+        stored = Upload.objects.get()
+        self.assertEqual(stored.status, Upload.DONE)
+        self.assertFalse(stored.articles.exists())
+        self.assertEqual(stored.spool_name, '')
+        self.assertTrue(stored.url.startswith('/media/'))
+        self.assertTrue(stored.url.endswith('.webp'))
+        self.assertEqual(stored.content_type, 'image/webp')
+        self.assertIsNotNone(stored.original_size)
+        self.assertRedirects(self.client.get(link), stored.url,
+                             fetch_redirect_response=False)
+        article.refresh_from_db()
+        self.assertEqual(article.content, f'![example]({stored.url})\n\nedited')
+        self.assertIn(stored.url, article.content_html)
+        self.assertIn('width="8"', article.content_html)
+        self.assertIn('loading="lazy"', article.content_html)
+        self.assertNotIn('srcset', article.content_html)
+
+    @override_settings(IMAGE_DERIVATIVE_WIDTHS=[480, 960, 1440])
+    def test_worker_creates_derivatives_for_srcset(self):
+        link = self.upload(size=(1200, 600))
+        article = Article.objects.create(
+            author=self.user,
+            title='example',
+            slug='example',
+            description='example description',
+            content=f'![example]({link})',
+            keywords='example',
+            publish_at='2020-01-01 00:00',)
+        run_pending()
+        stored = Upload.objects.get()
+        image = ResponsiveImage.objects.get(source=stored.url)
+        self.assertEqual((image.width, image.height), (1200, 600))
+        self.assertEqual([derivative['width'] for derivative in image.derivatives], [480, 960])
+        for derivative in image.derivatives:
+            self.assertTrue(derivative['url'].endswith(f'-{derivative["width"]}w.webp'))
+        article.refresh_from_db()
+        self.assertIn(f'srcset="{image.get_srcset()}"', article.content_html)
+        self.assertIn('sizes="(max-width: 1200px) 100vw, 1200px"', article.content_html)
+        self.assertIn('height="600"', article.content_html)
+
+    @override_settings(IMAGE_DERIVATIVE_WIDTHS=[480])
+    def test_create_responsive_image_for_stored_image(self):
+        content = make_png(size=(800, 400)).getvalue()
+        image = create_responsive_image(
+            'https://example.com/cover.png', content, 'cover.png', 'covers')
+        self.assertEqual((image.width, image.height), (800, 400))
+        self.assertEqual(len(image.derivatives), 1)
+        self.assertIn('480w', image.get_srcset())
+        self.assertIn('https://example.com/cover.png 800w', image.get_srcset())
+
+    def batch_upload(self, files):
+        response = self.client.post(reverse('markdown_batch_uploader_page'), data={
+            'markdown-image-upload': files,
+        })
+        self.assertEqual(response.status_code, status.OK)
+        return response.json()['files']
+
+    def test_batch_upload_returns_manifest(self):
+        text = io.BytesIO(b'not an image')
+        text.name = 'notes.txt'
+        files = self.batch_upload([make_png('first.png'), text, make_png('second.png')])
+        self.assertEqual([file['status'] for file in files], [405, 200, 200])
+        self.assertEqual(files[0]['name'], 'notes.txt')
+        self.assertEqual([file['name'] for file in files[1:]], ['first.png', 'second.png'])
+        self.assertEqual(Upload.objects.count(), 2)
+        self.assertEqual(Task.objects.get().name, 'uploads.tasks.transfer_batch')
+        run_pending()
+        self.assertEqual(Upload.objects.filter(status=Upload.DONE).count(), 2)
+        for file in files[1:]:
+            self.assertEqual(self.client.get(file['link']).status_code, status.FOUND)
+
+    @override_settings(MAX_IMAGE_UPLOAD_SIZE=32)
+    def test_batch_upload_skips_large_files_while_parsing(self):
+        files = self.batch_upload([make_png()])
+        self.assertEqual(files[0]['status'], 405)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_batch_upload_requires_login(self):
+        self.client.logout()
+        response = self.client.post(reverse('markdown_batch_uploader_page'), data={
+            'markdown-image-upload': [make_png()],
+        })
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+
+    def test_identical_upload_reuses_blob(self):
+        self.upload()
+        run_pending()
+        first = Upload.objects.get()
+        self.assertEqual(first.blob.url, first.url)
+        link = self.upload()
+        second = Upload.objects.latest('timestamp')
+        self.assertEqual(link, first.url)
+        self.assertEqual(second.status, Upload.DONE)
+        self.assertEqual(second.blob, first.blob)
+        self.assertEqual(second.spool_name, '')
+        self.assertFalse(Task.objects.filter(status=Task.PENDING).exists())
+
+    def test_batch_upload_reuses_blob(self):
+        self.upload()
+        run_pending()
+        blob = Blob.objects.get()
+        files = self.batch_upload([make_png('copy.png')])
+        self.assertEqual(files[0]['link'], blob.url)
+        self.assertFalse(Task.objects.filter(status=Task.PENDING).exists())
+
+    def test_sweep_blobs_deletes_unreferenced_files(self):
+        link = self.upload()
+        Article.objects.create(
+            author=self.user,
+            title='example',
+            slug='example',
+            description='example description',
+            content=f'![example]({link})',
+            keywords='example',
+            publish_at='2020-01-01 00:00',)
+        run_pending()
+        kept = Blob.objects.get()
+        orphan = Blob.objects.create(
+            kind=Blob.UPLOAD, sha256='0' * 64, url='/media/article/markdown/orphan.png')
+        Blob.objects.update(last_used_at='2020-01-01 00:00Z')
+        call_command('sweep_blobs', '--dry-run', stdout=io.StringIO())
+        self.assertEqual(Blob.objects.count(), 2)
+        call_command('sweep_blobs', stdout=io.StringIO())
+        self.assertEqual(list(Blob.objects.all()), [kept])
+        self.assertFalse(Blob.objects.filter(pk=orphan.pk).exists())
+
+    def test_article_saved_after_transfer_gets_stored_url(self):
+        link = self.upload()
+        run_pending()
+        stored = Upload.objects.get()
+        article = Article.objects.create(
+            author=self.user,
+            title='example',
+            slug='example',
+            description='example description',
+            content=f'![example]({link})',
+            keywords='example',
+            publish_at='2020-01-01 00:00',)
+        self.assertEqual(article.content, f'![example]({stored.url})')
+        # content written without Article.save still refers to the blob
+        Article.objects.filter(pk=article.pk).update(content=f'![example]({link})')
+        Blob.objects.update(last_used_at='2020-01-01 00:00Z')
+        call_command('sweep_blobs', stdout=io.StringIO())
+        self.assertEqual(Blob.objects.get(), stored.blob)
+
+
+VIDEO = b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom' + bytes(range(256)) * 4
+
+
+class ChunkedUploadTestCase(TemporaryMediaMixin, TestCase):
+
+    def start(self, content=VIDEO):
+        response = self.client.post(reverse('uploads:chunked_upload_start'), data={
+            'name': 'lecture.mp4',
+            'size': len(content),
+            'content_type': 'video/mp4',
+            'sha256': hashlib.sha256(content).hexdigest(),
+        })
+        self.assertEqual(response.status_code, status.CREATED)
+        return response.json()
+
+    def put(self, url, content, start, size=len(VIDEO), sha256=None):
+        end = start + len(content) - 1
+        return self.client.put(
+            url, content, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{size}',
+            HTTP_X_CHUNK_SHA256=sha256 or hashlib.sha256(content).hexdigest(),)
+
+    def upload_video(self):
+        session = self.start()
+        for start in range(0, len(VIDEO), 512):
+            response = self.put(session['url'], VIDEO[start:start + 512], start)
+            self.assertEqual(response.status_code, status.OK)
+        response = self.client.post(f'{session["url"]}complete/')
+        self.assertEqual(response.status_code, status.OK)
+        return ChunkedUpload.objects.get(pk=session['id'])
+
+    def test_chunks_resume_from_offset(self):
+        session = self.start()
+        url = session['url']
+        self.assertEqual(self.put(url, VIDEO[:512], 0).status_code, status.OK)
+        # a retried chunk that was already received
+        response = self.put(url, VIDEO[:512], 0)
+        self.assertEqual(response.status_code, status.CONFLICT)
+        self.assertEqual(response.json()['offset'], 512)
+        # a chunk corrupted on the way is not kept
+        response = self.put(url, VIDEO[512:1024], 512, sha256='0' * 64)
+        self.assertEqual(response.status_code, status.BAD_REQUEST)
+        self.assertEqual(self.client.get(url).json()['offset'], 512)
+        response = self.client.post(f'{url}complete/')
+        self.assertEqual(response.status_code, status.CONFLICT)
+        self.assertEqual(self.put(url, VIDEO[512:], 512).status_code, status.OK)
+        response = self.client.post(f'{url}complete/')
+        self.assertEqual(response.json()['status'], ChunkedUpload.COMPLETE)
+        upload = ChunkedUpload.objects.get()
+        self.assertEqual(upload.sha256, hashlib.sha256(VIDEO).hexdigest())
+        with get_spool_storage().open(upload.spool_name) as file:
+            self.assertEqual(file.read(), VIDEO)
+
+    def test_chunk_is_not_counted_when_offset_moved_while_it_was_written(self):
+        session = self.start()
+        write_chunk = ChunkedUpload.write_chunk
+
+        def write_concurrently(upload, *args):
+            written = write_chunk(upload, *args)
+            # another request for the same chunk finished first, the row is not locked meanwhile
+            ChunkedUpload.objects.filter(pk=upload.pk).update(offset=512)
+            return written
+
+        with mock.patch.object(ChunkedUpload, 'write_chunk', write_concurrently):
+            response = self.put(session['url'], VIDEO[:512], 0)
+        self.assertEqual(response.status_code, status.CONFLICT)
+        self.assertEqual(response.json()['offset'], 512)
+        self.assertEqual(ChunkedUpload.objects.get().offset, 512)
+
+    @override_settings(CHUNKED_UPLOAD_CHUNK_SIZE=256)
+    def test_chunk_over_chunk_size_is_rejected(self):
+        session = self.start()
+        response = self.put(session['url'], VIDEO[:512], 0)
+        self.assertEqual(response.status_code, status.REQUESTED_RANGE_NOT_SATISFIABLE)
+
+    def test_other_users_can_not_send_chunks(self):
+        session = self.start()
+        get_user_model().objects.create_user(username='other', password='other1234')
+        self.client.login(username='other', password='other1234')
+        response = self.put(session['url'], VIDEO[:512], 0)
+        self.assertEqual(response.status_code, status.NOT_FOUND)
+
+    def test_form_does_not_attach_uploads_of_other_users(self):
+        upload = self.upload_video()
+        other = get_user_model().objects.create_user(username='other', password='other1234')
+        form = ArticleForm(data={
+            'title': 'video example',
+            'slug': 'video-example',
+            'description': 'example description',
+            'content': '#example',
+            'keywords': 'example',
+            'video_upload': str(upload.pk),
+        }, user=other)
+        self.assertFalse(form.is_valid())
+        self.assertIn('video_upload', form.errors)
+
+    def test_form_attaches_chunked_video(self):
+        upload = self.upload_video()
+        form = ArticleForm(data={
+            'title': 'video example',
+            'slug': 'video-example',
+            'description': 'example description',
+            'content': '#example',
+            'keywords': 'example',
+            'video_upload': str(upload.pk),
+        }, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.instance.author = self.user
+        article = form.save()
+        self.assertFalse(article.video)
+        video_field = Article._meta.get_field('video')
+        storage = FileSystemStorage(location=f'{self.media_root}/videos', base_url='/videos/')
+        with mock.patch.object(video_field, 'storage', storage):
+            run_pending()
+        article.refresh_from_db()
+        sha256 = hashlib.sha256(VIDEO).hexdigest()
+        self.assertEqual(article.video.name, f'article/video/{sha256}.mp4')
+        self.assertEqual(Blob.objects.get(kind=Blob.VIDEO).sha256, sha256)
+        self.assertFalse(ChunkedUpload.objects.exists())
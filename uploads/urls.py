@@ -0,0 +1,15 @@
+from django.urls import path
+
+from .views import (
+    ChunkedUploadCompleteView, ChunkedUploadDetailView, ChunkedUploadStartView, UploadDetailView)
+
+app_name = 'uploads'
+
+urlpatterns = [
+    path('<uuid:pk>/', UploadDetailView.as_view(), name='upload_detail'),
+    path('chunked/', ChunkedUploadStartView.as_view(), name='chunked_upload_start'),
+    path('chunked/<uuid:pk>/', ChunkedUploadDetailView.as_view(),
+         name='chunked_upload_detail'),
+    path('chunked/<uuid:pk>/complete/', ChunkedUploadCompleteView.as_view(),
+         name='chunked_upload_complete'),
+]
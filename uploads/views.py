@@ -0,0 +1,154 @@
+import os
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.views.generic import View
+
+from articles.permissions import AccessPermissionToUsers
+from .models import ChunkedUpload, Upload
+from .storage import get_spool_max_size, get_spool_storage
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+SHA256_PATTERN = re.compile(r'^[0-9a-fA-F]{64}$')
+
+
+class UploadDetailView(View):
+    """
+    a view to serve the provisional url of an upload.
+    redirects to the final url once the upload is transferred,
+    and serves the spooled file until then.
+    """
+
+    def get(self, request, pk):
+        upload = get_object_or_404(Upload, pk=pk)
+        if upload.status == Upload.DONE:
+            return redirect(upload.url)
+        spool = get_spool_storage()
+        if not spool.exists(upload.spool_name):
+            raise Http404
+        response = FileResponse(
+            spool.open(upload.spool_name, 'rb'), content_type=upload.content_type)
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+class ChunkedUploadStartView(AccessPermissionToUsers, View):
+    """
+    a view to open a chunked upload session.
+    called with name, size, content_type and optionally the sha256 of the whole file.
+    """
+
+    def post(self, request):
+        """
+        Returns:
+            JsonResponse: state of the new session and the chunk size to use
+        """
+        name = os.path.basename(request.POST.get('name', ''))
+        sha256 = request.POST.get('sha256', '')
+        try:
+            size = int(request.POST.get('size', ''))
+        except ValueError:
+            size = 0
+        if not name or not 0 < size <= get_spool_max_size(settings.CHUNKED_UPLOAD_MAX_SIZE):
+            return JsonResponse({'status': 400, 'error': 'Bad file size.'}, status=400)
+        if sha256 and not SHA256_PATTERN.match(sha256):
+            return JsonResponse({'status': 400, 'error': 'Bad checksum.'}, status=400)
+        upload = ChunkedUpload.objects.start(
+            request.user, name, size, request.POST.get('content_type', '')[:100], sha256)
+        data = upload.to_json()
+        data['chunk_size'] = settings.CHUNKED_UPLOAD_CHUNK_SIZE
+        return JsonResponse(data, status=201)
+
+
+class ChunkedUploadDetailView(AccessPermissionToUsers, View):
+    """
+    a view to send the chunks of a chunked upload.
+    GET returns the offset to resume from, PUT appends a chunk and DELETE cancels the upload.
+
+    a chunk is the request body, with the headers
+        Content-Range: bytes <first byte>-<last byte>/<size>
+        X-Chunk-Sha256: <sha256 hex digest of the chunk>
+    """
+
+    def get_upload(self, pk):
+        return get_object_or_404(
+            ChunkedUpload.objects.select_for_update(), pk=pk, user=self.request.user)
+
+    def get(self, request, pk):
+        upload = get_object_or_404(ChunkedUpload, pk=pk, user=request.user)
+        return JsonResponse(upload.to_json())
+
+    def put(self, request, pk):
+        """
+        Returns:
+            JsonResponse: state of the session. 409 with the offset to resume from
+                when the chunk does not start there
+        """
+        match = CONTENT_RANGE_PATTERN.match(request.META.get('HTTP_CONTENT_RANGE', ''))
+        sha256 = request.META.get('HTTP_X_CHUNK_SHA256', '')
+        if match is None or not SHA256_PATTERN.match(sha256):
+            return JsonResponse(
+                {'status': 400, 'error': 'Content-Range and X-Chunk-Sha256 are required.'},
+                status=400)
+        start, end, size = (int(value) for value in match.groups())
+        length = end - start + 1
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        # the row is only locked to check the offset and to move it,
+        # not while the body is read from the client
+        with transaction.atomic():
+            upload = self.get_upload(pk)
+            if (upload.status != ChunkedUpload.UPLOADING or size != upload.size
+                    or length <= 0 or end >= size or content_length != length
+                    or length > settings.CHUNKED_UPLOAD_CHUNK_SIZE):
+                return JsonResponse(
+                    {'status': 416, 'error': 'Bad chunk range.', **upload.to_json()}, status=416)
+            if start != upload.offset:
+                return self.offset_conflict(upload)
+        try:
+            written = upload.write_chunk(request, start, length, sha256)
+        except FileNotFoundError:
+            # the upload was cancelled while the chunk was written
+            raise Http404
+        with transaction.atomic():
+            upload = self.get_upload(pk)
+            if not upload.move_offset(start, length, written):
+                return self.offset_conflict(upload)
+        if not written:
+            return JsonResponse(
+                {'status': 400, 'error': 'Chunk checksum does not match.', **upload.to_json()},
+                status=400)
+        return JsonResponse(upload.to_json())
+
+    def offset_conflict(self, upload):
+        return JsonResponse(
+            {'status': 409, 'error': 'Chunk does not start at offset.', **upload.to_json()},
+            status=409)
+
+    def delete(self, request, pk):
+        with transaction.atomic():
+            self.get_upload(pk).discard()
+        return HttpResponse(status=204)
+
+
+class ChunkedUploadCompleteView(AccessPermissionToUsers, View):
+    """
+    a view to finish a chunked upload once every chunk is sent.
+    the id of a complete upload is then sent with the article form.
+    """
+
+    def post(self, request, pk):
+        """
+        Returns:
+            JsonResponse: state of the session
+        """
+        with transaction.atomic():
+            upload = get_object_or_404(
+                ChunkedUpload.objects.select_for_update(), pk=pk, user=request.user)
+            if upload.status != ChunkedUpload.COMPLETE and not upload.complete():
+                return JsonResponse(
+                    {'status': 409, 'error': 'Upload is incomplete or does not match its checksum.',
+                     **upload.to_json()}, status=409)
+        return JsonResponse(upload.to_json())